@@ -0,0 +1,268 @@
+"""Raw CDC fixtures shaped like the Debezium → S3 sink output.
+
+Rows come from the seeder's ColumnarGenerator with ids from a counter instead
+of the database sequences, wrapped in the Debezium envelope with the types
+the Postgres connector emits (SERIAL → int, TIMESTAMP → MicroTimestamp long,
+NUMERIC(10, 2) → decimal bytes), and written with the S3 sink's object layout
+`kafka/<topic>/partition=<p>/<topic>+<p>+<startOffset>.avro`.
+"""
+
+from decimal import Decimal
+from pathlib import Path
+import io
+import sys
+
+import fastavro
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "seeder"))
+
+from generator import ColumnarGenerator  # noqa: E402
+
+TOPIC_PREFIX = "storefront.public"
+DECIMAL = {"type": "bytes", "logicalType": "decimal", "precision": 10, "scale": 2}
+MICRO_TIMESTAMP = {"type": "long", "connect.name": "io.debezium.time.MicroTimestamp"}
+
+TABLE_FIELDS = {
+    "customers": [
+        ("id", "int"),
+        ("full_name", "string"),
+        ("email", "string"),
+        ("address", ["null", "string"]),
+        ("city", ["null", "string"]),
+        ("country", ["null", "string"]),
+        ("created_at", ["null", MICRO_TIMESTAMP]),
+    ],
+    "products": [
+        ("id", "int"),
+        ("name", "string"),
+        ("category", ["null", "string"]),
+        ("price", DECIMAL),
+        ("stock_quantity", "int"),
+        ("created_at", ["null", MICRO_TIMESTAMP]),
+    ],
+    "orders": [
+        ("id", "int"),
+        ("customer_id", "int"),
+        ("status", "string"),
+        ("total", ["null", DECIMAL]),
+        ("created_at", ["null", MICRO_TIMESTAMP]),
+    ],
+    "order_items": [
+        ("id", "int"),
+        ("order_id", "int"),
+        ("product_id", "int"),
+        ("quantity", "int"),
+        ("price_at_purchase", DECIMAL),
+    ],
+    "payments": [
+        ("id", "int"),
+        ("order_id", "int"),
+        ("payment_method", "string"),
+        ("paid_at", ["null", MICRO_TIMESTAMP]),
+        ("amount", ["null", DECIMAL]),
+        ("status", ["null", "string"]),
+    ],
+}
+TABLES = list(TABLE_FIELDS)
+
+SOURCE_SCHEMA = {
+    "type": "record",
+    "name": "Source",
+    "namespace": "io.debezium.connector.postgresql",
+    "fields": [
+        {"name": "version", "type": "string"},
+        {"name": "connector", "type": "string"},
+        {"name": "name", "type": "string"},
+        {"name": "ts_ms", "type": "long"},
+        {"name": "snapshot", "type": ["string", "null"], "default": "false"},
+        {"name": "db", "type": "string"},
+        {"name": "schema", "type": "string"},
+        {"name": "table", "type": "string"},
+        {"name": "txId", "type": ["null", "long"], "default": None},
+        {"name": "lsn", "type": ["null", "long"], "default": None},
+    ],
+}
+
+
+def topic(table: str) -> str:
+    return f"{TOPIC_PREFIX}.{table}"
+
+
+def envelope_schema(table: str) -> dict:
+    value = {
+        "type": "record",
+        "name": "Value",
+        "fields": [{"name": n, "type": t} for n, t in TABLE_FIELDS[table]],
+    }
+    return fastavro.parse_schema(
+        {
+            "type": "record",
+            "name": "Envelope",
+            "namespace": topic(table),
+            "fields": [
+                {"name": "before", "type": ["null", value], "default": None},
+                {"name": "after", "type": ["null", f"{topic(table)}.Value"]},
+                {"name": "source", "type": SOURCE_SCHEMA},
+                {"name": "op", "type": "string"},
+                {"name": "ts_ms", "type": ["null", "long"], "default": None},
+            ],
+        }
+    )
+
+
+def _python_column(values: np.ndarray) -> list:
+    if np.issubdtype(values.dtype, np.datetime64):
+        micros = values.astype("datetime64[us]").astype(np.int64)
+        return [None if np.isnat(v) else int(m) for v, m in zip(values, micros)]
+    if np.issubdtype(values.dtype, np.floating):
+        return [Decimal(f"{v:.2f}") for v in values.tolist()]
+    return values.tolist()
+
+
+def generate_batch(
+    gen: ColumnarGenerator, order_count: int, id_start: dict[str, int]
+) -> dict[str, list[dict]]:
+    """One storefront batch of order_count orders as plain row dicts.
+
+    Ids of each table count up from id_start[table].
+    """
+
+    def ids(table: str, n: int) -> np.ndarray:
+        return np.arange(id_start[table], id_start[table] + n, dtype=np.int64)
+
+    customers = gen.customers(ids("customers", max(1, order_count // 2)))
+    products = gen.products(ids("products", order_count))
+    orders = gen.orders(ids("orders", order_count), customers["id"])
+    order_items, total_cents = gen.order_items(orders["id"], products)
+    order_items["id"] = ids("order_items", len(order_items["order_id"]))
+    orders["total"] = total_cents / 100
+    payments = gen.payments(ids("payments", order_count), orders["id"], total_cents)
+    batch = {
+        "customers": customers,
+        "products": products,
+        "orders": orders,
+        "order_items": order_items,
+        "payments": payments,
+    }
+
+    rows = {}
+    for table, columns in batch.items():
+        names = [n for n, _ in TABLE_FIELDS[table]]
+        values = [_python_column(columns[n]) for n in names]
+        rows[table] = [dict(zip(names, row)) for row in zip(*values)]
+    return rows
+
+
+def generate_rows(order_count: int, seed: int = 0) -> dict[str, list[dict]]:
+    """One storefront batch of order_count orders as plain row dicts."""
+    return generate_batch(
+        ColumnarGenerator(seed), order_count, dict.fromkeys(TABLES, 1)
+    )
+
+
+def envelope(
+    table: str, op: str, before: dict | None, after: dict | None, ts_ms: int, lsn: int
+) -> dict:
+    return {
+        "before": before,
+        "after": after,
+        "source": {
+            "version": "2.7.0.Final",
+            "connector": "postgresql",
+            "name": "storefront",
+            "ts_ms": ts_ms,
+            "snapshot": "true" if op == "r" else "false",
+            "db": "storefront",
+            "schema": "public",
+            "table": table,
+            "txId": None,
+            "lsn": lsn,
+        },
+        "op": op,
+        "ts_ms": ts_ms,
+    }
+
+
+def envelopes(table: str, rows: list[dict], ts_ms: int, op: str = "c") -> list[dict]:
+    return [envelope(table, op, None, row, ts_ms, i) for i, row in enumerate(rows)]
+
+
+def cdc_events(
+    table: str,
+    rows: list[dict],
+    mix: dict[str, float],
+    rng: np.random.Generator,
+    ts_ms: int,
+    lsn: int = 0,
+) -> list[dict]:
+    """Events for newly created rows under an op mix, e.g. {"c": 0.8, "u": 0.2}.
+
+    Every row is created once (as `c`, or `r` for its share of snapshot
+    reads). `u` and `d` events are added for random created rows so that each
+    op's share of all events follows the mix; a row is deleted at most once
+    and not updated afterwards. Deletes carry the full row in `before`, as
+    with REPLICA IDENTITY FULL. Events are ordered by ts_ms, 1 ms apart.
+    """
+    creates = mix.get("c", 0) + mix.get("r", 0)
+    if creates <= 0:
+        raise ValueError("Op mix needs a positive c or r share")
+    n = len(rows)
+    total = n / creates
+    n_read = int(round(n * mix.get("r", 0) / creates))
+    n_delete = min(n, int(round(total * mix.get("d", 0))))
+    n_update = int(round(total * mix.get("u", 0)))
+
+    created_at = rng.permutation(n)  # creation order, in ms steps
+    deleted = rng.choice(n, n_delete, replace=False)
+    alive = np.setdiff1d(np.arange(n), deleted)
+    updated = rng.choice(alive, n_update) if len(alive) else np.empty(0, int)
+
+    events = [(int(created_at[i]), "r" if i < n_read else "c", i) for i in range(n)]
+    # later ops happen after the row was created
+    for op, targets in (("u", updated), ("d", deleted)):
+        for i in targets.tolist():
+            events.append((int(created_at[i]) + 1 + int(rng.integers(0, n + 1)), op, i))
+    events.sort(key=lambda e: e[0])
+
+    out = []
+    for k, (offset_ms, op, i) in enumerate(events):
+        row = rows[i]
+        before, after = (row, None) if op == "d" else (None, row)
+        out.append(envelope(table, op, before, after, ts_ms + offset_ms, lsn + k))
+    return out
+
+
+def avro_bytes(schema: dict, records: list[dict], codec: str = "null") -> bytes:
+    buf = io.BytesIO()
+    fastavro.writer(buf, schema, records, codec=codec)
+    return buf.getvalue()
+
+
+def sink_key(table: str, partition: int, offset: int) -> str:
+    return (
+        f"kafka/{topic(table)}/partition={partition}/"
+        f"{topic(table)}+{partition}+{offset:010d}.avro"
+    )
+
+
+def write_sink_files(
+    root: Path,
+    table: str,
+    records: list[dict],
+    flush_size: int = 1000,
+    partitions: int = 1,
+) -> list[Path]:
+    """Write records round-robin over partitions, flush_size per object."""
+    schema = envelope_schema(table)
+    paths = []
+    for p in range(partitions):
+        part = records[p::partitions]
+        out_dir = root / "kafka" / topic(table) / f"partition={p}"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for offset in range(0, len(part), flush_size):
+            path = out_dir / f"{topic(table)}+{p}+{offset:010d}.avro"
+            with open(path, "wb") as f:
+                fastavro.writer(f, schema, part[offset : offset + flush_size])
+            paths.append(path)
+    return paths
@@ -0,0 +1,231 @@
+"""Write synthetic Debezium CDC files straight into the raw zone.
+
+Skips Postgres, Debezium and Kafka Connect so the Spark layer can be tested
+at any volume. Files follow the S3 sink layout and naming (see fixtures.py)
+and go to local disk or S3 (MinIO from .lake.env), e.g.:
+
+    python benchmarks/generate_raw.py --orders 100000000 --partitions 16 \\
+        --target s3://raw --mix c=0.8,u=0.15,d=0.05
+
+Each Kafka partition is written by one process, in chunks of --chunk-orders
+orders, so offsets stay contiguous per partition and memory stays bounded.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from fixtures import (
+    MICRO_TIMESTAMP,
+    TABLE_FIELDS,
+    TABLES,
+    avro_bytes,
+    cdc_events,
+    envelope_schema,
+    generate_batch,
+    sink_key,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+# upper bound of rows per order, used to keep id ranges of partitions apart
+ID_STRIDE = {"order_items": 4}
+# ts_ms budget per order: cdc_events spans at most 2 ms per row of a chunk
+MS_PER_ORDER = 2 * max(ID_STRIDE.values()) + 1
+
+
+def _avro_type(column) -> dict | str:
+    from sqlalchemy import TIMESTAMP, Integer, Numeric, Text
+
+    t = column.type
+    if isinstance(t, Integer):
+        avro = "int"
+    elif isinstance(t, Text):
+        avro = "string"
+    elif isinstance(t, Numeric):
+        avro = {
+            "type": "bytes",
+            "logicalType": "decimal",
+            "precision": t.precision,
+            "scale": t.scale,
+        }
+    elif isinstance(t, TIMESTAMP):
+        avro = MICRO_TIMESTAMP
+    else:
+        raise ValueError(f"No Avro mapping for {column.table.name}.{column.name}: {t}")
+    return ["null", avro] if column.nullable and not column.primary_key else avro
+
+
+def check_value_schemas(tables: list[str]) -> None:
+    """Fail if the fixture value schemas drifted from seeder/models.py."""
+    from models import Base
+
+    for table in tables:
+        expected = [
+            (c.name, _avro_type(c)) for c in Base.metadata.tables[table].columns
+        ]
+        if TABLE_FIELDS[table] != expected:
+            raise ValueError(
+                f"benchmarks/fixtures.py fields of '{table}' do not match "
+                f"seeder/models.py: {TABLE_FIELDS[table]} != {expected}"
+            )
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        op, _, share = part.partition("=")
+        if op not in ("c", "r", "u", "d"):
+            raise argparse.ArgumentTypeError(f"Unknown op '{op}'")
+        mix[op] = float(share)
+    return mix
+
+
+def make_writer(target: str):
+    """Return write(key, data) for a local directory or s3://bucket[/prefix]."""
+    if target.startswith("s3://"):
+        sys.path.insert(0, str(ROOT / "scripts"))
+        from utils import get_s3_client
+
+        bucket, _, prefix = target.removeprefix("s3://").partition("/")
+        s3 = get_s3_client()
+        prefix = f"{prefix.rstrip('/')}/" if prefix else ""
+
+        def write(key: str, data: bytes) -> None:
+            s3.put_object(Bucket=bucket, Key=f"{prefix}{key}", Body=data)
+
+        return write
+
+    root = Path(target)
+
+    def write(key: str, data: bytes) -> None:
+        path = root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    return write
+
+
+def write_partition(
+    partition: int,
+    first_order: int,
+    orders: int,
+    tables: list[str],
+    mix: dict[str, float],
+    records_per_file: int,
+    chunk_orders: int,
+    codec: str,
+    target: str,
+    seed: int,
+    start_ms: int,
+) -> dict[str, dict[str, int]]:
+    # imported here so every process builds its own vocabularies
+    from generator import ColumnarGenerator
+
+    write = make_writer(target)
+    gen = ColumnarGenerator(seed + partition)
+    rng = np.random.default_rng(seed + partition)
+    schemas = {t: envelope_schema(t) for t in tables}
+    next_id = {t: 1 + first_order * ID_STRIDE.get(t, 1) for t in TABLES}
+    buffers = {t: [] for t in tables}
+    stats = {t: {"files": 0, "records": 0, "bytes": 0} for t in tables}
+    lsn = 0
+
+    def flush(table: str, force: bool = False) -> None:
+        buf = buffers[table]
+        while len(buf) >= records_per_file or (force and buf):
+            records, buffers[table] = buf[:records_per_file], buf[records_per_file:]
+            buf = buffers[table]
+            data = avro_bytes(schemas[table], records, codec)
+            write(sink_key(table, partition, stats[table]["records"]), data)
+            st = stats[table]
+            st["files"] += 1
+            st["records"] += len(records)
+            st["bytes"] += len(data)
+
+    done = 0
+    while done < orders:
+        n = min(chunk_orders, orders - done)
+        rows = generate_batch(gen, n, next_id)
+        for table in TABLES:
+            next_id[table] += len(rows[table])
+        # every chunk of every partition gets its own ts_ms range, so events
+        # of different chunks never interleave or collide
+        ts_ms = start_ms + (first_order + done) * MS_PER_ORDER
+        for table in tables:
+            events = cdc_events(table, rows[table], mix, rng, ts_ms, lsn)
+            lsn += len(events)
+            buffers[table].extend(events)
+            flush(table)
+        done += n
+
+    for table in tables:
+        flush(table, force=True)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, required=True)
+    parser.add_argument("--target", required=True, help="Directory or s3://bucket")
+    parser.add_argument("--tables", nargs="+", choices=TABLES, default=TABLES)
+    parser.add_argument("--partitions", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--records-per-file", type=int, default=1000, help="Like the sink's flush.size"
+    )
+    parser.add_argument("--chunk-orders", type=int, default=50_000)
+    parser.add_argument(
+        "--mix", type=parse_mix, default={"c": 1.0}, help="e.g. c=0.8,u=0.15,d=0.05"
+    )
+    parser.add_argument("--codec", choices=["null", "deflate"], default="null")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    check_value_schemas(args.tables)
+    per_partition = math.ceil(args.orders / args.partitions)
+    counts = [
+        min(per_partition, max(0, args.orders - p * per_partition))
+        for p in range(args.partitions)
+    ]
+    start_ms = int(time.time() * 1000)
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(
+                write_partition,
+                p,
+                p * per_partition,
+                n,
+                args.tables,
+                args.mix,
+                args.records_per_file,
+                args.chunk_orders,
+                args.codec,
+                args.target,
+                args.seed,
+                start_ms,
+            )
+            for p, n in enumerate(counts)
+            if n > 0
+        ]
+        per_partition_stats = [f.result() for f in futures]
+
+    wall = time.perf_counter() - start
+    print(f"{'table':<15}{'files':>10}{'records':>14}{'mb':>12}{'records/s':>14}")
+    for table in args.tables:
+        files = sum(s[table]["files"] for s in per_partition_stats)
+        records = sum(s[table]["records"] for s in per_partition_stats)
+        mb = sum(s[table]["bytes"] for s in per_partition_stats) / 1_048_576
+        print(f"{table:<15}{files:>10}{records:>14}{mb:>12.1f}{records / wall:>14.0f}")
+    print(f"Wrote {args.orders} orders to {args.target} in {wall:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Pipeline benchmarks at several data scales, without network access.
+
+Suites:
+  seed    seed_initial_data and bulk_seed_initial_data on a local Postgres
+          (--pg-url, with the storefront schema from migrations/V1 applied)
+  count   count_avro_records over generated sink files in a moto S3 bucket
+  ingest  ingest_tables in Spark local[*] into a local Hadoop warehouse
+  verify  manifest stats vs a full polars scan of the ingested stage tables
+
+The ingest suite needs the Iceberg Spark runtime and spark-avro jars, either
+already on the Spark classpath (as in the spark-notebook image) or resolved
+from the local Ivy cache through --spark-packages. Results are written as
+JSON, one file per commit by default, so runs can be diffed across commits.
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+TABLES = ["customers", "products", "orders", "order_items", "payments"]
+ALL_SUITES = ["seed", "count", "ingest", "verify"]
+
+
+def git_commit() -> str:
+    out = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    return out.stdout.strip() or "unknown"
+
+
+def timed(fn, *args, **kwargs) -> tuple[object, float]:
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def result(suite: str, scale: int, wall_s: float, rows: int, **extra) -> dict:
+    return {
+        "suite": suite,
+        "scale": scale,
+        "wall_s": round(wall_s, 3),
+        "rows": rows,
+        "rows_per_sec": round(rows / wall_s, 1) if wall_s > 0 else None,
+        **extra,
+    }
+
+
+def bench_seed(scale: int, batch_size: int) -> list[dict]:
+    from sqlalchemy import text
+
+    from bulk import bulk_seed_initial_data
+    from database import engine
+    from seed import seed_initial_data
+
+    results = []
+    for name, seed_fn, size in [
+        ("seed_orm", seed_initial_data, batch_size),
+        ("seed_copy", bulk_seed_initial_data, batch_size * 10),
+    ]:
+        with engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE"))
+        stats, wall = timed(seed_fn, scale, size)
+        results.append(result(name, scale, wall, stats["total_rows"]))
+    return results
+
+
+def write_fixtures(raw_dir: Path, scale: int) -> dict[str, int]:
+    import fixtures
+
+    rows = fixtures.generate_rows(scale)
+    ts_ms = int(time.time() * 1000)
+    for table, table_rows in rows.items():
+        records = fixtures.envelopes(table, table_rows, ts_ms)
+        fixtures.write_sink_files(raw_dir, table, records, partitions=3)
+    return {table: len(r) for table, r in rows.items()}
+
+
+def bench_count(raw_dir: Path, scale: int, expected: dict[str, int]) -> list[dict]:
+    import boto3
+    from botocore.config import Config
+    from moto import mock_aws
+
+    from utils import count_avro_records
+
+    results = []
+    with mock_aws():
+        s3 = boto3.client(
+            "s3", region_name="us-east-1", config=Config(max_pool_connections=32)
+        )
+        s3.create_bucket(Bucket="raw")
+        for path in raw_dir.rglob("*.avro"):
+            s3.upload_file(str(path), "raw", str(path.relative_to(raw_dir)))
+
+        for name, filter_ops in [("count_blocks", None), ("count_ops", ["c", "u"])]:
+            total, wall = 0, 0.0
+            for table in TABLES:
+                prefix = f"kafka/storefront.public.{table}"
+                n, t = timed(count_avro_records, s3, "raw", prefix, filter_ops)
+                assert n == expected[table], f"{table}: counted {n}"
+                total, wall = total + n, wall + t
+            results.append(result(name, scale, wall, total))
+    return results
+
+
+def get_bench_spark(warehouse: Path, packages: str | None):
+    os.environ["SPARK_MASTER_URL"] = "local[*]"
+    os.environ["SPARK_SQL_CATALOG_LAKEHOUSE_WAREHOUSE"] = warehouse.as_uri()
+    # get_spark always sets the s3a options; the local run never uses them
+    for var in ["ENDPOINT", "ACCESS_KEY", "SECRET_KEY"]:
+        os.environ.setdefault(f"SPARK_HADOOP_FS_S3A_{var}", "unused")
+    os.environ.setdefault("SPARK_HADOOP_FS_S3A_PATH_STYLE_ACCESS", "true")
+    os.environ.setdefault(
+        "SPARK_HADOOP_FS_S3A_IMPL", "org.apache.hadoop.fs.s3a.S3AFileSystem"
+    )
+    from lakehouse.spark_session import get_spark
+
+    conf = {"spark.scheduler.mode": "FAIR"}
+    if packages:
+        conf["spark.jars.packages"] = packages
+    return get_spark("pipeline_benchmark", conf, "local-bench")
+
+
+def bench_ingest(spark, raw_dir: Path, scale: int, concurrency: int) -> list[dict]:
+    from storefront_raw_stage import ingest_tables, load_config
+
+    tables = []
+    for t in load_config()["sources"][0]["tables"]:
+        source = raw_dir / "kafka" / f"storefront.public.{t['name']}"
+        tables.append({**t, "source_path": source.as_uri() + "/"})
+
+    per_table, wall = timed(ingest_tables, spark, tables, concurrency)
+    rows = sum(r["output_rows"] for r in per_table)
+    return [result("ingest", scale, wall, rows, tables=per_table)]
+
+
+def bench_verify(warehouse: Path, scale: int) -> list[dict]:
+    import polars as pl
+    from pyiceberg.table import StaticTable
+
+    from utils import iceberg_table_stats
+
+    results = []
+    tables = []
+    for table in TABLES:
+        metadata = warehouse / "stage" / "storefront" / table / "metadata"
+        version = (metadata / "version-hint.text").read_text().strip()
+        tables.append(
+            StaticTable.from_metadata(str(metadata / f"v{version}.metadata.json"))
+        )
+
+    stats, wall = timed(lambda: [iceberg_table_stats(t) for t in tables])
+    results.append(result("verify_manifest", scale, wall, sum(s.rows for s in stats)))
+
+    def scan_all() -> int:
+        return sum(
+            pl.scan_iceberg(t)
+            .select(pl.len(), pl.col("event_date").is_not_null().sum())
+            .collect()
+            .item(0, 0)
+            for t in tables
+        )
+
+    rows, wall = timed(scan_all)
+    results.append(result("verify_scan", scale, wall, rows))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", type=int, default=[1_000, 10_000])
+    parser.add_argument("--suites", nargs="+", choices=ALL_SUITES, default=ALL_SUITES)
+    parser.add_argument("--pg-url", help="SQLAlchemy URL of a local Postgres")
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--spark-packages", help="spark.jars.packages for local runs")
+    parser.add_argument("--workdir", type=Path, help="Keep fixtures and warehouse here")
+    parser.add_argument(
+        "--out", type=Path, help="Default: benchmarks/results/<commit>.json"
+    )
+    args = parser.parse_args()
+
+    # the seeder, scripts and Spark job modules use flat imports
+    if args.pg_url:
+        os.environ["DATABASE_URL"] = args.pg_url
+    for path in ["seeder", "scripts", "spark", "spark/jobs", "benchmarks"]:
+        sys.path.insert(0, str(ROOT / path))
+    os.chdir(ROOT)  # scripts/utils.py reads the .env files from here
+
+    suites = set(args.suites)
+    if "seed" in suites and not args.pg_url:
+        print("Skipping seed suite: no --pg-url given")
+        suites.discard("seed")
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="pipeline-bench-"))
+    spark = None
+    results = []
+    try:
+        for scale in args.scales:
+            print(f"Scale {scale} orders")
+            if "seed" in suites:
+                results += bench_seed(scale, args.batch_size)
+
+            raw_dir = workdir / f"raw-{scale}"
+            warehouse = workdir / f"warehouse-{scale}"
+            shutil.rmtree(raw_dir, ignore_errors=True)
+            shutil.rmtree(warehouse, ignore_errors=True)
+            if suites & {"count", "ingest", "verify"}:
+                expected, wall = timed(write_fixtures, raw_dir, scale)
+                results.append(result("fixtures", scale, wall, sum(expected.values())))
+            if "count" in suites:
+                results += bench_count(raw_dir, scale, expected)
+            if suites & {"ingest", "verify"}:
+                # the warehouse is fixed per session, so one session per scale
+                if spark is not None:
+                    spark.stop()
+                spark = get_bench_spark(warehouse, args.spark_packages)
+                results += bench_ingest(spark, raw_dir, scale, args.concurrency)
+            if "verify" in suites:
+                results += bench_verify(warehouse, scale)
+            for r in results:
+                if r["scale"] == scale:
+                    print(
+                        f"  {r['suite']:<16}{r['wall_s']:>10}s{r['rows_per_sec']:>14} rows/s"
+                    )
+    finally:
+        if spark is not None:
+            spark.stop()
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    commit = git_commit()
+    out = args.out or ROOT / "benchmarks" / "results" / f"{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "host": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
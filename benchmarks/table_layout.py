@@ -0,0 +1,199 @@
+"""Lookup latency on stage tables written with and without their layout.
+
+Ingests the same generated raw zone twice in Spark local[*]: once with the
+`layout` entries of stage_tables.yaml removed and once as configured (sort
+order, bloom filters, metrics modes), then times point lookups and range
+queries on order_items (by order_id) and customers (by email) against both.
+With --compact, stage_maintenance's rewrite_data_files runs on both
+warehouses first, so the layout run also gets its z-order clustering.
+
+Needs the same jars as the pipeline ingest suite (--spark-packages).
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+LAYOUT_TABLES = ["order_items", "customers"]
+
+
+def queries(rows: dict[str, list[dict]], rng: random.Random, n: int) -> list[dict]:
+    """Point and range predicates on keys sampled from the generated rows."""
+    order_ids = [r["order_id"] for r in rows["order_items"]]
+    emails = sorted(r["email"] for r in rows["customers"])
+    out = []
+    for _ in range(n):
+        order_id = rng.choice(order_ids)
+        i = rng.randrange(len(emails))
+        out += [
+            {
+                "table": "order_items",
+                "kind": "point",
+                "where": f"order_id = {order_id}",
+            },
+            {
+                "table": "order_items",
+                "kind": "range",
+                "where": f"order_id BETWEEN {order_id} AND {order_id + 100}",
+            },
+            {
+                "table": "customers",
+                "kind": "point",
+                "where": f"email = '{emails[i]}'",
+            },
+            {
+                "table": "customers",
+                "kind": "range",
+                "where": (
+                    f"email BETWEEN '{emails[i]}' "
+                    f"AND '{emails[min(i + 100, len(emails) - 1)]}'"
+                ),
+            },
+        ]
+    return out
+
+
+def ingest(spark, raw_dir: Path, with_layout: bool, compact: bool) -> None:
+    from stage_maintenance import maintain_table
+    from storefront_raw_stage import ingest_tables, load_config
+
+    source = load_config()["sources"][0]
+    tables = []
+    for t in source["tables"]:
+        if t["name"] not in LAYOUT_TABLES:
+            continue
+        path = raw_dir / "kafka" / f"storefront.public.{t['name']}"
+        t = {**t, "source_path": path.as_uri() + "/"}
+        if not with_layout:
+            t.pop("layout", None)
+        tables.append(t)
+    ingest_tables(spark, tables, concurrency=len(tables))
+
+    if compact:
+        cfg = {**source["maintenance"], "min_input_files": 1}
+        for t in tables:
+            maintain_table(spark, t["name"], cfg, t.get("layout"))
+
+
+def time_queries(spark, specs: list[dict], repeat: int) -> list[dict]:
+    from storefront_raw_stage import STAGE_NAMESPACE, TABLE_CATALOG
+
+    results = []
+    for spec in specs:
+        sql = (
+            f"SELECT * FROM {TABLE_CATALOG}.{STAGE_NAMESPACE}.{spec['table']} "
+            f"WHERE {spec['where']}"
+        )
+        spark.sql(sql).collect()  # warm-up: planning caches and JIT
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = len(spark.sql(sql).collect())
+            timings.append(time.perf_counter() - start)
+        results.append({**spec, "rows": rows, "timings": timings})
+    return results
+
+
+def summarize(results: list[dict], layout: str) -> list[dict]:
+    summary = []
+    for table in LAYOUT_TABLES:
+        for kind in ["point", "range"]:
+            timings = [
+                t
+                for r in results
+                if r["table"] == table and r["kind"] == kind
+                for t in r["timings"]
+            ]
+            q = statistics.quantiles(timings, n=20, method="inclusive")
+            summary.append(
+                {
+                    "layout": layout,
+                    "table": table,
+                    "kind": kind,
+                    "runs": len(timings),
+                    "p50_ms": round(statistics.median(timings) * 1000, 1),
+                    "p95_ms": round(q[18] * 1000, 1),
+                }
+            )
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=20, help="Keys per kind")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spark-packages", help="spark.jars.packages for local runs")
+    parser.add_argument("--workdir", type=Path, help="Keep fixtures and warehouses")
+    parser.add_argument(
+        "--out", type=Path, help="Default: benchmarks/results/<commit>-layout.json"
+    )
+    args = parser.parse_args()
+
+    for path in ["scripts", "spark", "spark/jobs", "benchmarks"]:
+        sys.path.insert(0, str(ROOT / path))
+    os.chdir(ROOT)
+
+    import fixtures
+    from pipeline import get_bench_spark, git_commit
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="layout-bench-"))
+    raw_dir = workdir / "raw"
+    shutil.rmtree(raw_dir, ignore_errors=True)
+    rows = fixtures.generate_rows(args.orders, args.seed)
+    ts_ms = int(time.time() * 1000)
+    for table in LAYOUT_TABLES:
+        records = fixtures.envelopes(table, rows[table], ts_ms)
+        fixtures.write_sink_files(raw_dir, table, records, partitions=3)
+    specs = queries(rows, random.Random(args.seed), args.queries)
+
+    summary = []
+    try:
+        for layout in ["none", "configured"]:
+            warehouse = workdir / f"warehouse-{layout}"
+            shutil.rmtree(warehouse, ignore_errors=True)
+            # the warehouse is fixed per session, so one session per layout
+            spark = get_bench_spark(warehouse, args.spark_packages)
+            try:
+                ingest(spark, raw_dir, layout == "configured", args.compact)
+                summary += summarize(time_queries(spark, specs, args.repeat), layout)
+            finally:
+                spark.stop()
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'layout':<12}{'table':<13}{'kind':<7}{'p50_ms':>9}{'p95_ms':>9}")
+    for s in summary:
+        print(
+            f"{s['layout']:<12}{s['table']:<13}{s['kind']:<7}"
+            f"{s['p50_ms']:>9}{s['p95_ms']:>9}"
+        )
+
+    commit = git_commit()
+    out = args.out or ROOT / "benchmarks" / "results" / f"{commit}-layout.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "orders": args.orders,
+        "compact": args.compact,
+        "results": summary,
+    }
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+-- Commit times of the seeder's latency probes, keyed by probe, with the ids
+-- of every row a probe inserted per table (see seeder/probes.py)
+CREATE TABLE latency_probes (
+    probe_id TEXT PRIMARY KEY,
+    committed_at_ms BIGINT NOT NULL,
+    ids JSONB NOT NULL
+);
+
+CREATE INDEX latency_probes_committed_at_ms_idx ON latency_probes (committed_at_ms);
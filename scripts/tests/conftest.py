@@ -0,0 +1,9 @@
+from pathlib import Path
+import os
+import sys
+
+# utils reads .source.env/.lake.env from the working dir; the scripts are run
+# from the repo root
+ROOT = Path(__file__).resolve().parents[2]
+os.chdir(ROOT)
+sys.path.insert(0, str(ROOT / "scripts"))
@@ -0,0 +1,59 @@
+import io
+
+import fastavro
+import pytest
+
+import utils
+
+SCHEMA = {
+    "type": "record",
+    "name": "Envelope",
+    "namespace": "storefront.public.orders",
+    "fields": [
+        {"name": "id", "type": "int"},
+        {"name": "op", "type": "string"},
+    ],
+}
+
+
+def avro(records, codec="null", sync_interval=100):
+    buf = io.BytesIO()
+    fastavro.writer(
+        buf,
+        SCHEMA,
+        records,
+        codec=codec,
+        sync_interval=sync_interval,
+        metadata={"writer": "tests"},
+    )
+    return buf.getvalue()
+
+
+def events(n):
+    return [{"id": i, "op": "cud"[i % 3]} for i in range(n)]
+
+
+@pytest.mark.parametrize("codec", ["null", "deflate"])
+def test_count_avro_blocks_sums_every_block(codec):
+    data = avro(events(1000), codec)
+    blocks = sum(1 for _ in fastavro.block_reader(io.BytesIO(data)))
+
+    assert blocks > 1
+    assert utils.count_avro_blocks(data) == 1000
+
+
+def test_count_avro_blocks_of_empty_file():
+    assert utils.count_avro_blocks(avro([])) == 0
+
+
+def test_read_avro_header_rejects_other_files():
+    with pytest.raises(ValueError, match="Not an Avro"):
+        utils.read_avro_header(memoryview(b"PAR1" + bytes(16)))
+
+
+def test_count_avro_bytes_filters_ops():
+    data = avro(events(30))
+
+    assert utils.count_avro_bytes(data) == 30
+    assert utils.count_avro_bytes(data, ["c", "d"]) == 20
+    assert utils.avro_op_counts(data) == {"c": 10, "u": 10, "d": 10}
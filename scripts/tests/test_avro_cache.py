@@ -0,0 +1,121 @@
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = utils.AvroCountCache(tmp_path / "cache" / "avro_counts.sqlite")
+    yield cache
+    cache.close()
+
+
+def test_cache_loads_rows_of_a_prefix(cache):
+    cache.put("raw", "kafka/orders/0.avro", '"a"', 10, 3, {"c": 2, "d": 1})
+    cache.put("raw", "kafka/orders/1.avro", '"b"', 20, 5, None)
+    cache.put("raw", "kafka/payments/0.avro", '"c"', 30, 7, None)
+    cache.put("other", "kafka/orders/2.avro", '"d"', 40, 9, None)
+
+    assert cache.load_prefix("raw", "kafka/orders/") == {
+        "kafka/orders/0.avro": ('"a"', 10, 3, {"c": 2, "d": 1}),
+        "kafka/orders/1.avro": ('"b"', 20, 5, None),
+    }
+
+
+def test_cache_put_replaces_and_evict_removes(cache):
+    cache.put("raw", "k/0.avro", '"a"', 10, 3, None)
+    cache.put("raw", "k/0.avro", '"b"', 12, 4, {"c": 4})
+    cache.put("raw", "k/1.avro", '"c"', 10, 1, None)
+    cache.evict("raw", ["k/1.avro"])
+
+    assert cache.load_prefix("raw", "k/") == {"k/0.avro": ('"b"', 12, 4, {"c": 4})}
+
+
+def test_cache_persists_across_connections(tmp_path):
+    path = tmp_path / "avro_counts.sqlite"
+    first = utils.AvroCountCache(path)
+    first.put("raw", "k/0.avro", '"a"', 10, 3, None)
+    first.close()
+
+    second = utils.AvroCountCache(path)
+    assert second.load_prefix("raw", "k/") == {"k/0.avro": ('"a"', 10, 3, None)}
+    second.close()
+
+
+def test_count_avro_prefixes_counts_cached_objects_without_get(cache, monkeypatch):
+    objects = [
+        {"Key": "k/0.avro", "ETag": '"a"', "Size": 10},
+        {"Key": "k/1.avro", "ETag": '"b"', "Size": 10},
+    ]
+    fetched = []
+
+    def fetch_counts(s3, bucket, key, with_ops):
+        fetched.append(key)
+        return 4, ({"c": 3, "d": 1} if with_ops else None), 10
+
+    monkeypatch.setattr(utils, "list_s3_object_meta", lambda *a, **kw: iter(objects))
+    monkeypatch.setattr(utils, "_fetch_counts", fetch_counts)
+    cache.put("raw", "k/0.avro", '"a"', 10, 3, None)
+    cache.put("raw", "k/1.avro", '"stale"', 10, 3, None)
+    cache.put("raw", "k/gone.avro", '"c"', 10, 3, None)
+
+    stats = utils.count_avro_prefixes(
+        None, "raw", {"k": "k/"}, progress_every=0, cache=cache
+    )
+
+    assert stats["k"].records == 3 + 4
+    assert stats["k"].cached == 1
+    assert fetched == ["k/1.avro"]
+    assert set(cache.load_prefix("raw", "k/")) == {"k/0.avro", "k/1.avro"}
+
+    # a filtered count needs op counts, which unfiltered counts do not cache
+    fetched.clear()
+    stats = utils.count_avro_prefixes(
+        None, "raw", {"k": "k/"}, filter_ops=["c"], progress_every=0, cache=cache
+    )
+    assert sorted(fetched) == ["k/0.avro", "k/1.avro"]
+    assert stats["k"].records == 3 + 3
+
+    fetched.clear()
+    stats = utils.count_avro_prefixes(
+        None, "raw", {"k": "k/"}, filter_ops=["c"], progress_every=0, cache=cache
+    )
+    assert fetched == []
+    assert stats["k"].cached == 2
+
+
+def test_counts_survive_a_failed_run(tmp_path, monkeypatch):
+    path = tmp_path / "avro_counts.sqlite"
+    objects = [{"Key": f"k/{i}.avro", "ETag": f'"{i}"', "Size": 10} for i in range(3)]
+
+    def fetch_counts(s3, bucket, key, with_ops):
+        if key == "k/2.avro":
+            raise OSError(f"GET {key} failed")
+        return 4, None, 10
+
+    monkeypatch.setattr(utils, "list_s3_object_meta", lambda *a, **kw: iter(objects))
+    monkeypatch.setattr(utils, "_fetch_counts", fetch_counts)
+    cache = utils.AvroCountCache(path)
+    with pytest.raises(OSError):
+        utils.count_avro_prefixes(
+            None, "raw", {"k": "k/"}, max_workers=1, progress_every=0, cache=cache
+        )
+
+    # another connection sees the committed counts while the first stays open
+    other = utils.AvroCountCache(path)
+    assert set(other.load_prefix("raw", "k/")) == {"k/0.avro", "k/1.avro"}
+    other.close()
+    cache.close()
+
+
+def test_cache_commits_every_n_puts(tmp_path):
+    path = tmp_path / "avro_counts.sqlite"
+    cache = utils.AvroCountCache(path, commit_every=2)
+    other = utils.AvroCountCache(path)
+
+    cache.put("raw", "k/0.avro", '"a"', 10, 3, None)
+    assert other.load_prefix("raw", "k/") == {}
+    cache.put("raw", "k/1.avro", '"b"', 10, 3, None)
+    assert set(other.load_prefix("raw", "k/")) == {"k/0.avro", "k/1.avro"}
+    other.close()
+    cache.close()
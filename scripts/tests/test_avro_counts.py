@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def listed(monkeypatch):
+    """Fake listing of n objects per prefix that tracks fetches in flight."""
+    state = {"listed": 0, "fetched": 0, "max_in_flight": 0}
+    lock = threading.Lock()
+
+    def list_meta(s3, bucket, prefix, suffix=None):
+        for i in range(state["n"]):
+            with lock:
+                in_flight = state["listed"] - state["fetched"]
+                state["max_in_flight"] = max(state["max_in_flight"], in_flight)
+                state["listed"] += 1
+            yield {"Key": f"{prefix}/{i}.avro", "ETag": f'"{i}"', "Size": 10}
+
+    def fetch_counts(s3, bucket, key, with_ops):
+        time.sleep(0.001)
+        with lock:
+            state["fetched"] += 1
+        return 3, ({"c": 2, "d": 1} if with_ops else None), 10
+
+    monkeypatch.setattr(utils, "list_s3_object_meta", list_meta)
+    monkeypatch.setattr(utils, "_fetch_counts", fetch_counts)
+    return state
+
+
+def test_count_avro_prefixes_bounds_fetches_in_flight(listed):
+    listed["n"] = 500
+    stats = utils.count_avro_prefixes(
+        None, "raw", {"a": "a", "b": "b"}, max_workers=4, progress_every=0
+    )
+
+    assert stats["a"].records == stats["b"].records == 1500
+    # two listers may each hold one listed object while waiting for a slot
+    assert listed["max_in_flight"] <= 8 + 2
+
+
+def test_count_avro_prefixes_filters_ops(listed):
+    listed["n"] = 10
+    stats = utils.count_avro_prefixes(
+        None, "raw", {"a": "a"}, filter_ops=["c"], progress_every=0
+    )
+
+    assert stats["a"].records == 20
+
+
+def test_count_avro_prefixes_reraises_fetch_errors(listed, monkeypatch):
+    listed["n"] = 10
+
+    def failing(s3, bucket, key, with_ops):
+        raise OSError(f"GET {key} failed")
+
+    monkeypatch.setattr(utils, "_fetch_counts", failing)
+    with pytest.raises(OSError, match="GET a/"):
+        utils.count_avro_prefixes(None, "raw", {"a": "a"}, progress_every=0)
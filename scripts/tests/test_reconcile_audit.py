@@ -0,0 +1,74 @@
+from pyiceberg.table.snapshots import Operation, Snapshot, Summary
+
+from utils import reconcile_audit, snapshot_lineage
+
+
+class FakeTable:
+    """Snapshots in commit order, the last one current."""
+
+    def __init__(self, *snapshots):
+        self.snapshots = {s.snapshot_id: s for s in snapshots}
+        self.current = snapshots[-1] if snapshots else None
+
+    def current_snapshot(self):
+        return self.current
+
+    def snapshot_by_id(self, snapshot_id):
+        return self.snapshots.get(snapshot_id)
+
+
+def snapshot(snapshot_id, parent=None, operation=Operation.APPEND, added=1):
+    return Snapshot(
+        **{
+            "snapshot-id": snapshot_id,
+            "parent-snapshot-id": parent,
+            "sequence-number": snapshot_id,
+            "timestamp-ms": snapshot_id,
+            "manifest-list": f"s3://lakehouse/snap-{snapshot_id}.avro",
+            "summary": Summary(operation, **{"added-records": str(added)}),
+        }
+    )
+
+
+def row(snapshot_id, complete=True, **ops):
+    return {
+        "snapshot_id": snapshot_id,
+        "op_counts": list(ops.items()),
+        "null_counts": [("event_date", 1)],
+        "metrics_complete": complete,
+    }
+
+
+def test_snapshot_lineage_flags_expired_ancestors():
+    assert [s.snapshot_id for s in snapshot_lineage(FakeTable(snapshot(1)))[0]] == [1]
+    assert snapshot_lineage(FakeTable(snapshot(2, parent=1)))[1] is False
+    assert snapshot_lineage(FakeTable()) == ([], True)
+
+
+def test_reconcile_audit_sums_rows_of_the_lineage_only():
+    table = FakeTable(snapshot(1), snapshot(2, parent=1))
+    # snapshot 9 belonged to a dropped table of the same name
+    rows = [row(1, c=3), row(2, c=1, d=1), row(9, c=100)]
+
+    audited = reconcile_audit(table, rows)
+
+    assert audited["op_counts"] == {"c": 4, "d": 1}
+    assert audited["event_date_nulls"] == 2
+    assert audited["snapshots"] == 2
+
+
+def test_reconcile_audit_ignores_compactions_and_empty_commits():
+    table = FakeTable(
+        snapshot(1),
+        snapshot(2, parent=1, operation=Operation.REPLACE),
+        snapshot(3, parent=2, added=0),
+    )
+
+    assert reconcile_audit(table, [row(1, c=3)])["op_counts"] == {"c": 3}
+
+
+def test_reconcile_audit_needs_complete_rows_for_every_write():
+    table = FakeTable(snapshot(1), snapshot(2, parent=1))
+
+    assert reconcile_audit(table, [row(1, c=3)]) is None
+    assert reconcile_audit(table, [row(1, c=3), row(2, complete=False)]) is None
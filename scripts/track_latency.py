@@ -0,0 +1,146 @@
+import argparse
+import io
+import time
+import fastavro
+import pandas as pd
+from pyiceberg.expressions import In
+from utils import get_pg_conn, get_s3_client, list_s3_object_meta, load_hadoop_table
+
+TABLES = ["customers", "products", "orders", "order_items", "payments"]
+RAW_BUCKET = "raw"
+RAW_PREFIX = "kafka/storefront.public.{}"
+STAGE_BUCKET = "lakehouse"
+STAGE_PREFIX = "stage/storefront/{}"
+# commit -> Debezium -> S3 sink object -> stage snapshot
+HOPS = ["commit_to_debezium", "debezium_to_s3", "s3_to_stage", "end_to_end"]
+
+parser = argparse.ArgumentParser(
+    description="Report probe latency from Postgres commit to stage tables"
+)
+parser.add_argument(
+    "--minutes", type=float, default=60, help="Only look at probes this recent"
+)
+parser.add_argument("--window", default="5min", help="Time series bucket size")
+parser.add_argument("--out", help="Write per-probe latencies to this CSV file")
+args = parser.parse_args()
+
+
+def fetch_probes(since_ms: int) -> list[dict]:
+    """Probes the seeder stamped in Postgres, so they outlive its process."""
+    with get_pg_conn() as conn:
+        rows = conn.execute(
+            "SELECT probe_id, committed_at_ms, ids FROM latency_probes "
+            "WHERE committed_at_ms >= %s ORDER BY committed_at_ms",
+            (since_ms,),
+        ).fetchall()
+    return [{"probe_id": p, "committed_at_ms": ms, "ids": ids} for p, ms, ids in rows]
+
+
+def raw_arrivals(s3, table: str, ids: set[int], since_ms: int) -> dict[int, dict]:
+    """Debezium and S3 landing time of each probe's create event.
+
+    Only sink objects written after the oldest probe are read.
+    """
+    found = {}
+    prefix = RAW_PREFIX.format(table)
+    for obj in list_s3_object_meta(s3, RAW_BUCKET, prefix, suffix=".avro"):
+        landed_ms = int(obj["LastModified"].timestamp() * 1000)
+        if landed_ms < since_ms or len(found) == len(ids):
+            continue
+        body = s3.get_object(Bucket=RAW_BUCKET, Key=obj["Key"])["Body"].read()
+        for rec in fastavro.reader(io.BytesIO(body)):
+            after = rec.get("after")
+            if rec["op"] == "c" and after and after["id"] in ids:
+                found.setdefault(
+                    after["id"],
+                    {"debezium_ms": rec["ts_ms"], "s3_ms": landed_ms},
+                )
+    return found
+
+
+def stage_arrivals(s3, table: str, ids: set[int], since_ms: int) -> dict[int, int]:
+    """Commit time of the first stage snapshot that contains each probe.
+
+    Snapshots are checked oldest first, each only for probes not yet found.
+    If maintenance already expired that snapshot, a later one is reported.
+    """
+    stage = load_hadoop_table(s3, STAGE_BUCKET, STAGE_PREFIX.format(table))
+    pending = set(ids)
+    found = {}
+    for snapshot in sorted(stage.metadata.snapshots, key=lambda s: s.timestamp_ms):
+        if snapshot.timestamp_ms < since_ms or not pending:
+            continue
+        hits = stage.scan(
+            row_filter=In("id", pending),
+            selected_fields=("id",),
+            snapshot_id=snapshot.snapshot_id,
+        ).to_arrow()
+        for probe_id in set(hits.column("id").to_pylist()) & pending:
+            found[probe_id] = snapshot.timestamp_ms
+            pending.discard(probe_id)
+    return found
+
+
+def percentiles(df: pd.DataFrame, by: list[str]) -> pd.DataFrame:
+    return (
+        df.groupby(by)[HOPS]
+        .quantile([0.5, 0.95, 0.99])
+        .rename_axis(by + ["q"])
+        .unstack("q")
+        .round(1)
+    )
+
+
+s3 = get_s3_client()
+since_ms = int((time.time() - args.minutes * 60) * 1000)
+probes = fetch_probes(since_ms)
+if not probes:
+    raise SystemExit("No probes found; start the seeder with probe_interval set")
+oldest_ms = min(p["committed_at_ms"] for p in probes)
+print(f"Tracking {len(probes)} probes since {pd.to_datetime(oldest_ms, unit='ms')}")
+
+rows = []
+for table in TABLES:
+    ids = {row_id for p in probes for row_id in p["ids"][table]}
+    raw = raw_arrivals(s3, table, ids, oldest_ms)
+    stage = stage_arrivals(s3, table, ids, oldest_ms)
+    for p, row_id in ((p, i) for p in probes for i in p["ids"][table]):
+        r = raw.get(row_id, {})
+        stage_ms = stage.get(row_id)
+        rows.append(
+            {
+                "table": table,
+                "probe_id": p["probe_id"],
+                "row_id": row_id,
+                "committed_at": pd.to_datetime(p["committed_at_ms"], unit="ms"),
+                # stamped by the seeder once COMMIT returned, i.e. when the
+                # probe became visible to clients
+                "commit_ms": p["committed_at_ms"],
+                "debezium_ms": r.get("debezium_ms"),
+                "s3_ms": r.get("s3_ms"),
+                "stage_ms": stage_ms,
+            }
+        )
+
+df = pd.DataFrame(rows)
+ms = df[["commit_ms", "debezium_ms", "s3_ms", "stage_ms"]].astype("float")
+df["commit_to_debezium"] = (ms["debezium_ms"] - ms["commit_ms"]) / 1000
+df["debezium_to_s3"] = (ms["s3_ms"] - ms["debezium_ms"]) / 1000
+df["s3_to_stage"] = (ms["stage_ms"] - ms["s3_ms"]) / 1000
+df["end_to_end"] = (ms["stage_ms"] - ms["commit_ms"]) / 1000
+
+landed = df.groupby("table").agg(
+    rows=("row_id", "size"), in_raw=("s3_ms", "count"), in_stage=("stage_ms", "count")
+)
+print(landed.assign(probes=len(probes)))
+
+print("\nLatency per hop in seconds (p50 / p95 / p99)")
+print(percentiles(df, ["table"]))
+
+print(f"\nEnd-to-end latency per {args.window} window in seconds")
+df["window"] = df["committed_at"].dt.floor(args.window)
+print(percentiles(df, ["window", "table"])["end_to_end"])
+
+if args.out:
+    df.drop(columns="window").to_csv(args.out, index=False)
+    print(f"\nWrote {len(df)} rows to {args.out}")
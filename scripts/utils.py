@@ -1,15 +1,28 @@
-from typing import Iterator, Optional
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import io
+import json
+import sqlite3
+import threading
+import time
 import boto3
+from botocore.config import Config
 from dotenv import dotenv_values
 import psycopg
-from smart_open import open as smart_open
+from psycopg import IsolationLevel, sql
 import fastavro
 import pandas as pd
+from pyiceberg.table import StaticTable
 
 
 source_env = dotenv_values(".source.env")
 lake_env = dotenv_values(".lake.env")
 
+AVRO_COUNT_CACHE_PATH = Path(".cache/avro_counts.sqlite")
+
 
 pd.set_option("display.max_rows", None)
 pd.set_option("display.max_columns", None)
@@ -18,13 +31,14 @@ pd.set_option("display.max_colwidth", None)
 pd.set_option("display.expand_frame_repr", False)
 
 
-def get_s3_client() -> boto3.client:
+def get_s3_client(max_pool_connections: int = 10) -> boto3.client:
     return boto3.client(
         "s3",
         endpoint_url=lake_env["MINIO_ENDPOINT"],
         aws_access_key_id=lake_env["MINIO_ROOT_USER"],
         aws_secret_access_key=lake_env["MINIO_ROOT_PASSWORD"],
         region_name="us-east-1",
+        config=Config(max_pool_connections=max_pool_connections),
     )
 
 
@@ -38,35 +52,509 @@ def get_pg_conn() -> psycopg.Connection:
     )
 
 
-def get_table_row_counts(conn: psycopg.Connection, tables: list[str]) -> dict[str, int]:
-    counts = {}
-    with conn.cursor() as cur:
-        for table in tables:
+@dataclass
+class TableCounts:
+    counts: dict[str, int]
+    lsn: str  # WAL position the counts correspond to
+    estimated: bool = False
+
+
+def _count_in_snapshot(snapshot_id: str, table: str) -> int:
+    with get_pg_conn() as conn:
+        conn.isolation_level = IsolationLevel.REPEATABLE_READ
+        with conn.cursor() as cur:
+            cur.execute(
+                sql.SQL("SET TRANSACTION SNAPSHOT {}").format(sql.Literal(snapshot_id))
+            )
             cur.execute(f"SELECT COUNT(*) FROM public.{table}")
-            counts[table] = cur.fetchone()[0]
-    return counts
+            return cur.fetchone()[0]
 
 
-def list_s3_objects(
+def get_table_row_counts(
+    conn: psycopg.Connection,
+    tables: list[str],
+    estimate: bool = False,
+    max_workers: int = 4,
+) -> TableCounts:
+    """Count rows of several tables as of one point in time.
+
+    Exact counts run in a REPEATABLE READ transaction whose snapshot is
+    exported with pg_export_snapshot and imported by up to max_workers extra
+    connections, so the tables are scanned concurrently and agree with each
+    other even while the seeder is writing. With estimate, the planner
+    statistics (pg_class.reltuples, or n_live_tup before the first ANALYZE)
+    are returned instead, without scanning. The LSN is read together with the
+    snapshot and can be compared with the CDC offsets.
+    """
+    if estimate:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT c.relname,
+                       CASE WHEN c.reltuples < 0 THEN s.n_live_tup
+                            ELSE c.reltuples::bigint END,
+                       pg_current_wal_lsn()::text
+                FROM pg_class c
+                JOIN pg_stat_user_tables s ON s.relid = c.oid
+                WHERE s.schemaname = 'public' AND c.relname = ANY(%s)
+                """,
+                (tables,),
+            )
+            rows = cur.fetchall()
+        conn.rollback()
+        estimates = {name: n for name, n, _ in rows}
+        lsn = rows[0][2] if rows else ""
+        return TableCounts({t: estimates.get(t, 0) for t in tables}, lsn, True)
+
+    conn.rollback()
+    conn.isolation_level = IsolationLevel.REPEATABLE_READ
+    try:
+        with conn.cursor() as cur:
+            # the snapshot is taken by this first statement and stays
+            # importable until the transaction ends
+            cur.execute("SELECT pg_export_snapshot(), pg_current_wal_lsn()::text")
+            snapshot_id, lsn = cur.fetchone()
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                counts = dict(
+                    zip(
+                        tables,
+                        pool.map(lambda t: _count_in_snapshot(snapshot_id, t), tables),
+                    )
+                )
+    finally:
+        conn.rollback()
+        conn.isolation_level = None
+    return TableCounts(counts, lsn)
+
+
+def list_s3_object_meta(
     s3: boto3.client, bucket: str, prefix: str, suffix: Optional[str] = None
-) -> Iterator[str]:
+) -> Iterator[dict]:
     paginator = s3.get_paginator("list_objects_v2")
     for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
         for obj in page.get("Contents", []):
-            key = obj["Key"]
-            if suffix is None or key.endswith(suffix):
-                yield key
+            if suffix is None or obj["Key"].endswith(suffix):
+                yield obj
 
 
-def count_avro_records(
-    s3: boto3.client, bucket: str, prefix: str, filter_ops: Optional[list[str]] = None
-) -> int:
+def list_s3_objects(
+    s3: boto3.client, bucket: str, prefix: str, suffix: Optional[str] = None
+) -> Iterator[str]:
+    for obj in list_s3_object_meta(s3, bucket, prefix, suffix):
+        yield obj["Key"]
+
+
+@dataclass
+class PrefixStats:
+    prefix: str
+    objects: int = 0
+    bytes: int = 0
+    records: int = 0
+    cached: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+
+    @property
+    def objects_per_sec(self) -> float:
+        return self.objects / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.bytes / 1_048_576 / self.elapsed if self.elapsed else 0.0
+
+
+AVRO_MAGIC = b"Obj\x01"
+AVRO_SYNC_SIZE = 16
+
+
+def _read_avro_long(buf: memoryview, pos: int) -> tuple[int, int]:
+    """Decode a zigzag varint at pos; returns (value, next position)."""
+    b = buf[pos]
+    n = b & 0x7F
+    shift = 7
+    pos += 1
+    while b & 0x80:
+        b = buf[pos]
+        n |= (b & 0x7F) << shift
+        shift += 7
+        pos += 1
+    return (n >> 1) ^ -(n & 1), pos
+
+
+def read_avro_header(buf: memoryview) -> tuple[dict[str, bytes], int]:
+    """Parse an Avro container header; returns (metadata, first block offset)."""
+    if bytes(buf[:4]) != AVRO_MAGIC:
+        raise ValueError("Not an Avro object container file")
+    meta = {}
+    pos = 4
+    while True:
+        count, pos = _read_avro_long(buf, pos)
+        if count == 0:
+            break
+        if count < 0:  # negative count is followed by the block size in bytes
+            count = -count
+            _, pos = _read_avro_long(buf, pos)
+        for _ in range(count):
+            size, pos = _read_avro_long(buf, pos)
+            key = bytes(buf[pos : pos + size]).decode()
+            pos += size
+            size, pos = _read_avro_long(buf, pos)
+            meta[key] = bytes(buf[pos : pos + size])
+            pos += size
+    return meta, pos + AVRO_SYNC_SIZE
+
+
+def count_avro_blocks(data: bytes) -> int:
+    """Sum the record counts of all block headers without decoding records."""
+    buf = memoryview(data)
+    _, pos = read_avro_header(buf)
     total = 0
-    for key in list_s3_objects(s3, bucket, prefix, suffix=".avro"):
-        with smart_open(
-            f"s3://{bucket}/{key}", "rb", transport_params={"client": s3}
-        ) as fh:
-            for rec in fastavro.reader(fh):
-                if not filter_ops or rec.get("op") in filter_ops:
-                    total += 1
+    while pos < len(buf):
+        count, pos = _read_avro_long(buf, pos)
+        size, pos = _read_avro_long(buf, pos)
+        total += count
+        pos += size + AVRO_SYNC_SIZE
     return total
+
+
+def _op_reader_schema(meta: dict[str, bytes]) -> dict:
+    """Reader schema projecting the writer schema down to the `op` field."""
+    writer = json.loads(meta["avro.schema"])
+    op_field = next(f for f in writer["fields"] if f["name"] == "op")
+    projected = {"type": "record", "name": writer["name"], "fields": [op_field]}
+    if "namespace" in writer:
+        projected["namespace"] = writer["namespace"]
+    return projected
+
+
+def avro_op_counts(data: bytes) -> dict[str, int]:
+    meta, _ = read_avro_header(memoryview(data))
+    reader = fastavro.reader(io.BytesIO(data), reader_schema=_op_reader_schema(meta))
+    return dict(Counter(rec["op"] for rec in reader))
+
+
+def count_avro_bytes(data: bytes, filter_ops: Optional[list[str]] = None) -> int:
+    if not filter_ops:
+        return count_avro_blocks(data)
+    return sum(n for op, n in avro_op_counts(data).items() if op in filter_ops)
+
+
+def _matching(
+    total: int, op_counts: Optional[dict[str, int]], filter_ops: Optional[list[str]]
+) -> int:
+    if not filter_ops:
+        return total
+    return sum(op_counts.get(op, 0) for op in filter_ops)
+
+
+class AvroCountCache:
+    """SQLite cache of per-object record counts, keyed by bucket/key/ETag/size.
+
+    Sink objects are immutable, so a row stays valid while ETag and size
+    match. Per-op counts are only filled in once a filtered count needs them.
+    Writes are committed every commit_every puts, so a failed run keeps the
+    counts it made.
+    """
+
+    def __init__(
+        self, path: str | Path = AVRO_COUNT_CACHE_PATH, commit_every: int = 1000
+    ):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.commit_every = commit_every
+        self.pending = 0
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS avro_counts (
+                bucket TEXT NOT NULL,
+                key TEXT NOT NULL,
+                etag TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                records INTEGER NOT NULL,
+                op_counts TEXT,
+                PRIMARY KEY (bucket, key)
+            )
+            """
+        )
+
+    def load_prefix(self, bucket: str, prefix: str) -> dict[str, tuple]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT key, etag, size, records, op_counts FROM avro_counts "
+                "WHERE bucket = ? AND substr(key, 1, ?) = ?",
+                (bucket, len(prefix), prefix),
+            ).fetchall()
+        return {
+            key: (etag, size, records, json.loads(ops) if ops else None)
+            for key, etag, size, records, ops in rows
+        }
+
+    def put(
+        self,
+        bucket: str,
+        key: str,
+        etag: str,
+        size: int,
+        records: int,
+        op_counts: Optional[dict[str, int]],
+    ) -> None:
+        ops = None if op_counts is None else json.dumps(op_counts)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO avro_counts VALUES (?, ?, ?, ?, ?, ?)",
+                (bucket, key, etag, size, records, ops),
+            )
+            self.pending += 1
+            if self.pending >= self.commit_every:
+                self.conn.commit()
+                self.pending = 0
+
+    def evict(self, bucket: str, keys: Iterable[str]) -> None:
+        with self.lock:
+            self.conn.executemany(
+                "DELETE FROM avro_counts WHERE bucket = ? AND key = ?",
+                [(bucket, key) for key in keys],
+            )
+
+    def commit(self) -> None:
+        with self.lock:
+            self.conn.commit()
+            self.pending = 0
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+
+def _fetch_counts(
+    s3: boto3.client, bucket: str, key: str, with_ops: bool
+) -> tuple[int, Optional[dict[str, int]], int]:
+    body = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+    op_counts = avro_op_counts(body) if with_ops else None
+    total = count_avro_blocks(body) if op_counts is None else sum(op_counts.values())
+    return total, op_counts, len(body)
+
+
+def count_avro_prefixes(
+    s3: boto3.client,
+    bucket: str,
+    prefixes: dict[str, str],
+    filter_ops: Optional[list[str]] = None,
+    max_workers: int = 32,
+    progress_every: int = 1000,
+    cache: Optional[AvroCountCache] = None,
+    max_in_flight: Optional[int] = None,
+) -> dict[str, PrefixStats]:
+    """Count Avro records under several prefixes with overlapping I/O.
+
+    One lister thread per prefix pages through the objects and submits each
+    key to a shared, bounded fetch pool as soon as it is listed. At most
+    max_in_flight fetches (default 2 * max_workers) are queued or running;
+    listers wait for a free slot, so memory stays flat on large prefixes.
+    Objects are read into memory with a single GET. Give the S3 client at
+    least max_workers pooled connections (see get_s3_client). With a cache,
+    objects whose ETag and size are already known are counted without a GET,
+    and cached keys that are no longer listed are evicted.
+    """
+    stats = {name: PrefixStats(prefix) for name, prefix in prefixes.items()}
+    lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(max_in_flight or 2 * max_workers)
+    errors: list[BaseException] = []
+
+    def record(name: str, records: int, size: int, cached: bool) -> None:
+        st = stats[name]
+        with lock:
+            st.objects += 1
+            st.bytes += size
+            st.records += records
+            st.cached += cached
+            st.elapsed = time.perf_counter() - st.started
+            if progress_every and st.objects % progress_every == 0:
+                print(
+                    f"{name}: {st.objects} objects ({st.cached} cached), "
+                    f"{st.records} records "
+                    f"({st.objects_per_sec:.0f} obj/s, {st.mb_per_sec:.1f} MB/s)"
+                )
+
+    def fetch(name: str, obj: dict) -> None:
+        key = obj["Key"]
+        total, op_counts, size = _fetch_counts(s3, bucket, key, bool(filter_ops))
+        if cache:
+            cache.put(bucket, key, obj["ETag"], size, total, op_counts)
+        record(name, _matching(total, op_counts, filter_ops), size, False)
+
+    def fetched(future: Future) -> None:
+        in_flight.release()
+        if future.exception() is not None:
+            errors.append(future.exception())
+
+    # counts of a failed run are committed too, so the next one reuses them
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as fetch_pool:
+
+            def list_and_submit(name: str, prefix: str) -> None:
+                known = cache.load_prefix(bucket, prefix) if cache else {}
+                seen = set()
+                for obj in list_s3_object_meta(s3, bucket, prefix, suffix=".avro"):
+                    seen.add(obj["Key"])
+                    hit = known.get(obj["Key"])
+                    if (
+                        hit
+                        and hit[:2] == (obj["ETag"], obj["Size"])
+                        and (not filter_ops or hit[3] is not None)
+                    ):
+                        record(name, _matching(hit[2], hit[3], filter_ops), 0, True)
+                    else:
+                        in_flight.acquire()
+                        fetch_pool.submit(fetch, name, obj).add_done_callback(fetched)
+                if cache:
+                    cache.evict(bucket, known.keys() - seen)
+
+            with ThreadPoolExecutor(max_workers=len(prefixes) or 1) as list_pool:
+                for lister in [
+                    list_pool.submit(list_and_submit, name, prefix)
+                    for name, prefix in prefixes.items()
+                ]:
+                    lister.result()
+    finally:
+        if cache:
+            cache.commit()
+
+    if errors:
+        raise errors[0]
+    for st in stats.values():
+        st.elapsed = time.perf_counter() - st.started
+    return stats
+
+
+def count_avro_records(
+    s3: boto3.client,
+    bucket: str,
+    prefix: str,
+    filter_ops: Optional[list[str]] = None,
+    cache: Optional[AvroCountCache] = None,
+) -> int:
+    stats = count_avro_prefixes(s3, bucket, {prefix: prefix}, filter_ops, cache=cache)
+    return stats[prefix].records
+
+
+ICEBERG_S3_PROPERTIES = {
+    "s3.endpoint": lake_env["MINIO_ENDPOINT"],
+    "s3.access-key-id": lake_env["MINIO_ROOT_USER"],
+    "s3.secret-access-key": lake_env["MINIO_ROOT_PASSWORD"],
+    "s3.region": "us-east-1",
+}
+
+
+def load_hadoop_table(s3: boto3.client, bucket: str, table_path: str) -> StaticTable:
+    """Load the current metadata of a table written by Spark's Hadoop catalog.
+
+    The Hadoop catalog has no service to ask, so the current version is read
+    from `metadata/version-hint.text` next to the `vN.metadata.json` files.
+    """
+    metadata = f"{table_path.rstrip('/')}/metadata"
+    hint = s3.get_object(Bucket=bucket, Key=f"{metadata}/version-hint.text")
+    version = hint["Body"].read().decode().strip()
+    return StaticTable.from_metadata(
+        f"s3://{bucket}/{metadata}/v{version}.metadata.json",
+        properties=ICEBERG_S3_PROPERTIES,
+    )
+
+
+@dataclass
+class IcebergTableStats:
+    snapshot_id: Optional[int]
+    rows: int
+    null_counts: dict[str, Optional[int]]
+    partitions: list[dict]
+    data_files: int
+    delete_files: int
+
+    @property
+    def rows_exact(self) -> bool:
+        # manifest record counts ignore rows removed by delete files
+        return self.delete_files == 0
+
+
+def iceberg_table_stats(table: StaticTable) -> IcebergTableStats:
+    """Row count, per-column null counts and partitions from manifest metadata.
+
+    Only the current snapshot's live files are read, never the data itself.
+    A column's null count is None when a data file carries no null-count
+    metric for it (e.g. metrics mode `none`).
+    """
+    snapshot = table.current_snapshot()
+    files = table.inspect.files().to_pylist() if snapshot else []
+    data = [f for f in files if f["content"] == 0]
+
+    null_counts: dict[str, Optional[int]] = {}
+    for column in table.schema().fields:
+        counts = [dict(f["null_value_counts"] or []).get(column.field_id) for f in data]
+        null_counts[column.name] = None if None in counts else sum(counts)
+
+    partitions = (
+        table.inspect.partitions().column("partition").to_pylist() if snapshot else []
+    )
+    return IcebergTableStats(
+        snapshot_id=snapshot.snapshot_id if snapshot else None,
+        rows=sum(f["record_count"] for f in data),
+        null_counts=null_counts,
+        partitions=partitions,
+        data_files=len(data),
+        delete_files=len(files) - len(data),
+    )
+
+
+def snapshot_lineage(table: StaticTable) -> tuple[list, bool]:
+    """Snapshots from the current one back through its kept ancestors.
+
+    The flag is False when the lineage stops at an expired ancestor, i.e. it
+    does not reach back to the table's first snapshot.
+    """
+    lineage = []
+    snapshot = table.current_snapshot()
+    while snapshot is not None:
+        lineage.append(snapshot)
+        if snapshot.parent_snapshot_id is None:
+            return lineage, True
+        snapshot = table.snapshot_by_id(snapshot.parent_snapshot_id)
+    return lineage, not lineage
+
+
+def reconcile_audit(table: StaticTable, rows: list[dict]) -> Optional[dict]:
+    """Sum a table's ingest audit rows over the snapshots the table still has.
+
+    Rows of snapshots outside the current lineage (a dropped and re-created
+    table, a rollback) are left out. The result is None, i.e. the audit
+    cannot stand in for a recount, when a lineage snapshot that changed rows
+    has no complete audit row, or when older snapshots were expired.
+    Compactions (`replace`) do not change rows and need no audit row.
+    """
+    lineage, complete = snapshot_lineage(table)
+    if not complete:
+        return None
+    by_snapshot = {r["snapshot_id"]: r for r in rows}
+    audited = []
+    for snapshot in lineage:
+        row = by_snapshot.get(snapshot.snapshot_id)
+        if row is not None and row["metrics_complete"]:
+            audited.append(row)
+            continue
+        summary = snapshot.summary
+        changed = any(
+            int(summary.get(k) or 0) > 0 for k in ("added-records", "deleted-records")
+        )
+        if changed and summary.operation.value != "replace":
+            return None
+
+    op_counts, event_date_nulls = Counter(), 0
+    for row in audited:
+        op_counts.update(dict(row["op_counts"] or []))
+        event_date_nulls += dict(row["null_counts"] or []).get("event_date", 0)
+    return {
+        "op_counts": op_counts,
+        "event_date_nulls": event_date_nulls,
+        "snapshots": len(audited),
+    }
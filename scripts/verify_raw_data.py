@@ -1,24 +1,60 @@
+import argparse
 import pandas as pd
-from utils import get_s3_client, get_pg_conn, get_table_row_counts, count_avro_records
+from utils import (
+    AvroCountCache,
+    get_s3_client,
+    get_pg_conn,
+    get_table_row_counts,
+    count_avro_prefixes,
+)
+
+parser = argparse.ArgumentParser(description="Compare Postgres and raw Avro counts")
+parser.add_argument(
+    "--no-cache", action="store_true", help="Recount every object, ignoring the cache"
+)
+parser.add_argument(
+    "--estimate",
+    action="store_true",
+    help="Use Postgres planner estimates instead of exact snapshot counts",
+)
+args = parser.parse_args()
 
 tables = ["customers", "order_items", "orders", "payments", "products"]
 bucket = "raw"
 prefix_template = "kafka/storefront.public.{}"
+max_workers = 32
 
-s3 = get_s3_client()
+s3 = get_s3_client(max_pool_connections=max_workers)
 conn = get_pg_conn()
-tables_actual_counts = get_table_row_counts(conn, tables)
+pg_counts = get_table_row_counts(conn, tables, estimate=args.estimate)
+print(f"Postgres counts at LSN {pg_counts.lsn} (estimated: {pg_counts.estimated})")
+cache = None if args.no_cache else AvroCountCache()
+
+try:
+    raw_stats = count_avro_prefixes(
+        s3,
+        bucket,
+        {table: prefix_template.format(table) for table in tables},
+        max_workers=max_workers,
+        cache=cache,
+    )
+finally:
+    if cache:
+        cache.close()
 
 record_counts = []
-for table, expected in tables_actual_counts.items():
-    prefix = prefix_template.format(table)
-    actual = count_avro_records(s3, bucket, prefix)
+for table, expected in pg_counts.counts.items():
+    st = raw_stats[table]
     record_counts.append(
         {
             "table": table,
             "postgres_count": expected,
-            "s3_count": actual,
-            "match": expected == actual,
+            "s3_count": st.records,
+            "match": expected == st.records,
+            "s3_objects": st.objects,
+            "cached": st.cached,
+            "obj_per_sec": round(st.objects_per_sec, 1),
+            "mb_per_sec": round(st.mb_per_sec, 2),
         }
     )
 
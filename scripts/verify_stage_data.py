@@ -1,14 +1,37 @@
 from urllib.parse import urlparse
+import argparse
 import pandas as pd
 import polars as pl
 import yaml
-from utils import get_s3_client, count_avro_records, lake_env
-
-s3 = get_s3_client()
+from utils import (
+    AvroCountCache,
+    get_s3_client,
+    count_avro_records,
+    iceberg_table_stats,
+    lake_env,
+    load_hadoop_table,
+    reconcile_audit,
+)
+
+parser = argparse.ArgumentParser(description="Compare raw Avro and stage counts")
+parser.add_argument(
+    "--no-cache", action="store_true", help="Recount every object, ignoring the cache"
+)
+parser.add_argument(
+    "--audit",
+    action="store_true",
+    help="Take raw counts from the ingest audit table where it covers the stage "
+    "snapshots, instead of recounting Avro",
+)
+args = parser.parse_args()
+
+s3 = get_s3_client(max_pool_connections=32)
+cache = None if args.no_cache else AvroCountCache()
 
 CFG_PATH = "spark/jobs/stage_tables.yaml"
 BUCKET_STAGE = "lakehouse"
 PREFIX_STAGE = "stage/storefront/"
+AUDIT_TABLE_PATH = "audit/stage_ingest"
 
 storage_options = {
     "aws_access_key_id": lake_env["MINIO_ROOT_USER"],
@@ -22,41 +45,38 @@ def load_cfg():
         return yaml.safe_load(f)
 
 
-def scan_stage_table(base: str) -> pl.LazyFrame:
-    return pl.scan_parquet(
-        f"{base}**/*.parquet",
-        storage_options=storage_options,
-        low_memory=True,
-    )
-
-
 def parse_raw_bucket_and_prefix(source_path: str):
     parsed = urlparse(source_path.replace("s3a://", "s3://"))
     return parsed.netloc, parsed.path.lstrip("/")
 
 
-def pl_dtype_to_canonical(dt: pl.DataType) -> str:
-    if dt == pl.Int64:
-        return "bigint"
-    if dt == pl.Int32:
-        return "int"
-    if dt == pl.Int16:
-        return "smallint"
-    if dt == pl.Int8:
-        return "tinyint"
-    if dt == pl.Utf8:
-        return "string"
-    if dt == pl.Boolean:
-        return "boolean"
-    if dt == pl.Float32:
-        return "float"
-    if dt == pl.Float64:
-        return "double"
-    if dt == pl.Date:
-        return "date"
-    if isinstance(dt, pl.Decimal):
-        return f"decimal({dt.precision},{dt.scale})"
-    return str(dt).lower()
+def iceberg_type_to_canonical(field_type) -> str:
+    s = str(field_type).replace(" ", "")
+    return {"long": "bigint", "integer": "int"}.get(s, s)
+
+
+def scan_stage_stats(table, has_event_date: bool) -> tuple[int, int]:
+    """Row count and event_date non-nulls in one aggregation over live files."""
+    exprs = [pl.len()]
+    if has_event_date:
+        exprs.append(pl.col("event_date").is_not_null().sum())
+    row = (
+        pl.scan_iceberg(table, storage_options=storage_options)
+        .select(exprs)
+        .collect()
+        .row(0)
+    )
+    return row[0], row[1] if has_event_date else 0
+
+
+def audit_rows() -> dict[str, list[dict]]:
+    """Ingest audit rows per table, see utils.reconcile_audit."""
+    table = load_hadoop_table(s3, BUCKET_STAGE, AUDIT_TABLE_PATH)
+    fields = ("table", "snapshot_id", "op_counts", "null_counts", "metrics_complete")
+    rows = {}
+    for r in table.scan(selected_fields=fields).to_arrow().to_pylist():
+        rows.setdefault(r["table"], []).append(r)
+    return rows
 
 
 def yaml_type_to_canonical(s: str) -> str:
@@ -66,51 +86,80 @@ def yaml_type_to_canonical(s: str) -> str:
 cfg = load_cfg()
 tables_cfg = cfg["sources"][0]["tables"]
 records = []
-
-for t in tables_cfg:
-    name = t["name"]
-    filter_ops = t.get("filter_op", [])
-    source_path = t["source_path"]
-
-    raw_bucket, raw_prefix = parse_raw_bucket_and_prefix(source_path)
-    raw_count = count_avro_records(s3, raw_bucket, raw_prefix, filter_ops)
-
-    base = f"s3://{BUCKET_STAGE}/{PREFIX_STAGE}{name}/"
-    lf = scan_stage_table(base)
-    stage_schema = lf.schema
-    stage_count = lf.select(pl.len()).collect().item()
-
-    expected_cols = {c["name"]: yaml_type_to_canonical(c["type"]) for c in t["schema"]}
-    expected_cols["event_date"] = "date"
-
-    missing = [c for c in expected_cols if c not in stage_schema]
-    mismatches = [
-        f"{c}: expected {expected_cols[c]}, got {pl_dtype_to_canonical(stage_schema[c])}"
-        for c in expected_cols
-        if c in stage_schema
-        and pl_dtype_to_canonical(stage_schema[c]) != expected_cols[c]
-    ]
-    schema_match = len(missing) == 0 and len(mismatches) == 0
-
-    if "event_date" in stage_schema:
-        event_date_non_nulls = (
-            lf.select(pl.col("event_date").is_not_null().sum()).collect().item()
-        )
-        event_date_ok = event_date_non_nulls > 0
-    else:
-        event_date_ok = False
-
-    records.append(
-        {
-            "table": name,
-            "raw_avro_count": raw_count,
-            "stage_parquet_count": stage_count,
-            "counts_match": raw_count == stage_count,
-            "schema_match": schema_match,
-            "event_date_non_null": event_date_ok,
-            "issues": "; ".join(missing + mismatches),
+audit = audit_rows() if args.audit else {}
+
+try:
+    for t in tables_cfg:
+        name = t["name"]
+        filter_ops = t.get("filter_op", [])
+        source_path = t["source_path"]
+
+        table = load_hadoop_table(s3, BUCKET_STAGE, f"{PREFIX_STAGE}{name}")
+        audited = reconcile_audit(table, audit[name]) if name in audit else None
+        if audited:
+            ops = audited["op_counts"]
+            raw_count = sum(ops[op] for op in filter_ops) if filter_ops else ops.total()
+        else:
+            raw_bucket, raw_prefix = parse_raw_bucket_and_prefix(source_path)
+            raw_count = count_avro_records(
+                s3, raw_bucket, raw_prefix, filter_ops, cache
+            )
+
+        stats = iceberg_table_stats(table)
+        stage_schema = {
+            f.name: iceberg_type_to_canonical(f.field_type)
+            for f in table.schema().fields
         }
-    )
+        has_event_date = "event_date" in stage_schema
+        event_date_nulls = stats.null_counts.get("event_date")
+
+        if stats.rows_exact and not (has_event_date and event_date_nulls is None):
+            stats_source = "manifest"
+            stage_count = stats.rows
+            event_date_non_nulls = stats.rows - (event_date_nulls or 0)
+        elif audited and stats.rows_exact and t.get("mode", "append") == "append":
+            # merged rows are rewritten on update, so summed audit nulls overcount
+            stats_source = "audit"
+            stage_count = stats.rows
+            event_date_non_nulls = stats.rows - audited["event_date_nulls"]
+        else:
+            stats_source = "scan"
+            stage_count, event_date_non_nulls = scan_stage_stats(table, has_event_date)
+
+        expected_cols = {
+            c["name"]: yaml_type_to_canonical(c["type"]) for c in t["schema"]
+        }
+        expected_cols["event_date"] = "date"
+
+        missing = [c for c in expected_cols if c not in stage_schema]
+        mismatches = [
+            f"{c}: expected {expected_cols[c]}, got {stage_schema[c]}"
+            for c in expected_cols
+            if c in stage_schema and stage_schema[c] != expected_cols[c]
+        ]
+        schema_match = len(missing) == 0 and len(mismatches) == 0
+
+        event_date_ok = has_event_date and event_date_non_nulls > 0
+
+        records.append(
+            {
+                "table": name,
+                "raw_avro_count": raw_count,
+                "raw_source": "audit" if audited else "avro",
+                "stage_count": stage_count,
+                "counts_match": raw_count == stage_count,
+                "schema_match": schema_match,
+                "event_date_non_null": event_date_ok,
+                "partitions": len(stats.partitions),
+                "snapshot_id": stats.snapshot_id,
+                "stats_source": stats_source,
+                "audited_snapshots": audited["snapshots"] if audited else None,
+                "issues": "; ".join(missing + mismatches),
+            }
+        )
+finally:
+    if cache:
+        cache.close()
 
 df = pd.DataFrame(records)
 print(df)
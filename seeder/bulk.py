@@ -0,0 +1,116 @@
+import logging
+import time
+
+import numpy as np
+import psycopg
+
+from database import engine
+from generator import ColumnarGenerator
+from metrics import BATCH_PHASE_SECONDS
+from seed import seed_stats
+
+logger = logging.getLogger(__name__)
+
+TABLE_COLUMNS = {
+    "customers": [
+        "id",
+        "full_name",
+        "email",
+        "address",
+        "city",
+        "country",
+        "created_at",
+    ],
+    "products": ["id", "name", "category", "price", "stock_quantity", "created_at"],
+    "orders": ["id", "customer_id", "status", "total", "created_at"],
+    "order_items": ["id", "order_id", "product_id", "quantity", "price_at_purchase"],
+    "payments": ["id", "order_id", "payment_method", "paid_at", "amount", "status"],
+}
+
+
+def reserve_ids(cur: psycopg.Cursor, table: str, n: int) -> np.ndarray:
+    """Draw n ids from the table's SERIAL sequence in one round trip."""
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    cur.execute(
+        "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+        (table, n),
+    )
+    return np.array([r[0] for r in cur.fetchall()], dtype=np.int64)
+
+
+def copy_rows(cur: psycopg.Cursor, table: str, columns: dict[str, np.ndarray]) -> None:
+    names = TABLE_COLUMNS[table]
+    with cur.copy(f"COPY {table} ({', '.join(names)}) FROM STDIN") as copy:
+        for row in zip(*(columns[c].tolist() for c in names)):
+            copy.write_row(row)
+
+
+def build_batch(
+    cur: psycopg.Cursor, gen: ColumnarGenerator, order_count: int
+) -> dict[str, dict[str, np.ndarray]]:
+    customers = gen.customers(reserve_ids(cur, "customers", max(1, order_count // 2)))
+    products = gen.products(reserve_ids(cur, "products", order_count))
+    orders = gen.orders(reserve_ids(cur, "orders", order_count), customers["id"])
+
+    order_items, total_cents = gen.order_items(orders["id"], products)
+    order_items["id"] = reserve_ids(cur, "order_items", len(order_items["order_id"]))
+    orders["total"] = total_cents / 100
+
+    payments = gen.payments(
+        reserve_ids(cur, "payments", order_count), orders["id"], total_cents
+    )
+    return {
+        "customers": customers,
+        "products": products,
+        "orders": orders,
+        "order_items": order_items,
+        "payments": payments,
+    }
+
+
+def bulk_seed_initial_data(
+    count: int, batch_size: int = 10_000, seed: int | None = None
+) -> dict:
+    """COPY-based variant of seed.seed_initial_data.
+
+    Ids are reserved from each table's sequence up front so that foreign keys and
+    order totals can be computed in memory; each batch is one transaction.
+    """
+    gen = ColumnarGenerator(seed)
+    rows = dict.fromkeys(TABLE_COLUMNS, 0)
+    created = 0
+    start = time.perf_counter()
+
+    logger.info(f"Bulk seeding started: count={count}, batch_size={batch_size}")
+
+    raw = engine.raw_connection()
+    try:
+        conn: psycopg.Connection = raw.driver_connection
+        while created < count:
+            batch_remaining = min(batch_size, count - created)
+
+            with conn.cursor() as cur:
+                with BATCH_PHASE_SECONDS.labels("build").time():
+                    batch = build_batch(cur, gen, batch_remaining)
+                # parents first so FK checks pass within the transaction
+                with BATCH_PHASE_SECONDS.labels("copy").time():
+                    for table in TABLE_COLUMNS:
+                        copy_rows(cur, table, batch[table])
+            with BATCH_PHASE_SECONDS.labels("commit").time():
+                conn.commit()
+
+            for table, columns in batch.items():
+                rows[table] += len(columns["id"])
+
+            created += batch_remaining
+            logger.info(f"Bulk seeded {created}/{count} records")
+    finally:
+        raw.close()
+
+    stats = seed_stats(rows, time.perf_counter() - start)
+    logger.info(
+        f"Bulk seeding completed in {stats['duration_s']} seconds "
+        f"({stats['rows_per_sec']} rows/sec)"
+    )
+    return stats
@@ -0,0 +1,167 @@
+from datetime import datetime as dt
+from datetime import timezone
+
+import numpy as np
+from faker import Faker
+
+CATEGORIES = np.array(["electronics", "books", "toys", "clothing", "kitchen", "sports"])
+ORDER_STATUSES = np.array(["pending", "shipped", "delivered", "cancelled"])
+PAYMENT_STATUSES = np.array(["paid", "pending", "failed"])
+PAYMENT_STATUS_WEIGHTS = [0.75, 0.15, 0.1]
+PAYMENT_METHODS = np.array(["credit_card", "paypal", "bank_transfer"])
+
+
+def _now() -> np.datetime64:
+    return np.datetime64(dt.now(timezone.utc).replace(tzinfo=None), "us")
+
+
+class ColumnarGenerator:
+    """Batch generator for storefront rows, returning NumPy columns per table.
+
+    Faker is only used once to build vocabularies; every batch is then sampled
+    with vectorized RNG calls using the same distributions as seed.py. Prices
+    and totals are computed in integer cents and exposed as floats with exact
+    two-digit representations. Pass a seed for reproducible datasets.
+    """
+
+    def __init__(self, seed: int | None = None, vocab_size: int = 2_000):
+        fake = Faker()
+        if seed is not None:
+            fake.seed_instance(seed)
+        self.rng = np.random.default_rng(seed)
+
+        def vocab(provider) -> np.ndarray:
+            return np.array([provider() for _ in range(vocab_size)])
+
+        self.names = vocab(fake.name)
+        self.first_names = vocab(fake.first_name)
+        self.last_names = vocab(fake.last_name)
+        self.user_names = vocab(fake.user_name)
+        self.email_domains = np.unique(vocab(fake.free_email_domain))
+        self.street_addresses = vocab(fake.street_address)
+        self.cities = vocab(fake.city)
+        self.countries = vocab(fake.country)
+        self.words = vocab(fake.word)
+
+        self.year_start = np.datetime64(f"{dt.now().year}-01-01T00:00:00", "us")
+
+    def _pick(self, vocab: np.ndarray, n: int) -> np.ndarray:
+        return vocab[self.rng.integers(0, len(vocab), n)]
+
+    def _this_year(self, n: int) -> np.ndarray:
+        now = np.datetime64(dt.now(), "us")
+        span = int((now - self.year_start) / np.timedelta64(1, "us"))
+        offsets = self.rng.integers(0, max(span, 1), n).astype("timedelta64[us]")
+        return self.year_start + offsets
+
+    def customers(self, ids: np.ndarray) -> dict[str, np.ndarray]:
+        n = len(ids)
+        first, last, last2 = (
+            self._pick(self.first_names, n),
+            self._pick(self.last_names, n),
+            self._pick(self.last_names, n),
+        )
+        variants = [
+            self._pick(self.names, n),
+            np.char.add(np.char.add(first, " "), np.char.add(last.astype("U1"), ".")),
+            np.char.add(
+                np.char.add(first, " "), np.char.add(np.char.add(last, " "), last2)
+            ),
+        ]
+        full_name = np.choose(self.rng.integers(0, 3, n), variants)
+        # the customer id makes emails unique by construction; a random suffix
+        # collides across a few million rows and fails the UNIQUE constraint
+        email = np.char.add(
+            np.char.add(self._pick(self.user_names, n), "."),
+            np.char.add(
+                np.asarray(ids).astype(str),
+                np.char.add("@", self._pick(self.email_domains, n)),
+            ),
+        )
+        return {
+            "id": ids,
+            "full_name": full_name,
+            "email": email,
+            "address": self._pick(self.street_addresses, n),
+            "city": self._pick(self.cities, n),
+            "country": self._pick(self.countries, n),
+            "created_at": self._this_year(n),
+        }
+
+    def products(self, ids: np.ndarray) -> dict[str, np.ndarray]:
+        n = len(ids)
+        price_cents = np.round(self.rng.uniform(5.0, 300.0, n) * 100).astype(np.int64)
+        return {
+            "id": ids,
+            "name": self._pick(self.words, n),
+            "category": self._pick(CATEGORIES, n),
+            "price": price_cents / 100,
+            "price_cents": price_cents,
+            "stock_quantity": self.rng.integers(0, 101, n),
+            "created_at": self._this_year(n),
+        }
+
+    def orders(
+        self, ids: np.ndarray, customer_ids: np.ndarray
+    ) -> dict[str, np.ndarray]:
+        n = len(ids)
+        return {
+            "id": ids,
+            "customer_id": self._pick(customer_ids, n),
+            "status": self._pick(ORDER_STATUSES, n),
+            "created_at": np.full(n, _now()),
+        }
+
+    def order_items(
+        self, order_ids: np.ndarray, products: dict[str, np.ndarray]
+    ) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """Pick 1-4 distinct products per order; item ids are left to the caller.
+
+        Returns the item columns and each order's total in cents.
+        """
+        n, p = len(order_ids), len(products["id"])
+        max_k = min(4, p)
+        k = self.rng.integers(1, max_k + 1, n)
+
+        # distinct picks per order: strictly increasing offsets from a random
+        # base, with gaps small enough that the last offset stays below p
+        gap = max(1, (p - 1) // max(max_k - 1, 1))
+        offsets = np.zeros((n, max_k), dtype=np.int64)
+        if max_k > 1:
+            steps = self.rng.integers(1, gap + 1, (n, max_k - 1))
+            offsets[:, 1:] = np.cumsum(steps, axis=1)
+        picks = (self.rng.integers(0, p, n)[:, None] + offsets) % p
+
+        mask = np.arange(max_k)[None, :] < k[:, None]
+        product_idx = picks[mask]
+        price_cents = products["price_cents"][product_idx]
+        quantity = self.rng.integers(1, 6, len(product_idx))
+        total_cents = np.bincount(
+            np.repeat(np.arange(n), k), weights=quantity * price_cents, minlength=n
+        ).astype(np.int64)
+        items = {
+            "order_id": np.repeat(order_ids, k),
+            "product_id": products["id"][product_idx],
+            "quantity": quantity,
+            "price_at_purchase": price_cents / 100,
+        }
+        return items, total_cents
+
+    def payments(
+        self, ids: np.ndarray, order_ids: np.ndarray, total_cents: np.ndarray
+    ) -> dict[str, np.ndarray]:
+        n = len(ids)
+        status = PAYMENT_STATUSES[
+            self.rng.choice(len(PAYMENT_STATUSES), n, p=PAYMENT_STATUS_WEIGHTS)
+        ]
+        paid_at = np.where(status == "paid", _now(), np.datetime64("NaT", "us")).astype(
+            "datetime64[us]"
+        )
+        return {
+            "id": ids,
+            "order_id": order_ids,
+            "payment_method": self._pick(PAYMENT_METHODS, n),
+            "paid_at": paid_at,
+            "amount": total_cents / 100,
+            "status": status,
+        }
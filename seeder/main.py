@@ -1,10 +1,19 @@
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.concurrency import run_in_threadpool
-from seed import seed_initial_data, seed_single_record
+from fastapi.responses import PlainTextResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from seed import seed_initial_data, seed_initial_data_async
+from bulk import bulk_seed_initial_data
+from parallel import parallel_seed_initial_data
+from streaming import StreamingIngest
+from workload import CdcWorkload, WorkloadMix
 from logging_config import setup_logging
+from metrics import monitor_loop_lag, observe_ingest
+from profiler import PROFILING_ENABLED, format_folded, sample_stacks
 import asyncio
 import logging
 from contextlib import asynccontextmanager
+from typing import Literal
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -13,8 +22,11 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app.state.ingestion_task = None
+    app.state.ingest = None
+    lag_monitor = asyncio.create_task(monitor_loop_lag())
     logger.info("Seeder app started")
     yield
+    lag_monitor.cancel()
     if app.state.ingestion_task and not app.state.ingestion_task.done():
         app.state.ingestion_task.cancel()
         logger.info("Seeder ingestion task cancelled on shutdown")
@@ -23,47 +35,153 @@ async def lifespan(app: FastAPI):
 app = FastAPI(lifespan=lifespan)
 
 
-@app.post("/seed/full")
-async def full_load(count: int = Query(10_000), batch_size: int = Query(1000)):
-    await run_in_threadpool(seed_initial_data, count, batch_size)
-    return {"status": "success", "records_created": count, "batch_size": batch_size}
+SEED_MODES = {"orm": seed_initial_data, "copy": bulk_seed_initial_data}
 
 
-@app.post("/seed/start")
-async def start_ingestion(rate: float = Query(1.0)):
-    if app.state.ingestion_task and not app.state.ingestion_task.done():
-        logger.warning("Ingestion already running.")
-        return {"status": "already running"}
+@app.post("/seed/full")
+async def full_load(
+    count: int = Query(10_000),
+    batch_size: int = Query(1000),
+    mode: Literal["orm", "orm_async", "copy", "parallel"] = Query("orm"),
+    seed: int | None = Query(None, description="RNG seed (copy/parallel mode)"),
+    workers: int = Query(4, ge=1, description="Process count (parallel mode)"),
+):
+    if mode == "parallel":
+        stats = await run_in_threadpool(
+            parallel_seed_initial_data, count, batch_size, workers, seed
+        )
+    elif mode == "orm_async":
+        stats = await seed_initial_data_async(count, batch_size)
+    elif mode == "copy":
+        stats = await run_in_threadpool(bulk_seed_initial_data, count, batch_size, seed)
+    else:
+        stats = await run_in_threadpool(seed_initial_data, count, batch_size)
+    return {
+        "status": "success",
+        "records_created": count,
+        "batch_size": batch_size,
+        "mode": mode,
+        **stats,
+    }
 
-    logger.info(f"Starting ingestion loop at {rate:.2f} batch/sec")
 
-    async def ingest_loop():
-        count = 0
-        last_log = asyncio.get_event_loop().time()
+@app.post("/seed/compare")
+async def compare_load(count: int = Query(10_000), batch_size: int = Query(1000)):
+    results = {}
+    for mode, seed_fn in SEED_MODES.items():
+        results[mode] = await run_in_threadpool(seed_fn, count, batch_size)
+    return {
+        "status": "success",
+        "records_created": count * len(SEED_MODES),
+        "batch_size": batch_size,
+        "rows_per_sec": {mode: r["rows_per_sec"] for mode, r in results.items()},
+        "results": results,
+    }
 
-        try:
-            while True:
-                seed_single_record()
-                count += 1
 
-                now = asyncio.get_event_loop().time()
-                if now - last_log >= 10:
-                    logger.info(f"Ingested {count} records.")
-                    last_log = now
+def ingestion_running() -> bool:
+    return bool(app.state.ingestion_task and not app.state.ingestion_task.done())
 
-                await asyncio.sleep(1 / rate)
 
+def start_task(ingest: StreamingIngest) -> None:
+    async def ingest_loop():
+        try:
+            await ingest.run()
         except asyncio.CancelledError:
             logger.info("Ingestion loop stopped.")
             raise
+        except Exception:
+            # kept on ingest.state for /status; re-raising would only leave
+            # an unretrieved task exception
+            logger.exception("Ingestion loop failed.")
 
+    app.state.ingest = ingest
     app.state.ingestion_task = asyncio.create_task(ingest_loop())
-    return {"status": "started", "rate": rate}
+
+
+@app.post("/seed/start")
+async def start_ingestion(
+    rate: float = Query(1.0, gt=0, description="Target records/sec"),
+    producers: int = Query(1, ge=1),
+    tick: float = Query(0.1, gt=0, description="Seconds per micro-batch"),
+    seed: int | None = Query(None),
+    probe_interval: float | None = Query(
+        None, gt=0, description="Seconds between latency probe orders"
+    ),
+):
+    if ingestion_running():
+        logger.warning("Ingestion already running.")
+        return {"status": "already running"}
+
+    logger.info(
+        f"Starting ingestion at {rate:.2f} records/sec "
+        f"with {producers} producer(s), tick={tick}s"
+    )
+
+    # building the generator vocabularies is CPU work, keep it off the loop
+    ingest = await run_in_threadpool(
+        StreamingIngest,
+        rate,
+        producers=producers,
+        tick=tick,
+        seed=seed,
+        probe_interval=probe_interval,
+    )
+    start_task(ingest)
+    return {"status": "started", "rate": rate, "producers": producers, "tick": tick}
+
+
+@app.post("/seed/workload")
+async def start_workload(
+    rate: float = Query(100.0, gt=0, description="Target operations/sec"),
+    insert: float = Query(0.5, ge=0),
+    order_update: float = Query(0.2, ge=0),
+    payment_update: float = Query(0.15, ge=0),
+    stock_update: float = Query(0.1, ge=0),
+    delete: float = Query(0.05, ge=0),
+    hot_fraction: float = Query(
+        0.0, ge=0, le=1, description="Share of updates/deletes hitting hot keys"
+    ),
+    hot_key_share: float = Query(
+        0.01, gt=0, le=1, description="Share of live ids that are hot"
+    ),
+    zipf_a: float = Query(1.2, gt=1, description="Zipf exponent for products"),
+    producers: int = Query(1, ge=1),
+    tick: float = Query(0.1, gt=0),
+    seed: int | None = Query(None),
+    probe_interval: float | None = Query(None, gt=0),
+):
+    if ingestion_running():
+        logger.warning("Ingestion already running.")
+        return {"status": "already running"}
+
+    mix = WorkloadMix(insert, order_update, payment_update, stock_update, delete)
+    try:
+        mix.weights()
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    logger.info(f"Starting CDC workload at {rate:.2f} ops/sec, mix={mix}")
+
+    workload = await run_in_threadpool(
+        CdcWorkload,
+        rate,
+        mix=mix,
+        hot_fraction=hot_fraction,
+        hot_key_share=hot_key_share,
+        zipf_a=zipf_a,
+        producers=producers,
+        tick=tick,
+        seed=seed,
+        probe_interval=probe_interval,
+    )
+    start_task(workload)
+    return {"status": "started", "rate": rate, "mix": mix, "producers": producers}
 
 
 @app.post("/seed/stop")
 async def stop_ingestion():
-    if app.state.ingestion_task and not app.state.ingestion_task.done():
+    if ingestion_running():
         app.state.ingestion_task.cancel()
         logger.info("Ingestion task cancelled by user.")
         return {"status": "stopped"}
@@ -72,15 +190,40 @@ async def stop_ingestion():
     return {"status": "not running"}
 
 
+@app.get("/probes")
+async def probes(since_ms: int | None = Query(None, description="Epoch millis")):
+    ingest = app.state.ingest
+    if not (ingest and ingest.probes):
+        return {"probes": []}
+    return {"probes": ingest.probes.recent(since_ms)}
+
+
+@app.get("/metrics")
+async def metrics():
+    observe_ingest(app.state.ingest if ingestion_running() else None)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/debug/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10.0, gt=0, le=300),
+    interval: float = Query(0.005, gt=0, description="Seconds between samples"),
+):
+    """Folded stack samples of every thread, e.g. for flamegraph.pl or speedscope."""
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Set SEEDER_PROFILING=true")
+    stacks = await run_in_threadpool(sample_stacks, seconds, interval)
+    return format_folded(stacks)
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
 
 @app.get("/status")
-def status():
+async def status():
     return {
-        "ingestion_running": bool(
-            app.state.ingestion_task and not app.state.ingestion_task.done()
-        )
+        "ingestion_running": ingestion_running(),
+        "ingest": app.state.ingest.stats() if app.state.ingest else None,
     }
@@ -0,0 +1,56 @@
+import asyncio
+
+from prometheus_client import Counter, Gauge, Histogram
+
+BATCH_SIZE_BUCKETS = (1, 5, 10, 50, 100, 500, 1_000, 5_000, 10_000)
+
+ROWS_INSERTED = Counter(
+    "seeder_rows_inserted", "Rows inserted by the ingest loop", ["table"]
+)
+OPERATIONS = Counter(
+    "seeder_operations", "Operations applied by the CDC workload", ["op"]
+)
+RECORDS = Counter("seeder_records", "Records (orders or operations) written")
+BATCH_RECORDS = Histogram(
+    "seeder_batch_records", "Records per micro-batch", buckets=BATCH_SIZE_BUCKETS
+)
+BATCH_SECONDS = Histogram(
+    "seeder_batch_seconds", "Wall time of one micro-batch transaction"
+)
+BATCH_ERRORS = Counter(
+    "seeder_batch_errors", "Micro-batches and probes that failed and were skipped"
+)
+BATCH_PHASE_SECONDS = Histogram(
+    "seeder_batch_phase_seconds",
+    "Time per batch phase of ingest and COPY seeding: build (ids + generator), "
+    "copy, commit",
+    ["phase"],
+)
+TARGET_RATE = Gauge("seeder_target_rate", "Target records/sec of the ingest loop")
+ACHIEVED_RATE = Gauge("seeder_achieved_rate", "Achieved records/sec since start")
+POOL_SIZE = Gauge("seeder_pool_size", "Connections held by the ingest pool")
+POOL_AVAILABLE = Gauge("seeder_pool_available", "Idle connections in the pool")
+POOL_WAITING = Gauge("seeder_pool_requests_waiting", "Requests queued for a connection")
+LOOP_LAG = Histogram(
+    "seeder_event_loop_lag_seconds",
+    "Delay of event loop wake-ups past their scheduled time",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+def observe_ingest(ingest) -> None:
+    """Refresh the gauges from a StreamingIngest right before a scrape."""
+    TARGET_RATE.set(ingest.rate if ingest else 0)
+    ACHIEVED_RATE.set((ingest and ingest.achieved_rate()) or 0)
+    stats = ingest.pool.get_stats() if ingest else {}
+    POOL_SIZE.set(stats.get("pool_size", 0))
+    POOL_AVAILABLE.set(stats.get("pool_available", 0))
+    POOL_WAITING.set(stats.get("requests_waiting", 0))
+
+
+async def monitor_loop_lag(interval: float = 0.25) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        LOOP_LAG.observe(max(0.0, loop.time() - expected))
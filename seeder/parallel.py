@@ -0,0 +1,65 @@
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import multiprocessing
+import time
+
+from seed import seed_stats
+
+logger = logging.getLogger(__name__)
+
+
+def split_count(count: int, workers: int) -> list[int]:
+    base, extra = divmod(count, workers)
+    return [base + (1 if i < extra else 0) for i in range(workers)]
+
+
+def _seed_worker(worker_id: int, count: int, batch_size: int, seed: int | None):
+    # imported here so each process builds its own engine and connection
+    from bulk import bulk_seed_initial_data
+    from logging_config import setup_logging
+
+    setup_logging()
+    worker_seed = None if seed is None else seed + worker_id
+    stats = bulk_seed_initial_data(count, batch_size, worker_seed)
+    return {"worker": worker_id, "count": count, **stats}
+
+
+def parallel_seed_initial_data(
+    count: int, batch_size: int = 10_000, workers: int = 4, seed: int | None = None
+) -> dict:
+    """Run the COPY loader across a process pool.
+
+    Every worker has its own connection and draws its ids from the table
+    sequences per batch, so id sets never overlap between workers and each
+    order only references customers and products created in the same batch.
+    """
+    counts = [c for c in split_count(count, max(1, workers)) if c > 0]
+    if not counts:
+        # nothing to seed; an empty pool would be max_workers=0, a ValueError
+        return {**seed_stats({}, 0.0), "workers": []}
+    start = time.perf_counter()
+
+    logger.info(
+        f"Parallel seeding started: count={count}, batch_size={batch_size}, "
+        f"workers={len(counts)}"
+    )
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(counts), mp_context=ctx) as pool:
+        futures = [
+            pool.submit(_seed_worker, i, c, batch_size, seed)
+            for i, c in enumerate(counts)
+        ]
+        per_worker = [f.result() for f in futures]
+
+    rows = {}
+    for result in per_worker:
+        for table, n in result["rows"].items():
+            rows[table] = rows.get(table, 0) + n
+
+    stats = seed_stats(rows, time.perf_counter() - start)
+    logger.info(
+        f"Parallel seeding completed in {stats['duration_s']} seconds "
+        f"({stats['rows_per_sec']} rows/sec across {len(counts)} workers)"
+    )
+    return {**stats, "workers": per_worker}
@@ -0,0 +1,69 @@
+from collections import deque
+import time
+import uuid
+
+import numpy as np
+import psycopg
+from psycopg.types.json import Jsonb
+
+from bulk import TABLE_COLUMNS, build_batch, copy_rows
+from generator import ColumnarGenerator
+
+PROBE_EMAIL_DOMAIN = "latency.invalid"
+# commit times and row ids of probes, see migrations/V3__create_latency_probes.sql
+PROBE_TABLE = "latency_probes"
+# added to the ingest seed, so probes do not replay producer 0's sequence
+PROBE_SEED_OFFSET = 10_000
+
+
+class LatencyProbes:
+    """Synthetic probe orders for measuring CDC latency end to end.
+
+    A probe is one order with its customer, product, items and payment
+    written in its own transaction. The wall-clock time right after COMMIT
+    returns is stored with every row id per table in PROBE_TABLE, so
+    scripts/track_latency.py can find the probe in the raw Avro files and the
+    stage tables without asking the seeder. The most recent probes are also
+    kept in memory for /probes. Probe customers get an email at
+    PROBE_EMAIL_DOMAIN, which makes them easy to spot in Postgres.
+    """
+
+    def __init__(self, interval: float, keep: int = 10_000, seed: int | None = None):
+        self.interval = interval
+        self.generator = ColumnarGenerator(
+            None if seed is None else seed + PROBE_SEED_OFFSET, vocab_size=100
+        )
+        self.log: deque[dict] = deque(maxlen=keep)
+
+    def write(self, conn: psycopg.Connection) -> dict:
+        probe_id = uuid.uuid4().hex[:12]
+        with conn.cursor() as cur:
+            batch = build_batch(cur, self.generator, 1)
+            batch["customers"]["email"] = np.array(
+                [f"probe.{probe_id}@{PROBE_EMAIL_DOMAIN}"]
+            )
+            for table in TABLE_COLUMNS:
+                copy_rows(cur, table, batch[table])
+        conn.commit()
+        probe = {
+            "probe_id": probe_id,
+            "committed_at_ms": time.time_ns() // 1_000_000,
+            "ids": {
+                table: [int(i) for i in columns["id"]]
+                for table, columns in batch.items()
+            },
+        }
+        # the stamp only exists once COMMIT returned, so it is a second commit
+        conn.execute(
+            f"INSERT INTO {PROBE_TABLE} (probe_id, committed_at_ms, ids) "
+            "VALUES (%s, %s, %s)",
+            (probe_id, probe["committed_at_ms"], Jsonb(probe["ids"])),
+        )
+        conn.commit()
+        self.log.append(probe)
+        return probe
+
+    def recent(self, since_ms: int | None = None) -> list[dict]:
+        return [
+            p for p in self.log if since_ms is None or p["committed_at_ms"] >= since_ms
+        ]
@@ -0,0 +1,44 @@
+from collections import Counter
+import os
+import sys
+import threading
+import time
+
+PROFILING_ENABLED = os.getenv("SEEDER_PROFILING", "false").lower() in ("1", "true")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def sample_stacks(seconds: float, interval: float = 0.005) -> Counter:
+    """Sample the stacks of all other threads for the given duration.
+
+    Returns folded stacks (root first, frames joined by ';') with their sample
+    counts, the input format of flamegraph.pl and speedscope. Thread names
+    are the root frame, so the event loop ("MainThread") and the "ingest"
+    workers show up separately.
+    """
+    me = threading.get_ident()
+    names = {}
+    stacks = Counter()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            if ident not in names:
+                names = {t.ident: t.name for t in threading.enumerate()}
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(ident, str(ident)))
+            stacks[";".join(reversed(labels))] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def format_folded(stacks: Counter) -> str:
+    return "".join(f"{stack} {n}\n" for stack, n in stacks.most_common())
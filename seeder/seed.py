@@ -3,7 +3,8 @@ import random
 from datetime import datetime as dt
 from datetime import timezone
 from models import Customer, Product, Order, OrderItem, Payment
-from database import SessionLocal
+from database import AsyncSessionLocal, SessionLocal
+import asyncio
 import logging
 import time
 
@@ -82,58 +83,177 @@ def create_payment(db, order_id: int, amount: float):
     db.add(payment)
 
 
-def seed_initial_data(count: int, batch_size: int = 1000):
+def seed_stats(rows: dict[str, int], duration: float) -> dict:
+    total_rows = sum(rows.values())
+    return {
+        "rows": rows,
+        "total_rows": total_rows,
+        "duration_s": round(duration, 2),
+        "rows_per_sec": round(total_rows / duration, 1) if duration > 0 else None,
+    }
+
+
+def _add_parents(db, count: int) -> tuple[list[Customer], list[Product]]:
+    customers = [create_customer(db) for _ in range(max(1, count // 2))]
+    products = [create_product(db) for _ in range(count)]
+    return customers, products
+
+
+def _add_orders(db, customer_ids: list[int], count: int) -> list[Order]:
+    return [create_order(db, random.choice(customer_ids)) for _ in range(count)]
+
+
+def _add_children(
+    db, orders: list[Order], products: list[Product], rows: dict[str, int]
+) -> None:
+    for order in orders:
+        selected_products = random.sample(products, k=random.randint(1, 4))
+        total = create_order_items(db, order.id, selected_products)
+        order.total = total
+        rows["order_items"] += len(selected_products)
+
+        create_payment(db, order.id, total)
+
+
+def _count_batch(rows: dict[str, int], customers: int, count: int) -> None:
+    rows["customers"] += customers
+    rows["products"] += count
+    rows["orders"] += count
+    rows["payments"] += count
+
+
+def seed_batch(db, count: int, rows: dict[str, int]) -> None:
+    """Add one batch of orders, flushing once per table level.
+
+    Each flush sends its pending rows as multi-row INSERTs (insertmanyvalues),
+    so a batch costs a handful of round trips instead of one per order.
+    """
+    customers, products = _add_parents(db, count)
+    db.flush()
+
+    orders = _add_orders(db, [c.id for c in customers], count)
+    db.flush()
+
+    _add_children(db, orders, products, rows)
+    _count_batch(rows, len(customers), count)
+
+
+class _Staged(list):
+    """Collects what the create_* helpers add, in place of a session.
+
+    Lets the Faker work run on a worker thread; the objects are then added
+    to the AsyncSession on the event loop.
+    """
+
+    add = list.append
+
+
+async def _stage(db, build, *args):
+    """Run build(staged, *args) off the event loop and add what it created."""
+    staged = _Staged()
+    result = await asyncio.to_thread(build, staged, *args)
+    db.add_all(staged)
+    return result
+
+
+async def seed_batch_async(db, count: int, rows: dict[str, int]) -> None:
+    """seed_batch for an AsyncSession.
+
+    Objects are built on a worker thread, level by level, so only add_all,
+    the flushes and the commit run on the event loop.
+    """
+    customers, products = await _stage(db, _add_parents, count)
+    await db.flush()
+
+    orders = await _stage(db, _add_orders, [c.id for c in customers], count)
+    await db.flush()
+
+    await _stage(db, _add_children, orders, products, rows)
+    _count_batch(rows, len(customers), count)
+
+
+def seed_initial_data(count: int, batch_size: int = 1000) -> dict:
     db = SessionLocal()
     created = 0
+    rows = dict.fromkeys(
+        ["customers", "products", "orders", "order_items", "payments"], 0
+    )
     start = time.perf_counter()
 
     logger.info(f"Seeding started: count={count}, batch_size={batch_size}")
 
     while created < count:
         batch_remaining = min(batch_size, count - created)
+        seed_batch(db, batch_remaining, rows)
+        db.commit()
 
-        customers = [create_customer(db) for _ in range(batch_remaining // 2)]
-        products = [create_product(db) for _ in range(batch_remaining)]
-        db.flush()
-
-        for _ in range(batch_remaining):
-            customer = random.choice(customers)
-            selected_products = random.sample(products, k=random.randint(1, 4))
+        created += batch_remaining
+        logger.info(f"Seeded {created}/{count} records")
 
-            order = create_order(db, customer.id)
-            db.flush()
+    stats = seed_stats(rows, time.perf_counter() - start)
+    logger.info(
+        f"Seeding completed in {stats['duration_s']} seconds "
+        f"({stats['rows_per_sec']} rows/sec)"
+    )
+    db.close()
+    return stats
 
-            total = create_order_items(db, order.id, selected_products)
-            order.total = total
 
-            create_payment(db, order.id, total)
+async def seed_initial_data_async(count: int, batch_size: int = 1000) -> dict:
+    """seed_initial_data on the async engine, awaited on the event loop."""
+    created = 0
+    rows = dict.fromkeys(
+        ["customers", "products", "orders", "order_items", "payments"], 0
+    )
+    start = time.perf_counter()
 
-        db.commit()
+    logger.info(f"Async seeding started: count={count}, batch_size={batch_size}")
 
-        created += batch_remaining
-        logger.info(f"Seeded {created}/{count} records")
+    async with AsyncSessionLocal() as db:
+        while created < count:
+            batch_remaining = min(batch_size, count - created)
+            await seed_batch_async(db, batch_remaining, rows)
+            await db.commit()
 
-    duration = round(time.perf_counter() - start, 2)
-    logger.info(f"Seeding completed in {duration} seconds")
-    db.close()
+            created += batch_remaining
+            logger.info(f"Async seeded {created}/{count} records")
 
+    stats = seed_stats(rows, time.perf_counter() - start)
+    logger.info(
+        f"Async seeding completed in {stats['duration_s']} seconds "
+        f"({stats['rows_per_sec']} rows/sec)"
+    )
+    return stats
 
-def seed_single_record():
-    db = SessionLocal()
 
+def _add_single_parents(db) -> tuple[Customer, list[Product]]:
     customer = create_customer(db)
     product_count = random.randint(1, 4)
-    products = [create_product(db) for _ in range(product_count)]
-    db.commit()
+    return customer, [create_product(db) for _ in range(product_count)]
 
-    order = create_order(db, customer.id)
-    db.commit()
 
-    total = create_order_items(db, order.id, products)
-    order.total = total
-    db.commit()
+def _add_single_children(db, order: Order, products: list[Product]) -> None:
+    order.total = create_order_items(db, order.id, products)
+    create_payment(db, order.id, order.total)
 
-    create_payment(db, order.id, total)
-    db.commit()
 
-    db.close()
+def seed_single_record():
+    with SessionLocal.begin() as db:
+        customer, products = _add_single_parents(db)
+        db.flush()
+
+        order = create_order(db, customer.id)
+        db.flush()
+
+        _add_single_children(db, order, products)
+
+
+async def seed_single_record_async():
+    async with AsyncSessionLocal.begin() as db:
+        customer, products = await _stage(db, _add_single_parents)
+        await db.flush()
+
+        order = create_order(db, customer.id)
+        await db.flush()
+
+        await _stage(db, _add_single_children, order, products)
@@ -0,0 +1,215 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import logging
+
+from psycopg_pool import ConnectionPool
+
+from bulk import TABLE_COLUMNS, build_batch, copy_rows
+from database import STOREFRONT_DSN
+from generator import ColumnarGenerator
+from metrics import (
+    BATCH_ERRORS,
+    BATCH_PHASE_SECONDS,
+    BATCH_RECORDS,
+    BATCH_SECONDS,
+    RECORDS,
+    ROWS_INSERTED,
+)
+from probes import LatencyProbes
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF = 30.0  # seconds a producer waits at most after failed batches
+
+
+class StreamingIngest:
+    """Rate-controlled ingest of order records into the storefront database.
+
+    Each producer owns a share of the target rate and runs on a fixed tick.
+    At every tick it writes the records that are due (target minus emitted so
+    far) as one micro-batch in a single transaction, so a slow tick is caught
+    up by the next one instead of lowering the achieved rate. Database work
+    runs on a dedicated thread pool with one pooled connection per producer,
+    keeping the event loop free. With probe_interval set, a latency probe
+    order is also committed every probe_interval seconds on its own
+    connection (see probes.LatencyProbes).
+
+    A failed micro-batch is logged and skipped, and the producer backs off
+    exponentially before its next tick. Records count the rows actually
+    committed, so the achieved rate drops while the database is unhealthy.
+    """
+
+    rows_metric = ROWS_INSERTED  # labelled by the keys of _write_batch's result
+
+    def __init__(
+        self,
+        rate: float,
+        producers: int = 1,
+        tick: float = 0.1,
+        max_batch: int = 5_000,
+        seed: int | None = None,
+        probe_interval: float | None = None,
+    ):
+        self.rate = rate
+        self.producers = producers
+        self.tick = tick
+        self.max_batch = max_batch
+        self.probes = (
+            LatencyProbes(probe_interval, seed=seed) if probe_interval else None
+        )
+        workers = producers + (1 if self.probes else 0)
+        self.pool = ConnectionPool(
+            STOREFRONT_DSN, min_size=workers, max_size=workers, open=False
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ingest"
+        )
+        # numpy generators are not thread-safe, so one per producer
+        self.generators = [
+            ColumnarGenerator(None if seed is None else seed + i)
+            for i in range(producers)
+        ]
+        self.records = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_error: str | None = None
+        self.state = "starting"
+        self.rows = dict.fromkeys(TABLE_COLUMNS, 0)
+        self.started_at: float | None = None
+
+    def _prepare(self) -> None:
+        """Hook run once on the pool before producers start."""
+
+    def _write_batch(self, producer: int, n: int) -> dict[str, int]:
+        with self.pool.connection() as conn:
+            with conn.cursor() as cur:
+                with BATCH_PHASE_SECONDS.labels("build").time():
+                    batch = build_batch(cur, self.generators[producer], n)
+                with BATCH_PHASE_SECONDS.labels("copy").time():
+                    for table in TABLE_COLUMNS:
+                        copy_rows(cur, table, batch[table])
+            with BATCH_PHASE_SECONDS.labels("commit").time():
+                conn.commit()
+        return {table: len(columns["id"]) for table, columns in batch.items()}
+
+    def _records(self, rows: dict[str, int]) -> int:
+        """Records a _write_batch result stands for: one per order."""
+        return rows.get("orders", 0)
+
+    def _failed(self, what: str, e: Exception) -> None:
+        self.errors += 1
+        self.last_error = f"{what}: {e!r}"
+        BATCH_ERRORS.inc()
+        logger.exception(f"{what} failed")
+
+    async def _produce(self, producer: int) -> None:
+        loop = asyncio.get_running_loop()
+        share = self.rate / self.producers
+        start = loop.time()
+        emitted = 0
+        ticks = 0
+        failures = 0
+
+        while True:
+            ticks += 1
+            due = min(int(share * (loop.time() - start)) - emitted, self.max_batch)
+            if due > 0:
+                # a failed batch is not retried, so recovering does not burst
+                emitted += due
+                try:
+                    with BATCH_SECONDS.time():
+                        rows = await loop.run_in_executor(
+                            self.executor, self._write_batch, producer, due
+                        )
+                except Exception as e:
+                    self._failed(f"Producer {producer} batch of {due}", e)
+                    failures += 1
+                    await asyncio.sleep(min(MAX_BACKOFF, self.tick * 2**failures))
+                    ticks = int((loop.time() - start) / self.tick)
+                    continue
+
+                failures = 0
+                records = self._records(rows)
+                self.records += records
+                self.batches += 1
+                RECORDS.inc(records)
+                BATCH_RECORDS.observe(records)
+                for key, n in rows.items():
+                    self.rows[key] = self.rows.get(key, 0) + n
+                    self.rows_metric.labels(key).inc(n)
+
+            await asyncio.sleep(max(0.0, start + ticks * self.tick - loop.time()))
+
+    def _write_probe(self) -> dict:
+        with self.pool.connection() as conn:
+            return self.probes.write(conn)
+
+    async def _probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(self.executor, self._write_probe)
+            except Exception as e:
+                self._failed("Latency probe", e)
+            await asyncio.sleep(self.probes.interval)
+
+    async def _report(self, interval: float = 10.0) -> None:
+        last = self.records
+        while True:
+            await asyncio.sleep(interval)
+            logger.info(
+                f"Ingested {self.records} records "
+                f"({(self.records - last) / interval:.1f}/sec, target {self.rate:.1f})"
+            )
+            last = self.records
+
+    def achieved_rate(self) -> float | None:
+        if self.started_at is None:
+            return None
+        elapsed = asyncio.get_running_loop().time() - self.started_at
+        return self.records / elapsed if elapsed > 0 else None
+
+    def stats(self) -> dict:
+        achieved = self.achieved_rate()
+        return {
+            "state": self.state,
+            "target_rate": self.rate,
+            "achieved_rate": None if achieved is None else round(achieved, 1),
+            "producers": self.producers,
+            "records": self.records,
+            "batches": self.batches,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "rows": self.rows,
+            "probes": len(self.probes.log) if self.probes else None,
+        }
+
+    async def run(self) -> None:
+        """Produce until cancelled; state ends as "stopped" or "failed".
+
+        Per-batch errors are handled by the producers, so anything raised
+        here (opening the pool, loading the workload index) stops the run.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.executor, self.pool.open, True)
+            await loop.run_in_executor(self.executor, self._prepare)
+            self.started_at = loop.time()
+            self.state = "running"
+            tasks = [self._produce(i) for i in range(self.producers)]
+            tasks.append(self._report())
+            if self.probes:
+                tasks.append(self._probe())
+            async with asyncio.TaskGroup() as group:
+                for task in tasks:
+                    group.create_task(task)
+        except asyncio.CancelledError:
+            self.state = "stopped"
+            raise
+        except Exception as e:
+            self.state = "failed"
+            self.last_error = repr(e)
+            raise
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            await asyncio.to_thread(self.pool.close)
@@ -0,0 +1,5 @@
+from pathlib import Path
+import sys
+
+# seeder modules import each other flat, as in the container's working dir
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,20 @@
+import numpy as np
+
+from generator import ColumnarGenerator
+
+
+def test_customer_emails_unique_across_batches():
+    gen = ColumnarGenerator(seed=0, vocab_size=20)
+    first = gen.customers(np.arange(1, 50_001, dtype=np.int64))
+    second = gen.customers(np.arange(50_001, 100_001, dtype=np.int64))
+
+    emails = np.concatenate([first["email"], second["email"]])
+    assert len(np.unique(emails)) == len(emails)
+
+
+def test_customer_email_carries_id():
+    gen = ColumnarGenerator(seed=0, vocab_size=20)
+    batch = gen.customers(np.array([7, 42], dtype=np.int64))
+
+    local = [e.split("@")[0] for e in batch["email"]]
+    assert [part.rsplit(".", 1)[1] for part in local] == ["7", "42"]
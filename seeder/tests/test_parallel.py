@@ -0,0 +1,18 @@
+from parallel import parallel_seed_initial_data, split_count
+
+
+def test_split_count_spreads_remainder_over_first_workers():
+    assert split_count(10, 4) == [3, 3, 2, 2]
+    assert split_count(8, 4) == [2, 2, 2, 2]
+
+
+def test_split_count_more_workers_than_records():
+    assert split_count(2, 4) == [1, 1, 0, 0]
+    assert split_count(0, 3) == [0, 0, 0]
+
+
+def test_parallel_seed_without_records_starts_no_pool():
+    stats = parallel_seed_initial_data(0, workers=4)
+
+    assert stats["total_rows"] == 0
+    assert stats["workers"] == []
@@ -0,0 +1,60 @@
+import numpy as np
+
+from generator import ColumnarGenerator
+from probes import LatencyProbes
+
+
+def test_probe_generator_does_not_replay_producer_seed():
+    probes = LatencyProbes(1.0, seed=7)
+    producer = ColumnarGenerator(7, vocab_size=100)
+
+    ids = np.arange(1, 101, dtype=np.int64)
+    assert not np.array_equal(
+        probes.generator.products(ids)["price"], producer.products(ids)["price"]
+    )
+
+
+class FakeConn:
+    def __init__(self):
+        self.executed = []
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_probe_stamp_is_stored_with_every_row_id(monkeypatch):
+    import probes
+
+    batch = {
+        "customers": {"id": np.array([5])},
+        "products": {"id": np.array([7])},
+        "orders": {"id": np.array([9])},
+        "order_items": {"id": np.array([20, 21, 22])},
+        "payments": {"id": np.array([3])},
+    }
+    monkeypatch.setattr(probes, "build_batch", lambda cur, gen, n: batch)
+    monkeypatch.setattr(probes, "copy_rows", lambda cur, table, columns: None)
+    conn = FakeConn()
+
+    probe = LatencyProbes(1.0, seed=7).write(conn)
+
+    assert probe["ids"]["order_items"] == [20, 21, 22]
+    ((query, (probe_id, committed_at_ms, ids)),) = conn.executed
+    assert query.startswith(f"INSERT INTO {probes.PROBE_TABLE}")
+    assert (probe_id, committed_at_ms) == (probe["probe_id"], probe["committed_at_ms"])
+    assert ids.obj == probe["ids"]
+    # data first, then the stamp taken after its COMMIT returned
+    assert conn.commits == 2
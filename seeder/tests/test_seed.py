@@ -0,0 +1,50 @@
+import asyncio
+import itertools
+import threading
+
+import seed
+
+
+class FakeAsyncSession:
+    """Assigns ids on flush, like the RETURNING of a real flush."""
+
+    def __init__(self):
+        self.pending = []
+        self.added = []
+        self.ids = itertools.count(1)
+
+    def add_all(self, objects):
+        self.pending += objects
+        self.added += objects
+
+    async def flush(self):
+        for obj in self.pending:
+            obj.id = next(self.ids)
+        self.pending = []
+
+
+def test_seed_batch_async_builds_objects_off_the_loop(monkeypatch):
+    threads = set()
+    create_customer = seed.create_customer
+
+    def tracked(db):
+        threads.add(threading.get_ident())
+        return create_customer(db)
+
+    monkeypatch.setattr(seed, "create_customer", tracked)
+    db = FakeAsyncSession()
+    rows = dict.fromkeys(
+        ["customers", "products", "orders", "order_items", "payments"], 0
+    )
+
+    async def run():
+        await seed.seed_batch_async(db, 10, rows)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+
+    assert threads and loop_thread not in threads
+    assert rows["customers"] == 5 and rows["orders"] == 10
+    assert sum(isinstance(o, seed.Payment) for o in db.added) == 10
+    orders = [o for o in db.added if isinstance(o, seed.Order)]
+    assert all(o.total is not None and o.customer_id for o in orders)
@@ -0,0 +1,44 @@
+import asyncio
+
+import psycopg
+import pytest
+
+from streaming import StreamingIngest
+
+
+class FlakyIngest(StreamingIngest):
+    """Fails its first batch and commits one order less than asked after."""
+
+    def __init__(self):
+        super().__init__(rate=1_000, tick=0.01, seed=0)
+        self.calls = 0
+
+    def _write_batch(self, producer: int, n: int) -> dict[str, int]:
+        self.calls += 1
+        if self.calls == 1:
+            raise psycopg.OperationalError("connection lost")
+        return {"orders": n - 1, "payments": n - 1}
+
+
+async def produce_for(ingest: StreamingIngest, seconds: float) -> None:
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(ingest._produce(0), seconds)
+    ingest.executor.shutdown()
+
+
+def test_failed_batch_is_logged_and_producer_continues(caplog):
+    ingest = FlakyIngest()
+    asyncio.run(produce_for(ingest, 0.3))
+
+    assert ingest.calls > 1
+    assert ingest.errors == 1
+    assert "connection lost" in ingest.last_error
+    assert "Producer 0 batch" in caplog.text
+
+
+def test_records_count_committed_rows():
+    ingest = FlakyIngest()
+    asyncio.run(produce_for(ingest, 0.3))
+
+    assert ingest.batches == ingest.calls - 1
+    assert ingest.records == ingest.rows["orders"]
@@ -0,0 +1,70 @@
+import numpy as np
+import psycopg
+import pytest
+
+from workload import CdcWorkload, IdSet, LiveIndex, WorkloadMix
+
+
+def test_id_set_discard_keeps_positions_consistent():
+    ids = IdSet(range(5))
+    ids.discard(1)
+    ids.discard(9)
+
+    assert sorted(ids.ids) == [0, 2, 3, 4]
+    assert all(ids.ids[pos] == i for i, pos in ids.pos.items())
+
+
+def test_sample_returns_distinct_members():
+    ids = IdSet(range(100, 110))
+    picked = ids.sample(np.random.default_rng(0), 50)
+
+    assert len(picked) == len(set(picked))
+    assert set(picked) <= set(ids.ids)
+
+
+def test_sample_hot_keys_come_from_the_front():
+    ids = IdSet(range(1_000))
+    picked = ids.sample(np.random.default_rng(0), 200, hot_fraction=1.0)
+
+    assert picked and max(picked) < 10
+
+
+def test_sample_empty():
+    rng = np.random.default_rng(0)
+    assert IdSet().sample(rng, 5) == []
+    assert IdSet([1]).sample(rng, 0) == []
+
+
+def test_remove_order_returns_tracked_status():
+    index = LiveIndex()
+    index.add_order(1, "shipped")
+    index.add_order(2, "delivered")
+
+    assert index.remove_order(1) == "shipped"
+    assert index.remove_order(2) is None
+    assert len(index.orders) == 0
+
+
+def test_failed_batch_puts_targets_back():
+    # the pool is never opened, so the transaction fails on connect
+    workload = CdcWorkload(
+        100, mix=WorkloadMix(0, 1, 1, 0, 1), seed=0, hot_key_share=1.0
+    )
+    for order_id, status in enumerate(["pending", "shipped", "delivered"] * 10):
+        workload.index.add_order(order_id, status)
+    for payment_id in range(10):
+        workload.index.pending_payments.add(payment_id)
+    before = {
+        "orders": set(workload.index.orders.ids),
+        "pending": set(workload.index.orders_by_status["pending"].ids),
+        "shipped": set(workload.index.orders_by_status["shipped"].ids),
+        "payments": set(workload.index.pending_payments.ids),
+    }
+
+    with pytest.raises(psycopg.OperationalError):
+        workload._write_batch(0, 20)
+
+    assert set(workload.index.orders.ids) == before["orders"]
+    assert set(workload.index.orders_by_status["pending"].ids) == before["pending"]
+    assert set(workload.index.orders_by_status["shipped"].ids) == before["shipped"]
+    assert set(workload.index.pending_payments.ids) == before["payments"]
@@ -0,0 +1,337 @@
+from dataclasses import dataclass
+from datetime import datetime as dt
+from datetime import timezone
+from typing import Iterable
+import logging
+import threading
+
+import numpy as np
+import psycopg
+
+from bulk import TABLE_COLUMNS, build_batch, copy_rows
+from metrics import BATCH_PHASE_SECONDS, OPERATIONS
+from streaming import StreamingIngest
+
+logger = logging.getLogger(__name__)
+
+# allowed forward transitions; anything else is terminal
+ORDER_TRANSITIONS = {"pending": "shipped", "shipped": "delivered"}
+PREVIOUS_STATUS = {new: old for old, new in ORDER_TRANSITIONS.items()}
+PAYMENT_OUTCOMES = np.array(["paid", "failed"])
+PAYMENT_OUTCOME_WEIGHTS = [0.75 / 0.85, 0.1 / 0.85]  # seed.py paid:failed ratio
+
+
+@dataclass
+class WorkloadMix:
+    insert: float = 0.5
+    order_update: float = 0.2
+    payment_update: float = 0.15
+    stock_update: float = 0.1
+    delete: float = 0.05
+
+    def weights(self) -> np.ndarray:
+        w = np.array(
+            [
+                self.insert,
+                self.order_update,
+                self.payment_update,
+                self.stock_update,
+                self.delete,
+            ]
+        )
+        if w.sum() <= 0:
+            raise ValueError("Workload mix needs at least one positive weight")
+        return w / w.sum()
+
+
+class IdSet:
+    """Set of ids with O(1) add/discard and uniform or hot-key sampling."""
+
+    def __init__(self, ids=()):
+        self.ids: list[int] = []
+        self.pos: dict[int, int] = {}
+        for i in ids:
+            self.add(i)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, i: int) -> None:
+        if i not in self.pos:
+            self.pos[i] = len(self.ids)
+            self.ids.append(i)
+
+    def discard(self, i: int) -> None:
+        idx = self.pos.pop(i, None)
+        if idx is None:
+            return
+        last = self.ids.pop()
+        if idx < len(self.ids):
+            self.ids[idx] = last
+            self.pos[last] = idx
+
+    def sample(
+        self,
+        rng: np.random.Generator,
+        n: int,
+        hot_fraction: float = 0.0,
+        hot_key_share: float = 0.01,
+    ) -> list[int]:
+        """Draw up to n distinct ids; hot_fraction of draws hit the hot keys.
+
+        The hot keys are the first hot_key_share of the backing list.
+        """
+        size = len(self.ids)
+        if size == 0 or n <= 0:
+            return []
+        hot_size = max(1, int(size * hot_key_share))
+        hot = rng.random(n) < hot_fraction
+        idx = np.where(hot, rng.integers(0, hot_size, n), rng.integers(0, size, n))
+        return [self.ids[i] for i in np.unique(idx)]
+
+
+class LiveIndex:
+    """In-memory view of the ids the workload can update or delete."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.orders = IdSet()
+        self.orders_by_status = {status: IdSet() for status in ORDER_TRANSITIONS}
+        self.pending_payments = IdSet()
+        self.products = IdSet()
+
+    def load(self, conn: psycopg.Connection) -> None:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, status FROM orders")
+            for order_id, status in cur:
+                self.add_order(order_id, status)
+            cur.execute("SELECT id FROM payments WHERE status = 'pending'")
+            for (payment_id,) in cur:
+                self.pending_payments.add(payment_id)
+            cur.execute("SELECT id FROM products ORDER BY id")
+            for (product_id,) in cur:
+                self.products.add(product_id)
+
+    def add_order(self, order_id: int, status: str) -> None:
+        self.orders.add(order_id)
+        if status in self.orders_by_status:
+            self.orders_by_status[status].add(order_id)
+
+    def remove_order(self, order_id: int) -> str | None:
+        """Drop an order; returns its tracked status, if it had one."""
+        self.orders.discard(order_id)
+        status = None
+        for s, ids in self.orders_by_status.items():
+            if order_id in ids.pos:
+                ids.discard(order_id)
+                status = s
+        return status
+
+    def add_batch(self, batch: dict[str, dict[str, np.ndarray]]) -> None:
+        orders, payments = batch["orders"], batch["payments"]
+        for order_id, status in zip(orders["id"].tolist(), orders["status"].tolist()):
+            self.add_order(order_id, status)
+        for payment_id in payments["id"][payments["status"] == "pending"].tolist():
+            self.pending_payments.add(payment_id)
+        for product_id in batch["products"]["id"].tolist():
+            self.products.add(product_id)
+
+
+class CdcWorkload(StreamingIngest):
+    """StreamingIngest variant that mixes inserts, updates and deletes.
+
+    Every record is one CDC-producing operation: an insert of a new order (with
+    customer, products, items and payment), an order status step along
+    pending -> shipped -> delivered, a pending payment resolving to paid or
+    failed, a stock decrement on a Zipf-distributed product, or the delete of
+    an order with its items and payment. Update and delete targets come from a
+    LiveIndex, so Postgres is only queried once at startup.
+    """
+
+    rows_metric = OPERATIONS
+
+    def __init__(
+        self,
+        rate: float,
+        mix: WorkloadMix | None = None,
+        hot_fraction: float = 0.0,
+        hot_key_share: float = 0.01,
+        zipf_a: float = 1.2,
+        **kwargs,
+    ):
+        super().__init__(rate, **kwargs)
+        self.weights = (mix or WorkloadMix()).weights()
+        self.hot_fraction = hot_fraction
+        self.hot_key_share = hot_key_share
+        self.zipf_a = zipf_a
+        self.index = LiveIndex()
+        self.rows = {}
+
+    def _prepare(self) -> None:
+        with self.pool.connection() as conn:
+            self.index.load(conn)
+        logger.info(
+            f"Workload index loaded: {len(self.index.orders)} orders, "
+            f"{len(self.index.pending_payments)} pending payments, "
+            f"{len(self.index.products)} products"
+        )
+
+    def _records(self, rows: dict[str, int]) -> int:
+        """Operations applied by a batch; dropped ones are not counted."""
+        return sum(rows.values())
+
+    def _sample(self, ids: IdSet, rng: np.random.Generator, n: int) -> list[int]:
+        return ids.sample(rng, n, self.hot_fraction, self.hot_key_share)
+
+    def _write_batch(self, producer: int, n: int) -> dict[str, int]:
+        rng = self.generators[producer].rng
+        inserts, order_updates, payment_updates, stock_updates, deletes = (
+            rng.multinomial(n, self.weights).tolist()
+        )
+        now = dt.now(timezone.utc)
+        counts = {}
+
+        # targets leave the index up front so no other producer picks them,
+        # and go back into it if the transaction fails
+        with self.index.lock:
+            order_targets = self._pick_order_updates(rng, order_updates)
+            payment_targets = self._sample(
+                self.index.pending_payments, rng, payment_updates
+            )
+            for payment_id in payment_targets:
+                self.index.pending_payments.discard(payment_id)
+            delete_targets = self._sample(self.index.orders, rng, deletes)
+            deleted_status = [self.index.remove_order(i) for i in delete_targets]
+            stock_targets = self._pick_products(rng, stock_updates)
+
+        try:
+            with self.pool.connection() as conn:
+                with conn.cursor() as cur:
+                    if inserts:
+                        gen = self.generators[producer]
+                        with BATCH_PHASE_SECONDS.labels("build").time():
+                            batch = build_batch(cur, gen, inserts)
+                        with BATCH_PHASE_SECONDS.labels("copy").time():
+                            for table in TABLE_COLUMNS:
+                                copy_rows(cur, table, batch[table])
+                        counts["insert"] = inserts
+
+                    for status, ids in order_targets.items():
+                        cur.execute(
+                            "UPDATE orders SET status = %s WHERE id = ANY(%s)",
+                            (status, ids),
+                        )
+                        updated = counts.get("order_update", 0) + len(ids)
+                        counts["order_update"] = updated
+
+                    if payment_targets:
+                        picks = rng.choice(
+                            2, len(payment_targets), p=PAYMENT_OUTCOME_WEIGHTS
+                        )
+                        outcome = PAYMENT_OUTCOMES[picks].tolist()
+                        cur.execute(
+                            """
+                            UPDATE payments p
+                            SET status = v.status,
+                                paid_at = CASE WHEN v.status = 'paid' THEN %s END
+                            FROM unnest(%s::int[], %s::text[]) AS v(id, status)
+                            WHERE p.id = v.id
+                            """,
+                            (now, payment_targets, outcome),
+                        )
+                        counts["payment_update"] = len(payment_targets)
+
+                    if stock_targets:
+                        ids, qty = np.unique(stock_targets, return_counts=True)
+                        cur.execute(
+                            """
+                            UPDATE products p
+                            SET stock_quantity = GREATEST(p.stock_quantity - v.qty, 0)
+                            FROM unnest(%s::int[], %s::int[]) AS v(id, qty)
+                            WHERE p.id = v.id
+                            """,
+                            (ids.tolist(), qty.tolist()),
+                        )
+                        counts["stock_update"] = len(stock_targets)
+
+                    if delete_targets:
+                        cur.execute(
+                            "DELETE FROM payments WHERE order_id = ANY(%s) "
+                            "RETURNING id",
+                            (delete_targets,),
+                        )
+                        deleted_payments = [r[0] for r in cur.fetchall()]
+                        cur.execute(
+                            "DELETE FROM order_items WHERE order_id = ANY(%s)",
+                            (delete_targets,),
+                        )
+                        cur.execute(
+                            "DELETE FROM orders WHERE id = ANY(%s)", (delete_targets,)
+                        )
+                        counts["delete"] = len(delete_targets)
+                with BATCH_PHASE_SECONDS.labels("commit").time():
+                    conn.commit()
+        except Exception:
+            with self.index.lock:
+                self._restore(
+                    order_targets, payment_targets, zip(delete_targets, deleted_status)
+                )
+            raise
+
+        with self.index.lock:
+            if inserts:
+                self.index.add_batch(batch)
+            for status, ids in order_targets.items():
+                if status in self.index.orders_by_status:
+                    for order_id in ids:
+                        # skip orders deleted meanwhile
+                        if order_id in self.index.orders.pos:
+                            self.index.orders_by_status[status].add(order_id)
+            if delete_targets:
+                for payment_id in deleted_payments:
+                    self.index.pending_payments.discard(payment_id)
+
+        return counts
+
+    def _restore(
+        self,
+        order_targets: dict[str, list[int]],
+        payment_targets: list[int],
+        deleted: Iterable[tuple[int, str | None]],
+    ) -> None:
+        """Put the targets of a failed batch back into the index."""
+        for order_id, status in deleted:
+            self.index.add_order(order_id, status)
+        for status, ids in order_targets.items():
+            for order_id in ids:
+                if order_id in self.index.orders.pos:
+                    self.index.orders_by_status[PREVIOUS_STATUS[status]].add(order_id)
+        for payment_id in payment_targets:
+            self.index.pending_payments.add(payment_id)
+
+    def _pick_order_updates(
+        self, rng: np.random.Generator, n: int
+    ) -> dict[str, list[int]]:
+        """Pick orders to advance and move them out of their current status."""
+        pending = self.index.orders_by_status["pending"]
+        shipped = self.index.orders_by_status["shipped"]
+        total = len(pending) + len(shipped)
+        if n <= 0 or total == 0:
+            return {}
+        n_pending = rng.binomial(n, len(pending) / total)
+        targets = {
+            "shipped": self._sample(pending, rng, n_pending),
+            "delivered": self._sample(shipped, rng, n - n_pending),
+        }
+        for order_id in targets["shipped"]:
+            pending.discard(order_id)
+        for order_id in targets["delivered"]:
+            shipped.discard(order_id)
+        return {status: ids for status, ids in targets.items() if ids}
+
+    def _pick_products(self, rng: np.random.Generator, n: int) -> list[int]:
+        products = self.index.products.ids
+        if n <= 0 or not products:
+            return []
+        ranks = (rng.zipf(self.zipf_a, n) - 1) % len(products)
+        return [products[r] for r in ranks.tolist()]
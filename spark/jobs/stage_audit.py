@@ -0,0 +1,194 @@
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+import threading
+import time
+
+from pyspark.sql import DataFrame, Observation, SparkSession
+from pyspark.sql import functions as F
+from pyspark.sql.functions import col
+from pyspark.sql.types import (
+    BooleanType,
+    DateType,
+    LongType,
+    MapType,
+    StringType,
+    StructField,
+    StructType,
+    TimestampType,
+)
+
+AUDIT_TABLE = "lakehouse.audit.stage_ingest"
+CDC_OPS = ["c", "r", "u", "d"]
+# tables and streams append their rows concurrently, each in its own commit
+AUDIT_COMMIT_RETRIES = 20
+
+AUDIT_SCHEMA = StructType(
+    [
+        StructField("run_id", StringType(), False),
+        StructField("run_started_at", TimestampType(), False),
+        StructField("table", StringType(), False),
+        StructField("snapshot_id", LongType(), True),
+        StructField("input_rows", LongType(), True),
+        StructField("op_counts", MapType(StringType(), LongType()), True),
+        StructField("filtered_rows", LongType(), True),
+        StructField("output_rows", LongType(), True),
+        StructField("null_counts", MapType(StringType(), LongType()), True),
+        StructField("cast_failures", MapType(StringType(), LongType()), True),
+        StructField("min_event_date", DateType(), True),
+        StructField("max_event_date", DateType(), True),
+        StructField("metrics_complete", BooleanType(), False),
+    ]
+)
+
+
+def _count_if(condition) -> Any:
+    return F.sum(F.when(condition, 1).otherwise(0))
+
+
+def observe_input(
+    raw: DataFrame,
+    table_cfg: dict[str, Any],
+    filter_ops: List[str],
+    name: str | None = None,
+) -> Tuple[DataFrame, Observation]:
+    """Count raw events by op, filtered events and failed casts on the read.
+
+    A cast failure is a value present in the source that the configured type
+    turns into null; only events passing the op filter are checked. Pass a
+    name when one plan observes several reads of the same table.
+    """
+    kept = col("op").isin(filter_ops) if filter_ops else F.lit(True)
+    exprs = [F.count(F.lit(1)).alias("input_rows")]
+    exprs += [_count_if(col("op") == op).alias(f"op_{op}") for op in CDC_OPS]
+    exprs.append(_count_if(~kept).alias("filtered_rows"))
+    for c in table_cfg["schema"]:
+        src = col(c["source"])
+        failed = kept & src.isNotNull() & src.cast(c["type"]).isNull()
+        exprs.append(_count_if(failed).alias(f"cast_{c['name']}"))
+
+    observation = Observation(name or f"stage_input_{table_cfg['name']}")
+    return raw.observe(observation, *exprs), observation
+
+
+def output_metrics(output_cols: List[str], written: Any = None) -> List[Any]:
+    """Aggregates of written rows, nulls per column and the event_date range.
+
+    With a written condition, only the rows matching it are counted.
+    """
+    written = F.lit(True) if written is None else written
+    exprs = [_count_if(written).alias("output_rows")]
+    exprs += [
+        _count_if(written & col(c).isNull()).alias(f"null_{c}") for c in output_cols
+    ]
+    if "event_date" in output_cols:
+        event_date = F.when(written, col("event_date"))
+        exprs += [
+            F.min(event_date).alias("min_event_date"),
+            F.max(event_date).alias("max_event_date"),
+        ]
+    return exprs
+
+
+def observe_output(
+    df: DataFrame, table_cfg: dict[str, Any], output_cols: List[str]
+) -> Tuple[DataFrame, Observation]:
+    """Observe output_metrics on the frame that is written."""
+    observation = Observation(f"stage_output_{table_cfg['name']}")
+    return df.observe(observation, *output_metrics(output_cols)), observation
+
+
+def observed(*observations: Any, timeout: float = 30.0) -> List[Dict[str, Any] | None]:
+    """Metrics of each observation, or None where a query never reported them.
+
+    Observation.get blocks until the metrics arrive, so each is waited for on
+    a daemon thread instead of risking a hung job, all within one timeout.
+    Metrics that were aggregated directly (a dict) are passed through.
+    """
+    results: List[Dict[str, Any] | None] = [
+        o if isinstance(o, dict) else None for o in observations
+    ]
+
+    def wait(i: int, observation: Observation) -> None:
+        results[i] = observation.get
+
+    waiters = [
+        threading.Thread(target=wait, args=(i, o), daemon=True)
+        for i, o in enumerate(observations)
+        if not isinstance(o, dict)
+    ]
+    for waiter in waiters:
+        waiter.start()
+    deadline = time.monotonic() + timeout
+    for waiter in waiters:
+        waiter.join(max(0.0, deadline - time.monotonic()))
+    return list(results)
+
+
+def sum_metrics(metrics: List[Dict[str, Any] | None]) -> Dict[str, Any] | None:
+    """Sum the input metrics of several observed reads, None if one is missing."""
+    if any(m is None for m in metrics):
+        return None
+    total: Dict[str, Any] = {}
+    for m in metrics:
+        for k, v in m.items():
+            total[k] = total.get(k, 0) + (v or 0)
+    return total
+
+
+def audit_record(
+    table_cfg: dict[str, Any],
+    snapshot_id: int | None,
+    input_metrics: Dict[str, Any] | None,
+    output_metrics: Dict[str, Any] | None,
+) -> Dict[str, Any]:
+    """One audit row for a table from its input and output observations."""
+    i, o = input_metrics or {}, output_metrics or {}
+    return {
+        "table": table_cfg["name"],
+        "snapshot_id": snapshot_id,
+        "input_rows": i.get("input_rows"),
+        "op_counts": {op: i[f"op_{op}"] for op in CDC_OPS if f"op_{op}" in i},
+        "filtered_rows": i.get("filtered_rows"),
+        "output_rows": o.get("output_rows"),
+        "null_counts": {
+            k.removeprefix("null_"): v for k, v in o.items() if k.startswith("null_")
+        },
+        "cast_failures": {
+            k.removeprefix("cast_"): v for k, v in i.items() if k.startswith("cast_")
+        },
+        "min_event_date": o.get("min_event_date"),
+        "max_event_date": o.get("max_event_date"),
+        "metrics_complete": input_metrics is not None and output_metrics is not None,
+    }
+
+
+def ensure_audit_table(spark: SparkSession) -> None:
+    """Create the audit table up front, before writers race to create it."""
+    spark.sql("CREATE NAMESPACE IF NOT EXISTS lakehouse.audit")
+    if spark._jsparkSession.catalog().tableExists(AUDIT_TABLE):
+        return
+    (
+        spark.createDataFrame([], AUDIT_SCHEMA)
+        .writeTo(AUDIT_TABLE)
+        .tableProperty("format-version", "2")
+        .tableProperty("commit.retry.num-retries", str(AUDIT_COMMIT_RETRIES))
+        .create()
+    )
+    print(f"Created table {AUDIT_TABLE}")
+
+
+def write_audit(
+    spark: SparkSession,
+    run_id: str,
+    run_started_at: datetime,
+    records: List[Dict[str, Any]],
+) -> None:
+    """Append audit records in one commit; see ensure_audit_table."""
+    if not records:
+        return
+    rows = [{**r, "run_id": run_id, "run_started_at": run_started_at} for r in records]
+    df = spark.createDataFrame(
+        [tuple(r[f.name] for f in AUDIT_SCHEMA.fields) for r in rows], AUDIT_SCHEMA
+    )
+    df.writeTo(AUDIT_TABLE).append()
+    print(f"Wrote {len(rows)} audit records to {AUDIT_TABLE}")
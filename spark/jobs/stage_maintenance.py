@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+import argparse
+import json
+import os
+
+from pyspark.sql import SparkSession
+
+from lakehouse.spark_session import get_spark
+from storefront_raw_stage import (
+    RAW_OFFSETS_PROPERTY,
+    STAGE_NAMESPACE,
+    TABLE_CATALOG,
+    committed_offsets,
+    load_config,
+)
+
+
+def _ts(hours_ago: float) -> str:
+    # with an explicit offset, so the cutoff does not shift with the session
+    # time zone that zone-less literals are read in
+    t = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    return f"TIMESTAMP '{t.strftime('%Y-%m-%d %H:%M:%S')}+00:00'"
+
+
+def file_stats(spark: SparkSession, table_fqn: str) -> Dict[str, int]:
+    row = spark.sql(
+        f"SELECT count(*) AS files, coalesce(sum(file_size_in_bytes), 0) AS bytes "
+        f"FROM {table_fqn}.files"
+    ).collect()[0]
+    snapshots = spark.sql(f"SELECT count(*) FROM {table_fqn}.snapshots").collect()[0][0]
+    return {"files": row["files"], "bytes": row["bytes"], "snapshots": snapshots}
+
+
+def pin_offsets(spark: SparkSession, table_fqn: str) -> None:
+    """Keep the incremental checkpoint readable after its snapshot expires."""
+    offsets = committed_offsets(spark, table_fqn)
+    if offsets:
+        value = json.dumps({str(p): o for p, o in sorted(offsets.items())})
+        spark.sql(
+            f"ALTER TABLE {table_fqn} SET TBLPROPERTIES "
+            f"('{RAW_OFFSETS_PROPERTY}' = '{value}')"
+        )
+
+
+def rewrite_strategy(layout: Dict[str, Any]) -> str:
+    """rewrite_data_files arguments clustering files per the table layout."""
+    if layout.get("zorder"):
+        columns = ", ".join(layout["zorder"])
+        return f"strategy => 'sort', sort_order => 'zorder({columns})', "
+    if layout.get("sort_order"):
+        return "strategy => 'sort', "  # the table's write order
+    return ""
+
+
+def maintain_table(
+    spark: SparkSession,
+    name: str,
+    cfg: Dict[str, Any],
+    layout: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    table_fqn = f"{TABLE_CATALOG}.{STAGE_NAMESPACE}.{name}"
+    table_ref = f"{STAGE_NAMESPACE}.{name}"
+    if not spark._jsparkSession.catalog().tableExists(table_fqn):
+        print(f"Skipping {table_fqn}: table does not exist")
+        return {"table": name}
+
+    print(f"Maintaining {table_fqn}")
+    before = file_stats(spark, table_fqn)
+    result: Dict[str, Any] = {"table": name}
+
+    rewritten = spark.sql(
+        f"CALL {TABLE_CATALOG}.system.rewrite_data_files("
+        f"table => '{table_ref}', "
+        f"{rewrite_strategy(layout or {})}"
+        f"options => map("
+        f"'target-file-size-bytes', '{cfg['target_file_size_bytes']}', "
+        f"'min-input-files', '{cfg['min_input_files']}'))"
+    ).collect()[0]
+    result["rewritten_files"] = rewritten["rewritten_data_files_count"]
+    result["added_files"] = rewritten["added_data_files_count"]
+
+    if cfg.get("rewrite_manifests", True):
+        manifests = spark.sql(
+            f"CALL {TABLE_CATALOG}.system.rewrite_manifests('{table_ref}')"
+        ).collect()[0]
+        result["rewritten_manifests"] = manifests["rewritten_manifests_count"]
+
+    pin_offsets(spark, table_fqn)
+    expired = spark.sql(
+        f"CALL {TABLE_CATALOG}.system.expire_snapshots("
+        f"table => '{table_ref}', "
+        f"older_than => {_ts(cfg['expire_older_than_hours'])}, "
+        f"retain_last => {cfg['retain_last']})"
+    ).collect()[0]
+    result["expired_data_files"] = expired["deleted_data_files_count"]
+
+    orphans = spark.sql(
+        f"CALL {TABLE_CATALOG}.system.remove_orphan_files("
+        f"table => '{table_ref}', "
+        f"older_than => {_ts(cfg['orphan_older_than_hours'])})"
+    ).collect()
+    result["orphan_files"] = len(orphans)
+
+    after = file_stats(spark, table_fqn)
+    for k in before:
+        result[f"{k}_before"] = before[k]
+        result[f"{k}_after"] = after[k]
+    return result
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    cols = [
+        "files_before",
+        "files_after",
+        "bytes_before",
+        "bytes_after",
+        "snapshots_before",
+        "snapshots_after",
+        "orphan_files",
+    ]
+    print(f"{'table':<15}" + "".join(f"{c:>18}" for c in cols))
+    for r in results:
+        print(f"{r['table']:<15}" + "".join(f"{r.get(c, '-'):>18}" for c in cols))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compact and clean stage tables")
+    parser.add_argument("--tables", nargs="*", help="Subset of tables to maintain")
+    parser.add_argument(
+        "--profile",
+        default=os.getenv("SPARK_PROFILE", "maintenance"),
+        help="Spark tuning profile, see lakehouse.spark_session.PROFILES",
+    )
+    args = parser.parse_args()
+
+    spark = get_spark("stage_maintenance_job", profile=args.profile)
+    source = load_config()["sources"][0]
+    defaults = source.get("maintenance", {})
+
+    results = []
+    for table in source["tables"]:
+        if args.tables and table["name"] not in args.tables:
+            continue
+        cfg = {**defaults, **table.get("maintenance", {})}
+        results.append(maintain_table(spark, table["name"], cfg, table.get("layout")))
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,105 +1,722 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Tuple, List, Dict
+import argparse
+import json
+import os
+import re
+import time
+import uuid
 
 import yaml
 from pyspark.sql import SparkSession, DataFrame
+from pyspark.java_gateway import ensure_callback_server_started
 from pyspark.sql import functions as F
 from pyspark.sql.functions import col
+from pyspark.sql.window import Window
 
 from lakehouse.spark_session import get_spark
+from stage_audit import (
+    audit_record,
+    ensure_audit_table,
+    observe_input,
+    observe_output,
+    observed,
+    output_metrics,
+    write_audit,
+)
 
 STAGE_CONFIG = Path(__file__).parent / "stage_tables.yaml"
 STAGE_NAMESPACE = "stage.storefront"
 TABLE_CATALOG = "lakehouse"
 
+# CDC operation carried through prepared frames in merge mode
+CDC_OP_COL = "_cdc_op"
+# snapshot summary key holding the last ingested S3 sink offset per partition
+RAW_OFFSETS_PROPERTY = "raw.kafka-offsets"
+# table property recording the `layout` last applied from stage_tables.yaml
+LAYOUT_PROPERTY = "stage.layout"
+# table property recording the `mode` the table is written in
+MODE_PROPERTY = "stage.mode"
+# table property naming the job that owns the table: "batch" or "stream"
+WRITER_PROPERTY = "stage.writer"
+# snapshot summary keys identifying the micro-batch a streamed commit came from
+STREAM_QUERY_PROPERTY = "stream.query-id"
+STREAM_BATCH_PROPERTY = "stream.batch-id"
+# S3 sink object names: <topic>+<kafkaPartition>+<startOffset>.<format>
+SINK_FILE_RE = re.compile(r"\+(?P<partition>\d+)\+(?P<offset>\d+)\.(?P<ext>\w+)$")
+
+
+@dataclass(frozen=True)
+class RawFile:
+    path: str
+    partition: int
+    offset: int
+    size: int
+
 
 def load_config() -> dict[str, Any]:
     with open(STAGE_CONFIG) as f:
         return yaml.safe_load(f)
 
 
+def list_raw_files(spark: SparkSession, source_path: str, fmt: str) -> List[RawFile]:
+    jvm = spark._jvm
+    path = jvm.org.apache.hadoop.fs.Path(source_path)
+    fs = path.getFileSystem(spark._jsc.hadoopConfiguration())
+    if not fs.exists(path):
+        return []
+
+    files = []
+    it = fs.listFiles(path, True)
+    while it.hasNext():
+        status = it.next()
+        m = SINK_FILE_RE.search(status.getPath().getName())
+        if m and m.group("ext") == fmt:
+            files.append(
+                RawFile(
+                    path=status.getPath().toString(),
+                    partition=int(m.group("partition")),
+                    offset=int(m.group("offset")),
+                    size=status.getLen(),
+                )
+            )
+    return sorted(files, key=lambda f: (f.partition, f.offset))
+
+
+def committed_offsets(spark: SparkSession, table_fqn: str) -> Dict[int, int]:
+    """Highest S3 sink start offset already ingested, per Kafka partition."""
+    if not spark._jsparkSession.catalog().tableExists(table_fqn):
+        return {}
+    rows = spark.sql(
+        f"SELECT summary['{RAW_OFFSETS_PROPERTY}'] AS offsets "
+        f"FROM {table_fqn}.snapshots "
+        f"WHERE summary['{RAW_OFFSETS_PROPERTY}'] IS NOT NULL "
+        "ORDER BY committed_at DESC LIMIT 1"
+    ).collect()
+    if rows:
+        offsets = rows[0]["offsets"]
+    else:
+        # snapshots carrying the offsets may have been expired; maintenance
+        # copies the latest value into a table property beforehand
+        props = spark.sql(f"SHOW TBLPROPERTIES {table_fqn}").collect()
+        offsets = next(
+            (r["value"] for r in props if r["key"] == RAW_OFFSETS_PROPERTY), None
+        )
+    if not offsets:
+        return {}
+    return {int(p): o for p, o in json.loads(offsets).items()}
+
+
+def select_new_files(
+    files: List[RawFile], committed: Dict[int, int]
+) -> Tuple[List[RawFile], Dict[int, int]]:
+    new_files = [f for f in files if f.offset > committed.get(f.partition, -1)]
+    offsets = dict(committed)
+    for f in new_files:
+        offsets[f.partition] = max(offsets.get(f.partition, -1), f.offset)
+    return new_files, offsets
+
+
+def stage_filter_ops(table_cfg: dict[str, Any]) -> List[str]:
+    """Ops kept from the raw events; deletes are applied in merge mode."""
+    filter_ops = table_cfg.get("filter_op", [])
+    merge = table_cfg.get("mode", "append") == "merge"
+    if merge and filter_ops and "d" not in filter_ops:
+        filter_ops = [*filter_ops, "d"]
+    return filter_ops
+
+
 def _prep_dataframe(
     df: DataFrame, table_cfg: dict[str, Any]
 ) -> Tuple[DataFrame, List[str], Dict[str, str]]:
-    filter_ops = table_cfg.get("filter_op", [])
+    """Filter and project a raw CDC frame in a single select.
+
+    Only the referenced `after.*`/`before.*` fields plus `op`/`ts_ms` are
+    read, so Avro column pruning can skip the rest of the envelope.
+    """
+    filter_ops = stage_filter_ops(table_cfg)
     schema_map = {c["name"]: c["source"] for c in table_cfg["schema"]}
     type_map = {c["name"]: c["type"] for c in table_cfg["schema"]}
+    merge = table_cfg.get("mode", "append") == "merge"
+    keys = table_cfg.get("keys", ["id"])
 
     if filter_ops:
         df = df.filter(col("op").isin(filter_ops))
 
+    exprs = {}
     for tgt, src in schema_map.items():
-        df = df.withColumn(tgt, col(src).cast(type_map[tgt]))
+        c = col(src)
+        if merge and tgt in keys and src.startswith("after."):
+            # deletes only carry the key in `before`
+            c = F.coalesce(c, col(f"before.{src.removeprefix('after.')}"))
+        exprs[tgt] = c.cast(type_map[tgt])
 
     output_cols = list(schema_map.keys())
     full_type_map = type_map.copy()
 
+    event_date = None
     if "created_at" in output_cols:  # use business time stamp
-        df = df.withColumn(
-            "event_date", F.to_date((F.col("created_at") / 1_000_000).cast("timestamp"))
-        )
-        df = df.withColumn("event_date_source", F.lit("created_at"))
-        output_cols += ["event_date", "event_date_source"]
-        full_type_map["event_date"] = "date"
-        full_type_map["event_date_source"] = "string"
+        event_date = (exprs["created_at"] / 1_000_000).cast("timestamp"), "created_at"
     elif "ts_ms" in df.columns:  # use Kafka ingest time stamp
-        df = df.withColumn(
-            "event_date", F.to_date((F.col("ts_ms") / 1000).cast("timestamp"))
-        )
-        df = df.withColumn("event_date_source", F.lit("ts_ms"))
+        event_date = (col("ts_ms") / 1000).cast("timestamp"), "ts_ms"
+    if event_date is not None:
+        exprs["event_date"] = F.to_date(event_date[0])
+        exprs["event_date_source"] = F.lit(event_date[1])
         output_cols += ["event_date", "event_date_source"]
         full_type_map["event_date"] = "date"
         full_type_map["event_date_source"] = "string"
 
-    return df.select(*output_cols), output_cols, full_type_map
+    projection = [e.alias(name) for name, e in exprs.items()]
 
+    if merge:  # latest event per key
+        df = df.select(
+            *projection,
+            col("op").alias(CDC_OP_COL),
+            col("ts_ms").alias("_ts_ms"),
+            col("source.lsn").alias("_lsn"),
+        )
+        latest = Window.partitionBy(*keys).orderBy(
+            col("_ts_ms").desc(), col("_lsn").desc_nulls_last()
+        )
+        df = df.withColumn("_rn", F.row_number().over(latest)).filter(col("_rn") == 1)
+        return df.select(*output_cols, CDC_OP_COL), output_cols, full_type_map
 
-def ingest_table(spark: SparkSession, table_cfg: dict[str, Any]) -> None:
-    name = table_cfg["name"]
-    source_path = table_cfg["source_path"]
-    fmt = table_cfg["format"]
-    partitions = table_cfg.get("partitions", [])
-    user_props = table_cfg.get("table_properties", {})
+    return df.select(*projection), output_cols, full_type_map
 
-    table_fqn = f"{TABLE_CATALOG}.{STAGE_NAMESPACE}.{name}"
-    print(f"Ingesting '{name}' from {source_path}")
 
-    raw = spark.read.format(fmt).load(source_path)
-    df_final, output_cols, type_map = _prep_dataframe(raw, table_cfg)
+def run_with_snapshot_properties(
+    spark: SparkSession, props: Dict[str, str], sql: str
+) -> None:
+    """Run a SQL write so its Iceberg snapshot summary carries props."""
+    if not props:
+        spark.sql(sql)
+        return
+
+    gateway = spark.sparkContext._gateway
+    ensure_callback_server_started(gateway)
+
+    class SqlCallable:
+        def call(self):
+            spark.sql(sql)
+
+        class Java:
+            implements = ["java.util.concurrent.Callable"]
+
+    jprops = spark._jvm.java.util.HashMap()
+    for k, v in props.items():
+        jprops.put(k, v)
+    spark._jvm.org.apache.iceberg.spark.CommitMetadata.withCommitProperties(
+        jprops,
+        SqlCallable(),
+        spark._jvm.java.lang.Class.forName("java.lang.RuntimeException"),
+    )
+
+
+def merge_into_table(
+    spark: SparkSession,
+    df: DataFrame,
+    table_fqn: str,
+    output_cols: List[str],
+    keys: List[str],
+    snapshot_props: Dict[str, str],
+) -> Dict[str, Any]:
+    """Apply a collapsed CDC batch: upsert c/u/r rows and delete d rows.
+
+    A row keeps the event_date it was first written with, so the ON clause
+    also matches on event_date and is restricted to the batch's dates for
+    partition pruning. Rows whose target partition is not known from the
+    batch (deletes without created_at, and every row of a ts_ms-dated table)
+    get it from a lookup of their keys in the target. An empty batch commits
+    an empty append instead, which still records snapshot_props.
+
+    Returns the audit output metrics of the upserted rows, aggregated with
+    the batch bounds; observing the MERGE source would also count deletes
+    and fire on the queries that plan it.
+    """
+    written = col(CDC_OP_COL) != "d"
+    batch = df.persist()
+    try:
+        bounds = [F.count(F.lit(1)).alias("_rows")]
+        if len(keys) == 1:
+            bounds += [F.min(keys[0]).alias("_lo"), F.max(keys[0]).alias("_hi")]
+        stats = batch.agg(*bounds, *output_metrics(output_cols, written)).collect()[0]
+        rows, *key_range = stats[: len(bounds)]
+        metrics = stats.asDict()
+        for k in ("_rows", "_lo", "_hi"):
+            metrics.pop(k, None)
+        if rows == 0:
+            empty = spark.createDataFrame([], batch.drop(CDC_OP_COL).schema)
+            writer = empty.writeTo(table_fqn)
+            for k, v in snapshot_props.items():
+                writer = writer.option(f"snapshot-property.{k}", v)
+            writer.append()
+            return metrics
+
+        df = batch
+        prune = "event_date" in output_cols
+        if prune:
+            # business-time dates only miss on deletes; ts_ms dates of later
+            # events differ from the one the row was written with
+            business_time = "created_at" in output_cols
+            target = spark.table(table_fqn).select(
+                *keys, col("event_date").alias("_target_date")
+            )
+            if key_range:
+                target = target.filter(col(keys[0]).between(*key_range))
+            unresolved = df.filter(col("event_date").isNull()) if business_time else df
+            resolved = (
+                unresolved.join(target, keys, "left")
+                .withColumn("event_date", F.coalesce("_target_date", "event_date"))
+                .drop("_target_date")
+            )
+            if business_time:
+                df = df.filter(col("event_date").isNotNull()).unionByName(resolved)
+            else:
+                df = resolved
+
+        view = f"_merge_{table_fqn.replace('.', '_')}"
+        df.createOrReplaceTempView(view)
+
+        on = [f"t.{k} = s.{k}" for k in keys]
+        if prune:
+            # the event_date metrics follow the resolved dates rows are kept in
+            per_date = (
+                df.groupBy("event_date")
+                .agg(F.sum(F.when(written, 1).otherwise(0)).alias("rows"))
+                .collect()
+            )
+            dates = [r[0] for r in per_date if r[0] is not None]
+            kept = [r[0] for r in per_date if r[0] is not None and r[1] > 0]
+            metrics["null_event_date"] = sum(r[1] for r in per_date if r[0] is None)
+            metrics["min_event_date"] = min(kept, default=None)
+            metrics["max_event_date"] = max(kept, default=None)
+            on.append("t.event_date = s.event_date")
+            if dates:
+                on.append(
+                    "t.event_date IN ("
+                    + ", ".join(f"DATE '{d.isoformat()}'" for d in dates)
+                    + ")"
+                )
 
-    if df_final.limit(1).count() == 0:
-        print(f"No rows to write for {table_fqn}")
+        # event_date stays as first written so rows keep their partition
+        update_cols = [
+            c for c in output_cols if c not in keys and not c.startswith("event_date")
+        ]
+        sql = f"""
+            MERGE INTO {table_fqn} t
+            USING {view} s
+            ON {" AND ".join(on)}
+            WHEN MATCHED AND s.{CDC_OP_COL} = 'd' THEN DELETE
+            WHEN MATCHED THEN UPDATE SET {", ".join(f"t.{c} = s.{c}" for c in update_cols)}
+            WHEN NOT MATCHED AND s.{CDC_OP_COL} != 'd' THEN
+                INSERT ({", ".join(output_cols)})
+                VALUES ({", ".join(f"s.{c}" for c in output_cols)})
+        """
+        run_with_snapshot_properties(spark, snapshot_props, sql)
+        spark.catalog.dropTempView(view)
+        return metrics
+    finally:
+        batch.unpersist()
+
+
+def check_table_mode(
+    spark: SparkSession, table_fqn: str, table_cfg: dict[str, Any]
+) -> None:
+    """Refuse to merge into a table written in append mode.
+
+    An append table holds one row per version, so MERGE would fail on its
+    duplicate keys (cardinality violation). Tables created before the mode
+    was recorded get the configured mode stamped on first use; for merge,
+    only after checking that no key occurs twice.
+    """
+    mode = table_cfg.get("mode", "append")
+    props = {
+        r["key"]: r["value"]
+        for r in spark.sql(f"SHOW TBLPROPERTIES {table_fqn}").collect()
+    }
+    recorded = props.get(MODE_PROPERTY)
+    if recorded == mode:
+        return
+    if mode == "merge" and recorded is None:
+        keys = ", ".join(table_cfg.get("keys", ["id"]))
+        duplicates = spark.sql(
+            f"SELECT {keys} FROM {table_fqn} "
+            f"GROUP BY {keys} HAVING count(*) > 1 LIMIT 1"
+        ).collect()
+        if duplicates:
+            recorded = "append"
+    if recorded == "append" and mode == "merge":
+        raise ValueError(
+            f"{table_fqn} was written in append mode and may hold several rows "
+            f"per key; drop it and re-ingest from raw to switch it to merge mode"
+        )
+    spark.sql(
+        f"ALTER TABLE {table_fqn} SET TBLPROPERTIES ('{MODE_PROPERTY}' = '{mode}')"
+    )
+
+
+def check_table_writer(spark: SparkSession, table_fqn: str, writer: str) -> None:
+    """Refuse to write a table owned by the other ingest job.
+
+    The batch job tracks raw sink offsets and the streaming job Kafka
+    checkpoints; neither sees what the other ingested, so writing a table
+    from both duplicates every event. Tables created before the writer was
+    recorded are claimed on first use, unless their snapshots show the
+    other job's commits.
+    """
+    props = {
+        r["key"]: r["value"]
+        for r in spark.sql(f"SHOW TBLPROPERTIES {table_fqn}").collect()
+    }
+    recorded = props.get(WRITER_PROPERTY)
+    if recorded == writer:
         return
+    if recorded is None:
+        other_key = (
+            RAW_OFFSETS_PROPERTY if writer == "stream" else STREAM_QUERY_PROPERTY
+        )
+        other = spark.sql(
+            f"SELECT 1 FROM {table_fqn}.snapshots "
+            f"WHERE summary['{other_key}'] IS NOT NULL LIMIT 1"
+        ).collect()
+        if other:
+            recorded = "batch" if writer == "stream" else "stream"
+    if recorded is not None:
+        raise ValueError(
+            f"{table_fqn} is written by the {recorded} ingest job; stop it and "
+            f"set '{WRITER_PROPERTY}' to '{writer}' to hand the table over"
+        )
+    spark.sql(
+        f"ALTER TABLE {table_fqn} SET TBLPROPERTIES ('{WRITER_PROPERTY}' = '{writer}')"
+    )
+
 
+def ensure_namespace(spark: SparkSession) -> None:
     spark.sql(f"CREATE NAMESPACE IF NOT EXISTS {TABLE_CATALOG}.stage")
     spark.sql(f"CREATE NAMESPACE IF NOT EXISTS {TABLE_CATALOG}.stage.storefront")
 
+
+@dataclass
+class IngestPlan:
+    table_fqn: str
+    paths: List[str]
+    input_bytes: int
+    snapshot_props: Dict[str, str] = field(default_factory=dict)
+
+
+def plan_ingest(spark: SparkSession, table_cfg: dict[str, Any]) -> IngestPlan:
+    """Resolve which raw paths a run reads, and how many bytes that is."""
+    source_path = table_cfg["source_path"]
+    fmt = table_cfg["format"]
+    table_fqn = f"{TABLE_CATALOG}.{STAGE_NAMESPACE}.{table_cfg['name']}"
+
+    if not table_cfg.get("incremental", False):
+        path = spark._jvm.org.apache.hadoop.fs.Path(source_path)
+        fs = path.getFileSystem(spark._jsc.hadoopConfiguration())
+        size = fs.getContentSummary(path).getLength() if fs.exists(path) else 0
+        return IngestPlan(table_fqn, [source_path], size)
+
+    files = list_raw_files(spark, source_path, fmt)
+    new_files, offsets = select_new_files(files, committed_offsets(spark, table_fqn))
+    print(f"{len(new_files)} new of {len(files)} raw files for {table_fqn}")
+    return IngestPlan(
+        table_fqn,
+        [f.path for f in new_files],
+        sum(f.size for f in new_files),
+        {
+            RAW_OFFSETS_PROPERTY: json.dumps(
+                {str(p): o for p, o in sorted(offsets.items())}
+            )
+        },
+    )
+
+
+def last_snapshot(
+    spark: SparkSession, table_fqn: str
+) -> Tuple[int | None, Dict[str, str]]:
+    rows = spark.sql(
+        f"SELECT snapshot_id, summary FROM {table_fqn}.snapshots "
+        "ORDER BY committed_at DESC LIMIT 1"
+    ).collect()
+    return (rows[0]["snapshot_id"], dict(rows[0]["summary"])) if rows else (None, {})
+
+
+def layout_properties(layout: dict[str, Any]) -> Dict[str, str]:
+    """Iceberg table properties for the bloom filters and metrics of a layout."""
+    props = {}
+    for c in layout.get("bloom_filters", []):
+        props[f"write.parquet.bloom-filter-enabled.column.{c}"] = "true"
+    metrics = layout.get("metrics", {})
+    if "default" in metrics:
+        props["write.metadata.metrics.default"] = str(metrics["default"])
+    for c, mode in metrics.get("columns", {}).items():
+        props[f"write.metadata.metrics.column.{c}"] = str(mode)
+    return props
+
+
+def apply_table_layout(
+    spark: SparkSession, table_fqn: str, table_cfg: dict[str, Any]
+) -> None:
+    """Evolve sort order, bloom filters and metrics modes to the config.
+
+    The applied layout is kept in a table property, so an unchanged table
+    costs one SHOW TBLPROPERTIES and dropped settings can be unset. New
+    settings only affect files written from then on.
+    """
+    layout = table_cfg.get("layout", {})
+    value = json.dumps(layout, sort_keys=True)
+    props = {
+        r["key"]: r["value"]
+        for r in spark.sql(f"SHOW TBLPROPERTIES {table_fqn}").collect()
+    }
+    if props.get(LAYOUT_PROPERTY, "{}") == value:
+        return
+    applied = json.loads(props.get(LAYOUT_PROPERTY, "{}"))
+
+    new_props = layout_properties(layout)
+    stale = [k for k in layout_properties(applied) if k not in new_props]
+    if stale:
+        keys = ", ".join(f"'{k}'" for k in stale)
+        spark.sql(f"ALTER TABLE {table_fqn} UNSET TBLPROPERTIES IF EXISTS ({keys})")
+
+    sort_order = layout.get("sort_order", [])
+    if sort_order != applied.get("sort_order", []):
+        if sort_order:
+            spark.sql(
+                f"ALTER TABLE {table_fqn} WRITE ORDERED BY {', '.join(sort_order)}"
+            )
+        else:
+            spark.sql(f"ALTER TABLE {table_fqn} WRITE UNORDERED")
+
+    new_props[LAYOUT_PROPERTY] = value
+    pairs = ", ".join(f"'{k}' = '{v}'" for k, v in new_props.items())
+    spark.sql(f"ALTER TABLE {table_fqn} SET TBLPROPERTIES ({pairs})")
+    print(f"Applied layout {value} to {table_fqn}")
+
+
+def write_stage_frame(
+    spark: SparkSession,
+    table_cfg: dict[str, Any],
+    table_fqn: str,
+    df_final: DataFrame,
+    output_cols: List[str],
+    snapshot_props: Dict[str, str],
+    writer: str = "batch",
+) -> Dict[str, Any]:
+    """Append or merge a prepared frame, creating the table on first write.
+
+    writer is the job writing it, "batch" or "stream"; see check_table_writer.
+
+    `output_metrics` of the result is the Observation of an append, or the
+    metrics a merge aggregated itself; `stage_audit.observed` takes either.
+    """
+    partitions = table_cfg.get("partitions", [])
+    user_props = table_cfg.get("table_properties", {})
+
+    # no emptiness pre-scan: an empty batch commits an empty snapshot, which
+    # also records the offsets of files whose events were all filtered out
+    # (merge counts its cached batch and skips MERGE for an empty one)
+    ensure_namespace(spark)
+
     default_props = {
         "format-version": "2",
         "write.parquet.compression-codec": "snappy",
     }
-    table_props = {**default_props, **user_props}
+    merge = table_cfg.get("mode", "append") == "merge"
+    table_props = {
+        **default_props,
+        **user_props,
+        MODE_PROPERTY: "merge" if merge else "append",
+        WRITER_PROPERTY: writer,
+    }
 
     exists = spark._jsparkSession.catalog().tableExists(table_fqn)
 
     if not exists:
-        writer = df_final.writeTo(table_fqn)
+        # created empty, so the first batch is already written in layout order;
+        # from the schema alone, so observed metrics only see the real write
+        schema = (df_final.drop(CDC_OP_COL) if merge else df_final).schema
+        creator = spark.createDataFrame([], schema).writeTo(table_fqn)
         if partitions:
-            writer = writer.partitionedBy(*[col(p) for p in partitions])
+            creator = creator.partitionedBy(*[col(p) for p in partitions])
         for k, v in table_props.items():
-            writer = writer.tableProperty(str(k), str(v))
-        writer.create()
+            creator = creator.tableProperty(str(k), str(v))
+        creator.create()
         print(f"Created table {table_fqn}")
     else:
-        df_final.writeTo(table_fqn).append()
-        print(f"Appended to {table_fqn}")
+        check_table_writer(spark, table_fqn, writer)
+        check_table_mode(spark, table_fqn, table_cfg)
+    apply_table_layout(spark, table_fqn, table_cfg)
+
+    if merge and exists:
+        metrics = merge_into_table(
+            spark,
+            df_final,
+            table_fqn,
+            output_cols,
+            table_cfg.get("keys", ["id"]),
+            snapshot_props,
+        )
+        print(f"Merged into {table_fqn}")
+        snapshot_id, summary = last_snapshot(spark, table_fqn)
+        return {
+            "snapshot_id": snapshot_id,
+            "output_rows": int(summary.get("added-records", 0)),
+            "deleted_rows": int(summary.get("deleted-records", 0)),
+            "output_metrics": metrics,
+        }
+    if merge:  # first load: nothing to update or delete yet
+        df_final = df_final.filter(col(CDC_OP_COL) != "d").drop(CDC_OP_COL)
+
+    df_final, observation = observe_output(df_final, table_cfg, output_cols)
+    writer = df_final.writeTo(table_fqn)
+    for k, v in snapshot_props.items():
+        writer = writer.option(f"snapshot-property.{k}", v)
+    writer.append()
+    print(f"Appended to {table_fqn}")
+
+    snapshot_id, summary = last_snapshot(spark, table_fqn)
+    return {
+        "snapshot_id": snapshot_id,
+        "output_rows": int(summary.get("added-records", 0)),
+        "output_metrics": observation,
+    }
+
+
+def ingest_table(
+    spark: SparkSession, table_cfg: dict[str, Any], plan: IngestPlan | None = None
+) -> Dict[str, Any]:
+    name = table_cfg["name"]
+    source_path = table_cfg["source_path"]
+    fmt = table_cfg["format"]
+
+    start = time.perf_counter()
+    plan = plan or plan_ingest(spark, table_cfg)
+    stats = {"table": name, "input_bytes": plan.input_bytes, "output_rows": 0}
+    print(f"Ingesting '{name}' from {source_path}")
+
+    def done(**extra) -> Dict[str, Any]:
+        return {**stats, **extra, "wall_s": round(time.perf_counter() - start, 2)}
+
+    if not plan.paths:
+        print(f"No new files to ingest for {plan.table_fqn}")
+        return done()
+
+    # data-quality metrics are observed on the read and the write itself
+    raw, observed_input = observe_input(
+        spark.read.format(fmt).load(plan.paths), table_cfg, stage_filter_ops(table_cfg)
+    )
+    df_final, output_cols, _ = _prep_dataframe(raw, table_cfg)
+    written = write_stage_frame(
+        spark, table_cfg, plan.table_fqn, df_final, output_cols, plan.snapshot_props
+    )
+    inputs, outputs = observed(observed_input, written.pop("output_metrics"))
+    audit = audit_record(table_cfg, written["snapshot_id"], inputs, outputs)
+    return done(**written, audit=audit)
+
+
+def _ingest_in_pool(
+    spark: SparkSession,
+    table_cfg: dict[str, Any],
+    plan: IngestPlan,
+    run_id: str,
+    run_started_at: datetime,
+) -> Dict[str, Any]:
+    # one FAIR scheduler pool per table so small tables are not queued behind
+    # the big ones; local properties are per thread (pinned thread mode)
+    sc = spark.sparkContext
+    sc.setLocalProperty("spark.scheduler.pool", table_cfg["name"])
+    sc.setJobGroup(f"stage-{table_cfg['name']}", f"Ingest {plan.table_fqn}")
+    result = ingest_table(spark, table_cfg, plan)
+    # right after the table's own commit, so a later failure cannot lose it
+    if "audit" in result:
+        write_audit(spark, run_id, run_started_at, [result["audit"]])
+
+    tracker = sc.statusTracker()
+    jobs = tracker.getJobIdsForGroup(f"stage-{table_cfg['name']}")
+    stages = [tracker.getJobInfo(j) for j in jobs]
+    return {
+        **result,
+        "jobs": len(jobs),
+        "stages": sum(len(info.stageIds) for info in stages if info is not None),
+    }
+
+
+def ingest_tables(
+    spark: SparkSession, tables: List[dict[str, Any]], concurrency: int
+) -> List[Dict[str, Any]]:
+    """Ingest tables concurrently, largest raw input first.
+
+    A failing table does not stop the others. If any failed, the report of
+    the committed tables is printed and a RuntimeError lists the failures.
+    """
+    ensure_namespace(spark)  # once, before tables race to create it
+    ensure_audit_table(spark)
+    plans = [(t, plan_ingest(spark, t)) for t in tables]
+    plans.sort(key=lambda tp: tp[1].input_bytes, reverse=True)
+
+    run_id = str(uuid.uuid4())
+    run_started_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(_ingest_in_pool, spark, t, p, run_id, run_started_at)
+            for t, p in plans
+        ]
+        results, failures = [], {}
+        for (table_cfg, _), future in zip(plans, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failures[table_cfg["name"]] = e
+
+    if failures:
+        print_report(results)
+        for name, e in failures.items():
+            print(f"Ingest of '{name}' failed: {e!r}")
+        raise RuntimeError(
+            f"Ingest failed for {len(failures)} of {len(plans)} tables: "
+            + ", ".join(failures)
+        ) from next(iter(failures.values()))
+    return results
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'table':<15}{'wall_s':>10}{'input_mb':>12}{'output_rows':>14}"
+        f"{'jobs':>6}{'stages':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['table']:<15}{r['wall_s']:>10}"
+            f"{r['input_bytes'] / 1_048_576:>12.1f}{r['output_rows']:>14}"
+            f"{r.get('jobs', '-'):>6}{r.get('stages', '-'):>8}"
+        )
 
 
 def main() -> None:
-    spark = get_spark("stage_ingest_job")
+    parser = argparse.ArgumentParser(description="Ingest raw CDC into stage")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("STAGE_INGEST_CONCURRENCY", "3")),
+        help="Tables ingested at the same time",
+    )
+    parser.add_argument(
+        "--profile",
+        default=os.getenv("SPARK_PROFILE", "ingest-bulk"),
+        help="Spark tuning profile, see lakehouse.spark_session.PROFILES",
+    )
+    args = parser.parse_args()
+
+    spark = get_spark(
+        "stage_ingest_job", {"spark.scheduler.mode": "FAIR"}, args.profile
+    )
     config = load_config()
-    for table in config["sources"][0]["tables"]:
-        ingest_table(spark, table)
+    results = ingest_tables(spark, config["sources"][0]["tables"], args.concurrency)
+    print_report(results)
 
 
 if __name__ == "__main__":
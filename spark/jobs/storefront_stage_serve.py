@@ -0,0 +1,247 @@
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List
+import argparse
+import json
+import os
+import time
+
+import yaml
+from pyspark.sql import DataFrame, SparkSession
+from pyspark.sql import functions as F
+from pyspark.sql.functions import col
+
+from lakehouse.spark_session import get_spark
+from storefront_raw_stage import STAGE_NAMESPACE, TABLE_CATALOG
+from storefront_raw_stage import load_config as load_stage_config
+
+SERVE_CONFIG = Path(__file__).parent / "serve_tables.yaml"
+SERVE_NAMESPACE = "serve.storefront"
+
+# table property holding the stage snapshot ids a rollup is up to date with
+SOURCE_SNAPSHOTS_PROPERTY = "serve.source-snapshots"
+
+
+def load_config() -> dict[str, Any]:
+    with open(SERVE_CONFIG) as f:
+        return yaml.safe_load(f)
+
+
+def stage_fqn(name: str) -> str:
+    return f"{TABLE_CATALOG}.{STAGE_NAMESPACE}.{name}"
+
+
+def check_sources(rollups: List[dict[str, Any]]) -> None:
+    """Incremental reads only see appends, so sources must be append tables."""
+    modes = {
+        t["name"]: t.get("mode", "append")
+        for t in load_stage_config()["sources"][0]["tables"]
+    }
+    for rollup in rollups:
+        for table in rollup["sources"]:
+            if modes.get(table) != "append":
+                raise ValueError(
+                    f"Rollup '{rollup['name']}' tracks '{table}', which is not "
+                    f"an append-mode stage table"
+                )
+
+
+def current_snapshot(spark: SparkSession, table_fqn: str) -> int | None:
+    if not spark._jsparkSession.catalog().tableExists(table_fqn):
+        return None
+    rows = spark.sql(
+        f"SELECT snapshot_id FROM {table_fqn}.snapshots "
+        "ORDER BY committed_at DESC LIMIT 1"
+    ).collect()
+    return rows[0][0] if rows else None
+
+
+def snapshot_exists(spark: SparkSession, table_fqn: str, snapshot_id: int) -> bool:
+    return (
+        spark.sql(
+            f"SELECT 1 FROM {table_fqn}.snapshots WHERE snapshot_id = {snapshot_id}"
+        ).count()
+        > 0
+    )
+
+
+def processed_snapshots(spark: SparkSession, table_fqn: str) -> Dict[str, int]:
+    if not spark._jsparkSession.catalog().tableExists(table_fqn):
+        return {}
+    props = spark.sql(f"SHOW TBLPROPERTIES {table_fqn}").collect()
+    value = next(
+        (r["value"] for r in props if r["key"] == SOURCE_SNAPSHOTS_PROPERTY), None
+    )
+    return json.loads(value) if value else {}
+
+
+def appended_rows(
+    spark: SparkSession, table_fqn: str, start: int, end: int
+) -> DataFrame:
+    """Rows appended after snapshot start, up to and including snapshot end."""
+    return (
+        spark.read.format("iceberg")
+        .option("start-snapshot-id", str(start))
+        .option("end-snapshot-id", str(end))
+        .load(table_fqn)
+    )
+
+
+def affected_dates(
+    spark: SparkSession, rollup: dict[str, Any], changes: Dict[str, DataFrame]
+) -> List[date]:
+    """The date_table event_dates touched by the appended rows of each source.
+
+    Rows of other sources are mapped to dates through their date_table id. An
+    id not in stage yet is skipped: its own arrival marks the date later.
+    """
+    date_table = spark.table(stage_fqn(rollup["date_table"]))
+    dates = set()
+    for table, df in changes.items():
+        if table == rollup["date_table"]:
+            rows = df.select("event_date").distinct().collect()
+        else:
+            ids = df.select(col(rollup["sources"][table]).alias("id")).distinct()
+            lo, hi = ids.agg(F.min("id"), F.max("id")).collect()[0]
+            if lo is None:
+                continue
+            # the id range lets file min/max stats skip most of the date table
+            rows = (
+                date_table.filter(col("id").between(lo, hi))
+                .join(ids, "id", "left_semi")
+                .select("event_date")
+                .distinct()
+                .collect()
+            )
+        dates.update(r[0] for r in rows if r[0] is not None)
+    return sorted(dates)
+
+
+def all_dates(spark: SparkSession, rollup: dict[str, Any]) -> List[date]:
+    rows = (
+        spark.table(stage_fqn(rollup["date_table"]))
+        .select("event_date")
+        .distinct()
+        .collect()
+    )
+    return sorted(r[0] for r in rows if r[0] is not None)
+
+
+def plan_refresh(
+    spark: SparkSession, rollup: dict[str, Any], table_fqn: str
+) -> tuple[str, List[date], Dict[str, int]]:
+    """Pick full or incremental refresh and the dates it recomputes."""
+    current = {t: current_snapshot(spark, stage_fqn(t)) for t in rollup["sources"]}
+    if current.get(rollup["date_table"]) is None:
+        return "unchanged", [], {}  # nothing to group by yet
+    current = {t: s for t, s in current.items() if s is not None}
+    processed = processed_snapshots(spark, table_fqn)
+
+    changes = {}
+    for table, end in current.items():
+        start = processed.get(table)
+        if start == end:
+            continue
+        if start is None or not snapshot_exists(spark, stage_fqn(table), start):
+            # first run, new source, or the start snapshot was expired
+            return "full", all_dates(spark, rollup), current
+        changes[table] = appended_rows(spark, stage_fqn(table), start, end)
+
+    if not changes:
+        return "unchanged", [], current
+    return "incremental", affected_dates(spark, rollup, changes), current
+
+
+def rollup_frame(spark: SparkSession, rollup: dict[str, Any], dates: List[date]):
+    sql = (
+        rollup["sql"]
+        .replace("{stage}", f"{TABLE_CATALOG}.{STAGE_NAMESPACE}")
+        .replace("{dates}", ", ".join(f"DATE '{d.isoformat()}'" for d in dates))
+    )
+    return spark.sql(sql)
+
+
+def refresh_rollup(spark: SparkSession, rollup: dict[str, Any]) -> Dict[str, Any]:
+    name = rollup["name"]
+    table_fqn = f"{TABLE_CATALOG}.{SERVE_NAMESPACE}.{name}"
+    start = time.perf_counter()
+
+    mode, dates, snapshots = plan_refresh(spark, rollup, table_fqn)
+    print(f"Refreshing {table_fqn}: {mode}, {len(dates)} dates")
+
+    if dates:
+        df = rollup_frame(spark, rollup, dates)
+        if spark._jsparkSession.catalog().tableExists(table_fqn):
+            # dynamic overwrite: only the recomputed event_date partitions
+            df.writeTo(table_fqn).overwritePartitions()
+        else:
+            writer = df.writeTo(table_fqn).partitionedBy(col("event_date"))
+            for k, v in rollup.get("table_properties", {}).items():
+                writer = writer.tableProperty(str(k), str(v))
+            writer.create()
+            print(f"Created table {table_fqn}")
+
+    # recomputing a date is idempotent, so recording the snapshots after the
+    # write means a failed run is redone by the next one, never skipped
+    if mode != "unchanged" and spark._jsparkSession.catalog().tableExists(table_fqn):
+        value = json.dumps(snapshots, sort_keys=True)
+        spark.sql(
+            f"ALTER TABLE {table_fqn} SET TBLPROPERTIES "
+            f"('{SOURCE_SNAPSHOTS_PROPERTY}' = '{value}')"
+        )
+
+    return {
+        "table": name,
+        "mode": mode,
+        "dates": len(dates),
+        "wall_s": round(time.perf_counter() - start, 2),
+    }
+
+
+def ensure_namespace(spark: SparkSession) -> None:
+    spark.sql(f"CREATE NAMESPACE IF NOT EXISTS {TABLE_CATALOG}.serve")
+    spark.sql(f"CREATE NAMESPACE IF NOT EXISTS {TABLE_CATALOG}.{SERVE_NAMESPACE}")
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    print(f"{'table':<25}{'mode':>13}{'dates':>8}{'wall_s':>10}")
+    for r in results:
+        print(f"{r['table']:<25}{r['mode']:>13}{r['dates']:>8}{r['wall_s']:>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh serve rollups from stage")
+    parser.add_argument("--rollups", nargs="*", help="Subset of rollups to refresh")
+    parser.add_argument(
+        "--full", action="store_true", help="Recompute every date of each rollup"
+    )
+    parser.add_argument(
+        "--profile",
+        default=os.getenv("SPARK_PROFILE", "ingest-small"),
+        help="Spark tuning profile, see lakehouse.spark_session.PROFILES",
+    )
+    args = parser.parse_args()
+
+    rollups = [
+        r
+        for r in load_config()["marts"][0]["rollups"]
+        if not args.rollups or r["name"] in args.rollups
+    ]
+    check_sources(rollups)
+
+    spark = get_spark("serve_refresh_job", profile=args.profile)
+    ensure_namespace(spark)
+    if args.full:
+        for r in rollups:
+            table_fqn = f"{TABLE_CATALOG}.{SERVE_NAMESPACE}.{r['name']}"
+            if spark._jsparkSession.catalog().tableExists(table_fqn):
+                spark.sql(
+                    f"ALTER TABLE {table_fqn} "
+                    f"UNSET TBLPROPERTIES IF EXISTS ('{SOURCE_SNAPSHOTS_PROPERTY}')"
+                )
+
+    print_report([refresh_rollup(spark, r) for r in rollups])
+
+
+if __name__ == "__main__":
+    main()
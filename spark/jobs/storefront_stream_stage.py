@@ -0,0 +1,262 @@
+from datetime import datetime, timezone
+from functools import reduce
+from typing import Any, Dict, List
+import argparse
+import json
+import os
+import urllib.request
+
+from pyspark.sql import DataFrame, Observation, SparkSession
+from pyspark.sql import functions as F
+from pyspark.sql.avro.functions import from_avro
+from pyspark.sql.functions import col
+
+from lakehouse.spark_session import get_spark
+from stage_audit import (
+    audit_record,
+    ensure_audit_table,
+    observe_input,
+    observed,
+    sum_metrics,
+    write_audit,
+)
+from storefront_raw_stage import (
+    STAGE_NAMESPACE,
+    STREAM_BATCH_PROPERTY,
+    STREAM_QUERY_PROPERTY,
+    TABLE_CATALOG,
+    _prep_dataframe,
+    ensure_namespace,
+    load_config,
+    stage_filter_ops,
+    write_stage_frame,
+)
+
+# Confluent wire format: magic byte 0, 4-byte big-endian schema id, Avro body
+CONFLUENT_MAGIC = 0
+CONFLUENT_HEADER_BYTES = 5
+
+
+class SchemaRegistry:
+    """Writer schemas by id, fetched once from the Confluent schema registry."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.schemas: Dict[int, str] = {}
+
+    def schema(self, schema_id: int) -> str:
+        if schema_id not in self.schemas:
+            with urllib.request.urlopen(f"{self.url}/schemas/ids/{schema_id}") as r:
+                self.schemas[schema_id] = json.load(r)["schema"]
+            print(f"Loaded schema {schema_id} from {self.url}")
+        return self.schemas[schema_id]
+
+
+def topic_for(table_cfg: dict[str, Any]) -> str:
+    """Kafka topic of a stage table; the sink names its directory after it."""
+    return table_cfg.get("topic") or table_cfg["source_path"].rstrip("/").split("/")[-1]
+
+
+def frame_confluent(df: DataFrame) -> DataFrame:
+    """Split Kafka values into schema id and Avro payload, dropping tombstones."""
+    return df.filter(
+        col("value").isNotNull()
+        & (F.substring("value", 1, 1) == F.unhex(F.lit(f"{CONFLUENT_MAGIC:02x}")))
+    ).select(
+        F.conv(F.hex(F.substring("value", 2, 4)), 16, 10)
+        .cast("int")
+        .alias("schema_id"),
+        F.expr(
+            f"substring(value, {CONFLUENT_HEADER_BYTES + 1}, "
+            f"length(value) - {CONFLUENT_HEADER_BYTES})"
+        ).alias("payload"),
+    )
+
+
+def decode_batch(
+    framed: DataFrame, registry: SchemaRegistry, table_cfg: dict[str, Any]
+) -> tuple[DataFrame, List[str], List[Observation]] | None:
+    """Decode and prepare a framed batch, one projection per writer schema.
+
+    Envelopes of different schema versions do not union, but their prepared
+    frames do: `_prep_dataframe` casts every column to the configured type.
+    Each projection's decoded envelopes are observed for the audit.
+    """
+    schema_ids = [r[0] for r in framed.select("schema_id").distinct().collect()]
+    if not schema_ids:
+        return None
+
+    prepared, observations = [], []
+    for schema_id in sorted(schema_ids):
+        envelope = (
+            framed.filter(col("schema_id") == schema_id)
+            .select(
+                from_avro(
+                    "payload", registry.schema(schema_id), {"mode": "FAILFAST"}
+                ).alias("e")
+            )
+            .select("e.*")
+        )
+        envelope, observation = observe_input(
+            envelope,
+            table_cfg,
+            stage_filter_ops(table_cfg),
+            f"stage_input_{table_cfg['name']}_{schema_id}",
+        )
+        df, output_cols, _ = _prep_dataframe(envelope, table_cfg)
+        prepared.append(df)
+        observations.append(observation)
+    return reduce(DataFrame.unionByName, prepared), output_cols, observations
+
+
+def committed_batch(spark: SparkSession, table_fqn: str, query_id: str) -> int:
+    """Last micro-batch of a streaming query already committed to the table."""
+    if not spark._jsparkSession.catalog().tableExists(table_fqn):
+        return -1
+    rows = spark.sql(
+        f"SELECT max(CAST(summary['{STREAM_BATCH_PROPERTY}'] AS BIGINT)) "
+        f"FROM {table_fqn}.snapshots "
+        f"WHERE summary['{STREAM_QUERY_PROPERTY}'] = '{query_id}'"
+    ).collect()
+    return rows[0][0] if rows and rows[0][0] is not None else -1
+
+
+def batch_writer(
+    spark: SparkSession, table_cfg: dict[str, Any], registry: SchemaRegistry
+):
+    table_fqn = f"{TABLE_CATALOG}.{STAGE_NAMESPACE}.{table_cfg['name']}"
+
+    def write_batch(df: DataFrame, batch_id: int) -> None:
+        # a restart replays the last uncommitted batch of the checkpoint; the
+        # query id survives restarts, so a batch already in the table is skipped
+        query_id = spark.sparkContext.getLocalProperty("sql.streaming.queryId")
+        if batch_id <= committed_batch(spark, table_fqn, query_id):
+            print(f"Batch {batch_id} already committed to {table_fqn}")
+            return
+
+        started_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        framed = frame_confluent(df).persist()
+        try:
+            decoded = decode_batch(framed, registry, table_cfg)
+            if decoded is None:
+                return
+            df_final, output_cols, input_observations = decoded
+            stats = write_stage_frame(
+                spark,
+                table_cfg,
+                table_fqn,
+                df_final,
+                output_cols,
+                {STREAM_QUERY_PROPERTY: query_id, STREAM_BATCH_PROPERTY: str(batch_id)},
+                writer="stream",
+            )
+            *inputs, outputs = observed(
+                *input_observations, stats.pop("output_metrics")
+            )
+            audit = audit_record(
+                table_cfg, stats["snapshot_id"], sum_metrics(inputs), outputs
+            )
+            write_audit(spark, f"{query_id}/{batch_id}", started_at, [audit])
+            print(f"Batch {batch_id} of {table_fqn}: {stats}")
+        finally:
+            framed.unpersist()
+
+    return write_batch
+
+
+def start_stream(
+    spark: SparkSession,
+    table_cfg: dict[str, Any],
+    registry: SchemaRegistry,
+    args: argparse.Namespace,
+):
+    name = table_cfg["name"]
+    topic = topic_for(table_cfg)
+    reader = (
+        spark.readStream.format("kafka")
+        .option("kafka.bootstrap.servers", args.bootstrap_servers)
+        .option("subscribe", topic)
+        .option("startingOffsets", args.starting_offsets)
+        # offsets Kafka deleted before they were read fail the query, unless
+        # losing them is accepted explicitly
+        .option("failOnDataLoss", str(not args.allow_data_loss).lower())
+    )
+    if args.max_offsets_per_trigger:
+        reader = reader.option("maxOffsetsPerTrigger", args.max_offsets_per_trigger)
+
+    # the stream thread inherits the pool, so each table gets its own FAIR pool
+    spark.sparkContext.setLocalProperty("spark.scheduler.pool", name)
+    query = (
+        reader.load()
+        .select("value")
+        .writeStream.queryName(f"stage-{name}")
+        .foreachBatch(batch_writer(spark, table_cfg, registry))
+        .option("checkpointLocation", f"{args.checkpoint_root.rstrip('/')}/{name}")
+        .trigger(processingTime=f"{args.trigger_seconds} seconds")
+        .start()
+    )
+    print(f"Streaming {topic} into {TABLE_CATALOG}.{STAGE_NAMESPACE}.{name}")
+    return query
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream Kafka CDC into stage")
+    parser.add_argument("--tables", nargs="*", help="Subset of tables to stream")
+    parser.add_argument(
+        "--trigger-seconds",
+        type=float,
+        default=float(os.getenv("STAGE_STREAM_TRIGGER_SECONDS", "10")),
+        help="Micro-batch trigger interval",
+    )
+    parser.add_argument(
+        "--max-offsets-per-trigger",
+        type=int,
+        default=int(os.getenv("STAGE_STREAM_MAX_OFFSETS_PER_TRIGGER", "100000")),
+        help="Records read per topic and micro-batch at most (0: unlimited)",
+    )
+    parser.add_argument(
+        "--starting-offsets",
+        default=os.getenv("STAGE_STREAM_STARTING_OFFSETS", "earliest"),
+        help="Kafka offsets of a query without checkpoint",
+    )
+    parser.add_argument(
+        "--checkpoint-root",
+        default=os.getenv(
+            "STAGE_STREAM_CHECKPOINT_ROOT", "s3a://lakehouse/_checkpoints/stage"
+        ),
+        help="Per-table checkpoints are kept below this path",
+    )
+    parser.add_argument(
+        "--allow-data-loss",
+        action="store_true",
+        default=os.getenv("STAGE_STREAM_ALLOW_DATA_LOSS", "false").lower() == "true",
+        help="Skip offsets Kafka already deleted instead of failing the query",
+    )
+    parser.add_argument(
+        "--bootstrap-servers", default=os.getenv("KAFKA_BOOTSTRAP_SERVERS")
+    )
+    parser.add_argument("--schema-registry", default=os.getenv("SCHEMA_REGISTRY_URL"))
+    parser.add_argument(
+        "--profile",
+        default=os.getenv("SPARK_PROFILE", "ingest-small"),
+        help="Spark tuning profile, see lakehouse.spark_session.PROFILES",
+    )
+    args = parser.parse_args()
+
+    spark = get_spark(
+        "stage_stream_job", {"spark.scheduler.mode": "FAIR"}, args.profile
+    )
+    ensure_namespace(spark)  # once, before streams race to create it
+    ensure_audit_table(spark)
+    registry = SchemaRegistry(args.schema_registry)
+
+    tables = load_config()["sources"][0]["tables"]
+    for table in tables:
+        if args.tables and table["name"] not in args.tables:
+            continue
+        start_stream(spark, table, registry, args)
+    spark.streams.awaitAnyTermination()
+
+
+if __name__ == "__main__":
+    main()
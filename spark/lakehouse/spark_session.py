@@ -1,9 +1,93 @@
 import os
 from pyspark.sql import SparkSession
 
+# S3A client shared by the cluster profiles: a connection pool wide enough for
+# parallel multipart uploads and large listing pages for the raw sink prefixes
+_S3A_BASE = {
+    "spark.hadoop.fs.s3a.connection.maximum": "96",
+    "spark.hadoop.fs.s3a.threads.max": "64",
+    "spark.hadoop.fs.s3a.paging.maximum": "5000",
+    "spark.hadoop.fs.s3a.fast.upload.active.blocks": "8",
+    "spark.sql.adaptive.enabled": "true",
+    "spark.sql.adaptive.coalescePartitions.enabled": "true",
+}
 
-def get_spark(app_name: str = "LakehouseJob") -> SparkSession:
-    return (
+# Tuning per workload, picked by get_spark's `profile` or SPARK_PROFILE.
+# Iceberg commits through its own metadata swap, so no S3A output committer
+# is involved in table writes; file sizes come from the advisory partition
+# size and, for new tables, the catalog's table defaults.
+PROFILES: dict[str, dict[str, str]] = {
+    # frequent incremental runs over a few small sink files
+    "ingest-small": {
+        **_S3A_BASE,
+        "spark.hadoop.fs.s3a.fast.upload.buffer": "bytebuffer",
+        "spark.hadoop.fs.s3a.multipart.size": "32M",
+        "spark.hadoop.fs.s3a.experimental.input.fadvise": "sequential",
+        "spark.sql.shuffle.partitions": "16",
+        "spark.sql.adaptive.advisoryPartitionSizeInBytes": "32m",
+        "spark.sql.iceberg.advisory-partition-size": "33554432",
+        # pack many small Avro objects into each read task
+        "spark.sql.files.maxPartitionBytes": "64m",
+        "spark.sql.files.openCostInBytes": "1m",
+    },
+    # backfills and large raw volumes, bound by object store bandwidth
+    "ingest-bulk": {
+        **_S3A_BASE,
+        "spark.hadoop.fs.s3a.connection.maximum": "200",
+        "spark.hadoop.fs.s3a.threads.max": "128",
+        "spark.hadoop.fs.s3a.fast.upload.active.blocks": "16",
+        "spark.hadoop.fs.s3a.fast.upload.buffer": "disk",
+        "spark.hadoop.fs.s3a.multipart.size": "64M",
+        "spark.hadoop.fs.s3a.experimental.input.fadvise": "sequential",
+        "spark.sql.shuffle.partitions": "200",
+        "spark.sql.adaptive.advisoryPartitionSizeInBytes": "128m",
+        "spark.sql.iceberg.advisory-partition-size": "134217728",
+        "spark.sql.files.maxPartitionBytes": "256m",
+        "spark.sql.files.openCostInBytes": "4m",
+        "spark.sql.catalog.lakehouse.table-default.write.target-file-size-bytes": (
+            "134217728"
+        ),
+    },
+    # compaction and metadata procedures: Parquet reads with seeks, big files
+    "maintenance": {
+        **_S3A_BASE,
+        "spark.hadoop.fs.s3a.fast.upload.buffer": "disk",
+        "spark.hadoop.fs.s3a.multipart.size": "64M",
+        "spark.hadoop.fs.s3a.experimental.input.fadvise": "random",
+        "spark.sql.shuffle.partitions": "64",
+        "spark.sql.adaptive.advisoryPartitionSizeInBytes": "256m",
+        "spark.sql.adaptive.skewJoin.enabled": "true",
+        "spark.sql.iceberg.advisory-partition-size": "268435456",
+    },
+    # local[*] benchmarks on a local filesystem warehouse
+    "local-bench": {
+        "spark.ui.enabled": "false",
+        "spark.sql.adaptive.enabled": "true",
+        "spark.sql.shuffle.partitions": str(2 * (os.cpu_count() or 1)),
+        "spark.sql.files.maxPartitionBytes": "64m",
+        "spark.sql.files.openCostInBytes": "1m",
+    },
+}
+
+
+def get_spark(
+    app_name: str = "LakehouseJob",
+    extra_conf: dict[str, str] | None = None,
+    profile: str | None = None,
+) -> SparkSession:
+    """Session on the lakehouse catalog, tuned by a profile from PROFILES.
+
+    The profile comes from the argument or SPARK_PROFILE; extra_conf wins over
+    profile settings. The effective value of every tuned key is printed.
+    """
+    profile = profile or os.getenv("SPARK_PROFILE")
+    if profile and profile not in PROFILES:
+        raise ValueError(
+            f"Unknown Spark profile '{profile}', expected one of {sorted(PROFILES)}"
+        )
+    tuning = {**PROFILES.get(profile, {}), **(extra_conf or {})}
+
+    builder = (
         SparkSession.builder.appName(app_name)
         .master(os.environ["SPARK_MASTER_URL"])
         # Iceberg HadoopCatalog config
@@ -35,5 +119,12 @@ def get_spark(app_name: str = "LakehouseJob") -> SparkSession:
             "spark.sql.extensions",
             "org.apache.iceberg.spark.extensions.IcebergSparkSessionExtensions",
         )
-        .getOrCreate()
     )
+    for k, v in tuning.items():
+        builder = builder.config(k, v)
+    spark = builder.getOrCreate()
+
+    print(f"Spark session '{app_name}' with profile {profile or '-'}:")
+    for k in sorted(tuning):
+        print(f"  {k}={spark.conf.get(k, None)}")
+    return spark
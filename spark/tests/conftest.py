@@ -0,0 +1,39 @@
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+
+import pytest
+
+# jobs import each other and the lakehouse package flat, as in the container
+SPARK_DIR = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(SPARK_DIR), str(SPARK_DIR / "jobs")]
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def collect(self):
+        return self.rows
+
+
+class FakeSpark:
+    """Answers spark.sql with canned rows per statement prefix, logging SQL."""
+
+    def __init__(self, results=None, exists=True):
+        self.results = results or {}
+        self.statements = []
+        catalog = SimpleNamespace(tableExists=lambda table_fqn: exists)
+        self._jsparkSession = SimpleNamespace(catalog=lambda: catalog)
+
+    def sql(self, statement: str) -> FakeResult:
+        self.statements.append(statement)
+        for prefix, rows in self.results.items():
+            if statement.startswith(prefix):
+                return FakeResult(rows)
+        return FakeResult([])
+
+
+@pytest.fixture
+def fake_spark():
+    return FakeSpark
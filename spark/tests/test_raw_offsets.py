@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+pytest.importorskip("pyspark")
+
+from storefront_raw_stage import (  # noqa: E402
+    RAW_OFFSETS_PROPERTY,
+    RawFile,
+    committed_offsets,
+    select_new_files,
+)
+
+TABLE = "lakehouse.stage.storefront.orders"
+
+
+def raw_file(partition, offset):
+    return RawFile(f"s3a://raw/orders+{partition}+{offset}.avro", partition, offset, 1)
+
+
+def test_select_new_files_skips_committed_offsets():
+    files = [raw_file(0, 0), raw_file(0, 1000), raw_file(1, 0), raw_file(2, 0)]
+
+    new_files, offsets = select_new_files(files, {0: 0, 1: 0})
+
+    assert new_files == [raw_file(0, 1000), raw_file(2, 0)]
+    assert offsets == {0: 1000, 1: 0, 2: 0}
+
+
+def test_select_new_files_keeps_offsets_without_new_files():
+    assert select_new_files([raw_file(0, 0)], {0: 0, 3: 500}) == ([], {0: 0, 3: 500})
+
+
+def test_committed_offsets_from_latest_snapshot(fake_spark):
+    offsets = json.dumps({"0": 1000, "1": 0})
+    spark = fake_spark({"SELECT summary": [{"offsets": offsets}]})
+
+    assert committed_offsets(spark, TABLE) == {0: 1000, 1: 0}
+
+
+def test_committed_offsets_fall_back_to_table_property(fake_spark):
+    # the snapshots carrying the offsets were expired
+    spark = fake_spark(
+        {
+            "SHOW TBLPROPERTIES": [
+                {"key": RAW_OFFSETS_PROPERTY, "value": json.dumps({"2": 7})}
+            ]
+        }
+    )
+
+    assert committed_offsets(spark, TABLE) == {2: 7}
+
+
+def test_committed_offsets_of_missing_table(fake_spark):
+    spark = fake_spark(exists=False)
+
+    assert committed_offsets(spark, TABLE) == {}
+    assert spark.statements == []
@@ -0,0 +1,106 @@
+import pytest
+
+pytest.importorskip("pyspark")
+
+import storefront_raw_stage as stage  # noqa: E402
+from storefront_raw_stage import MODE_PROPERTY, check_table_mode  # noqa: E402
+
+TABLE = "lakehouse.stage.storefront.orders"
+
+
+def props(**values):
+    return {"SHOW TBLPROPERTIES": [{"key": k, "value": v} for k, v in values.items()]}
+
+
+def test_check_table_mode_refuses_merge_into_append_table(fake_spark):
+    spark = fake_spark(props(**{MODE_PROPERTY: "append"}))
+
+    with pytest.raises(ValueError, match="append mode"):
+        check_table_mode(spark, TABLE, {"mode": "merge"})
+
+
+def test_check_table_mode_stamps_unrecorded_merge_without_duplicates(fake_spark):
+    spark = fake_spark(props())
+    check_table_mode(spark, TABLE, {"mode": "merge", "keys": ["id"]})
+
+    assert spark.statements[1].startswith(f"SELECT id FROM {TABLE} GROUP BY id")
+    assert spark.statements[-1] == (
+        f"ALTER TABLE {TABLE} SET TBLPROPERTIES ('{MODE_PROPERTY}' = 'merge')"
+    )
+
+
+def test_check_table_mode_refuses_unrecorded_table_with_duplicates(fake_spark):
+    spark = fake_spark({**props(), "SELECT id": [(1,)]})
+
+    with pytest.raises(ValueError, match="append mode"):
+        check_table_mode(spark, TABLE, {"mode": "merge"})
+    assert not any(s.startswith("ALTER") for s in spark.statements)
+
+
+def test_check_table_mode_stamps_unrecorded_append_unchecked(fake_spark):
+    spark = fake_spark(props())
+    check_table_mode(spark, TABLE, {})
+
+    assert len(spark.statements) == 2
+    assert spark.statements[-1].endswith(f"('{MODE_PROPERTY}' = 'append')")
+
+
+def test_check_table_mode_unchanged_is_read_only(fake_spark):
+    spark = fake_spark(props(**{MODE_PROPERTY: "append"}))
+    check_table_mode(spark, TABLE, {})
+
+    assert len(spark.statements) == 1
+
+
+def test_ingest_tables_reports_committed_tables_before_failing(
+    fake_spark, monkeypatch, capsys
+):
+    def ingest(spark, table_cfg, plan, run_id, run_started_at):
+        if table_cfg["name"] == "orders":
+            raise OSError("S3 unavailable")
+        return {
+            "table": table_cfg["name"],
+            "wall_s": 1.0,
+            "input_bytes": plan.input_bytes,
+            "output_rows": 5,
+        }
+
+    monkeypatch.setattr(stage, "ensure_audit_table", lambda spark: None)
+    monkeypatch.setattr(
+        stage, "plan_ingest", lambda spark, t: stage.IngestPlan(t["name"], [], 0)
+    )
+    monkeypatch.setattr(stage, "_ingest_in_pool", ingest)
+    tables = [{"name": n} for n in ("customers", "orders", "payments")]
+
+    with pytest.raises(RuntimeError, match="1 of 3 tables: orders") as failed:
+        stage.ingest_tables(fake_spark(), tables, concurrency=2)
+
+    assert isinstance(failed.value.__cause__, OSError)
+    out = capsys.readouterr().out
+    assert "customers" in out and "payments" in out
+    assert "Ingest of 'orders' failed" in out
+
+
+def test_check_table_writer_refuses_the_other_job(fake_spark):
+    spark = fake_spark(props(**{stage.WRITER_PROPERTY: "batch"}))
+
+    with pytest.raises(ValueError, match="written by the batch ingest job"):
+        stage.check_table_writer(spark, TABLE, "stream")
+
+
+def test_check_table_writer_infers_owner_of_unrecorded_table(fake_spark):
+    spark = fake_spark({**props(), "SELECT 1": [(1,)]})
+
+    with pytest.raises(ValueError, match="written by the stream ingest job"):
+        stage.check_table_writer(spark, TABLE, "batch")
+    assert f"summary['{stage.STREAM_QUERY_PROPERTY}']" in spark.statements[1]
+
+
+def test_check_table_writer_claims_unrecorded_table(fake_spark):
+    spark = fake_spark(props())
+    stage.check_table_writer(spark, TABLE, "stream")
+
+    assert f"summary['{stage.RAW_OFFSETS_PROPERTY}']" in spark.statements[1]
+    assert spark.statements[-1] == (
+        f"ALTER TABLE {TABLE} SET TBLPROPERTIES ('{stage.WRITER_PROPERTY}' = 'stream')"
+    )
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pyspark")
+
+from stage_audit import audit_record, observed, sum_metrics  # noqa: E402
+from storefront_raw_stage import stage_filter_ops  # noqa: E402
+
+TABLE_CFG = {"name": "orders"}
+
+
+class FakeObservation:
+    """Observation whose blocking `get` returns once released."""
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self.ready = threading.Event()
+        if metrics is not None:
+            self.ready.set()
+
+    @property
+    def get(self):
+        self.ready.wait()
+        return self.metrics
+
+
+def test_observed_passes_dicts_through():
+    metrics = {"output_rows": 3}
+    assert observed(FakeObservation({"input_rows": 4}), metrics) == [
+        {"input_rows": 4},
+        metrics,
+    ]
+
+
+def test_observed_shares_one_timeout():
+    start = time.monotonic()
+    result = observed(FakeObservation(), FakeObservation(), timeout=0.2)
+
+    assert result == [None, None]
+    assert time.monotonic() - start < 0.4
+
+
+def test_sum_metrics_adds_reads_and_needs_all_of_them():
+    a = {"input_rows": 3, "op_c": 2, "op_d": 1}
+    b = {"input_rows": 2, "op_c": 2, "op_d": 0}
+
+    assert sum_metrics([a, b]) == {"input_rows": 5, "op_c": 4, "op_d": 1}
+    assert sum_metrics([a, None]) is None
+
+
+def test_audit_record_maps_metrics():
+    inputs = {
+        "input_rows": 10,
+        "op_c": 7,
+        "op_u": 2,
+        "op_d": 1,
+        "filtered_rows": 1,
+        "cast_total": 0,
+    }
+    outputs = {"output_rows": 9, "null_event_date": 0, "min_event_date": None}
+
+    record = audit_record(TABLE_CFG, 42, inputs, outputs)
+
+    assert record["table"] == "orders"
+    assert record["snapshot_id"] == 42
+    assert record["op_counts"] == {"c": 7, "u": 2, "d": 1}
+    assert record["cast_failures"] == {"total": 0}
+    assert record["null_counts"] == {"event_date": 0}
+    assert record["output_rows"] == 9
+    assert record["metrics_complete"]
+
+
+def test_audit_record_without_output_is_incomplete():
+    record = audit_record(TABLE_CFG, None, {"input_rows": 1}, None)
+
+    assert record["output_rows"] is None
+    assert record["null_counts"] == {}
+    assert not record["metrics_complete"]
+
+
+@pytest.mark.parametrize(
+    ("table_cfg", "ops"),
+    [
+        ({}, []),
+        ({"filter_op": ["c", "r"]}, ["c", "r"]),
+        ({"filter_op": ["c", "r"], "mode": "merge"}, ["c", "r", "d"]),
+        ({"filter_op": ["c", "d"], "mode": "merge"}, ["c", "d"]),
+        ({"mode": "merge"}, []),
+    ],
+)
+def test_stage_filter_ops_keeps_deletes_for_merge(table_cfg, ops):
+    assert stage_filter_ops(table_cfg) == ops
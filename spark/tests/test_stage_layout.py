@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+pytest.importorskip("pyspark")
+
+from storefront_raw_stage import (  # noqa: E402
+    LAYOUT_PROPERTY,
+    apply_table_layout,
+    layout_properties,
+)
+
+TABLE = "lakehouse.stage.storefront.orders"
+LAYOUT = {
+    "sort_order": ["customer_id", "id"],
+    "bloom_filters": ["id"],
+    "metrics": {"default": "truncate(16)", "columns": {"status": "counts"}},
+}
+
+
+def applied(layout):
+    value = json.dumps(layout, sort_keys=True)
+    return {"SHOW TBLPROPERTIES": [{"key": LAYOUT_PROPERTY, "value": value}]}
+
+
+def test_layout_properties():
+    assert layout_properties(LAYOUT) == {
+        "write.parquet.bloom-filter-enabled.column.id": "true",
+        "write.metadata.metrics.default": "truncate(16)",
+        "write.metadata.metrics.column.status": "counts",
+    }
+    assert layout_properties({}) == {}
+
+
+def test_apply_table_layout_unchanged_only_reads_properties(fake_spark):
+    spark = fake_spark(applied(LAYOUT))
+    apply_table_layout(spark, TABLE, {"layout": LAYOUT})
+
+    assert spark.statements == [f"SHOW TBLPROPERTIES {TABLE}"]
+
+
+def test_apply_table_layout_first_time(fake_spark):
+    spark = fake_spark()
+    apply_table_layout(spark, TABLE, {"layout": LAYOUT})
+
+    assert spark.statements[1] == (
+        f"ALTER TABLE {TABLE} WRITE ORDERED BY customer_id, id"
+    )
+    assert (
+        "'write.parquet.bloom-filter-enabled.column.id' = 'true'"
+        in (spark.statements[2])
+    )
+
+
+def test_apply_table_layout_unsets_dropped_settings(fake_spark):
+    spark = fake_spark(applied(LAYOUT))
+    apply_table_layout(spark, TABLE, {"layout": {"sort_order": ["customer_id", "id"]}})
+
+    unset, set_props = spark.statements[1:]
+    assert unset.startswith(f"ALTER TABLE {TABLE} UNSET TBLPROPERTIES IF EXISTS")
+    assert "'write.metadata.metrics.column.status'" in unset
+    assert set_props.startswith(f"ALTER TABLE {TABLE} SET TBLPROPERTIES")
+    assert "WRITE ORDERED BY" not in " ".join(spark.statements)
+
+
+def test_apply_table_layout_clears_sort_order(fake_spark):
+    spark = fake_spark(applied({"sort_order": ["id"]}))
+    apply_table_layout(spark, TABLE, {})
+
+    assert f"ALTER TABLE {TABLE} WRITE UNORDERED" in spark.statements
@@ -0,0 +1,18 @@
+from datetime import datetime, timedelta, timezone
+import re
+
+import pytest
+
+pytest.importorskip("pyspark")
+
+from stage_maintenance import _ts  # noqa: E402
+
+
+def test_cutoff_literal_carries_utc_offset():
+    literal = _ts(2)
+
+    m = re.fullmatch(r"TIMESTAMP '(.+)'", literal)
+    cutoff = datetime.fromisoformat(m.group(1))
+    expected = datetime.now(timezone.utc) - timedelta(hours=2)
+    assert cutoff.utcoffset() == timedelta(0)
+    assert abs(cutoff - expected) < timedelta(seconds=5)
@@ -0,0 +1,27 @@
+from datetime import date
+import re
+
+import pytest
+
+pytest.importorskip("pyspark")
+
+from storefront_raw_stage import STAGE_NAMESPACE, TABLE_CATALOG  # noqa: E402
+from storefront_stage_serve import load_config, rollup_frame  # noqa: E402
+
+ROLLUPS = load_config()["marts"][0]["rollups"]
+SOURCE_RE = re.compile(
+    rf"FROM {TABLE_CATALOG}\.{STAGE_NAMESPACE}\.(\w+)\s*\n\s*(\w+)[^\n]*", re.M
+)
+
+
+@pytest.mark.parametrize("rollup", ROLLUPS, ids=[r["name"] for r in ROLLUPS])
+def test_rollup_sql_filters_every_source(rollup, fake_spark):
+    spark = fake_spark()
+    rollup_frame(spark, rollup, [date(2025, 1, 2), date(2025, 1, 3)])
+    (sql,) = spark.statements
+
+    reads = SOURCE_RE.findall(sql)
+    assert reads
+    for table, clause in reads:
+        assert clause == "WHERE", f"{rollup['name']} reads all of {table}"
+    assert "event_date IN (DATE '2025-01-02', DATE '2025-01-03')" in sql